@@ -3,23 +3,124 @@ Flask API for Crisis Response Coordinator Agent
 Deployment-ready REST API with /detect endpoint
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
+from werkzeug.datastructures import MIMEAccept
+from werkzeug.http import parse_accept_header
+import json
 import os
 import sys
 from datetime import datetime
+from typing import Optional, Tuple
+
+try:
+    import msgpack
+except ImportError:  # Optional: /detect then offers text and structured JSON only
+    msgpack = None
 
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
 from agents.coordinator_agent import CrisisCoordinator
+from followups import FollowUpDispatcher, open_follow_up_sink
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for web clients
 
+# /cases pagination
+CASES_PAGE_SIZE = 100
+CASES_PAGE_MAX = 1000
+CASE_FILTERS = ('status', 'severity', 'category', 'country', 'since', 'until')
+
 # Initialize coordinator
 coordinator = CrisisCoordinator()
 
+# Load NumPy, the retrieval postings, the local classifier and the Gemini SDK
+# in the background: /health answers at once and the first report finds them
+# loaded (WARM_UP=false loads them on first use instead)
+warm_up = None
+if os.getenv('WARM_UP', 'true').lower() in ('1', 'true', 'yes'):
+    warm_up = coordinator.start_warm_up()
+
+# Deliver due follow-ups in the background when FOLLOWUP_SINK is configured
+follow_up_sink = open_follow_up_sink()
+dispatcher = None
+if follow_up_sink:
+    dispatcher = FollowUpDispatcher(coordinator.store, coordinator.follow_ups, follow_up_sink)
+    dispatcher.start()
+
+MISSING_DESCRIPTION = {'error': 'Missing crisis_description in request body'}
+
+# /detect response formats: 'text' (JSON wrapping the formatted response, the
+# default), 'json' (structured, no text) and 'msgpack' (structured)
+DETECT_FORMATS = ('text', 'json', 'msgpack')
+STRUCTURED_JSON = 'application/vnd.crisis+json'
+DETECT_MEDIA_TYPES = {
+    'application/json': 'text',
+    STRUCTURED_JSON: 'json',
+    'application/msgpack': 'msgpack',
+    'application/x-msgpack': 'msgpack',
+}
+MSGPACK_UNAVAILABLE = {'error': 'MessagePack responses need the msgpack package', 'success': False}
+
+
+def detect_payload(result) -> dict:
+    """/detect response body for a CrisisResult (shared with the ASGI app)"""
+    return {
+        'success': True,
+        'case_id': result.case_id,
+        'classification': result.classification,
+        'response': result.response,
+        'degraded_stages': result.degraded,
+        'refining': result.refining,
+        'catalog_version': result.catalog_version,
+        'timestamp': datetime.now().isoformat()
+    }
+
+def detect_format(accept: Optional[str], requested: Optional[str] = None) -> str:
+    """
+    /detect response format from ?format= (wins) or the Accept header;
+    plain JSON, */* or no preference keep the text format
+    """
+    if requested:
+        if requested not in DETECT_FORMATS:
+            raise ValueError(f"format must be one of {', '.join(DETECT_FORMATS)}")
+        return requested
+    if not accept:
+        return 'text'
+    match = parse_accept_header(accept, MIMEAccept).best_match(DETECT_MEDIA_TYPES)
+    return DETECT_MEDIA_TYPES.get(match, 'text')
+
+
+def structured_payload(result) -> dict:
+    """/detect body for the structured formats: protocol steps and helplines instead of text"""
+    protocol = result.protocol
+    return {
+        'success': True,
+        'case_id': result.case_id,
+        'classification': result.classification,
+        'protocol': {
+            'id': protocol.get('id'),
+            'name': protocol.get('name'),
+            'source': protocol.get('source'),
+            'steps': protocol.get('protocol', {}),
+        } if protocol else None,
+        'helplines': result.helplines,
+        'follow_up_scheduled': result.follow_up_scheduled,
+        'degraded_stages': result.degraded,
+        'refining': result.refining,
+        'catalog_version': result.catalog_version,
+        'timestamp': datetime.now().isoformat()
+    }
+
+
+def encode_structured(result, response_format: str) -> Tuple[bytes, str]:
+    """Body and content type of a structured /detect response ('json' or 'msgpack')"""
+    payload = structured_payload(result)
+    if response_format == 'msgpack':
+        return msgpack.packb(payload, use_bin_type=True), 'application/msgpack'
+    return json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8'), STRUCTURED_JSON
+
 @app.route('/', methods=['GET'])
 def home():
     """Health check endpoint"""
@@ -29,8 +130,9 @@ def home():
         'version': '1.0',
         'endpoints': {
             '/detect': 'POST - Detect and respond to crisis',
-            '/cases': 'GET - List active cases',
-            '/case/<id>': 'GET - Get specific case details'
+            '/cases': 'GET - List cases (limit, cursor, filters, fields)',
+            '/case/<id>': 'GET - Get specific case details',
+            '/followups/due': 'GET - List follow-ups that are due'
         }
     })
 
@@ -45,39 +147,48 @@ def detect_crisis():
         "country": "USA" (optional)
     }
     
-    Response:
+    Response format: ?format=text|json|msgpack, else the Accept header
+    (application/vnd.crisis+json, application/msgpack); default text:
     {
         "case_id": "CASE-00001",
         "classification": {...},
         "response": "formatted response text",
+        "degraded_stages": ["classification"] (stages that fell back to local logic),
+        "refining": false (true: keyword verdict, Gemini updates the case shortly),
         "timestamp": "ISO timestamp"
     }
+    
+    Structured formats replace "response" with "protocol" (id, name, source,
+    steps: the protocol's action arrays), "helplines" and "follow_up_scheduled",
+    and skip rendering the text.
     """
     try:
+        try:
+            response_format = detect_format(request.headers.get('Accept'), request.args.get('format'))
+        except ValueError as e:
+            return jsonify({'error': str(e), 'success': False}), 400
+        if response_format == 'msgpack' and msgpack is None:
+            return jsonify(MSGPACK_UNAVAILABLE), 406
+        
         data = request.get_json()
         
         if not data or 'crisis_description' not in data:
-            return jsonify({
-                'error': 'Missing crisis_description in request body'
-            }), 400
+            return jsonify(MISSING_DESCRIPTION), 400
         
         crisis_description = data['crisis_description']
         country = data.get('country', 'USA')
         
         # Process crisis
-        response = coordinator.handle_crisis(crisis_description, country)
-        
-        # Get the latest case
-        cases = coordinator.list_active_cases()
-        latest_case = cases[-1] if cases else None
+        result = coordinator.process_crisis(crisis_description, country,
+                                            render=response_format == 'text')
         
-        return jsonify({
-            'success': True,
-            'case_id': latest_case['id'] if latest_case else None,
-            'classification': latest_case['classification'] if latest_case else None,
-            'response': response,
-            'timestamp': datetime.now().isoformat()
-        })
+        if response_format == 'text':
+            response = jsonify(detect_payload(result))
+        else:
+            body, mimetype = encode_structured(result, response_format)
+            response = Response(body, mimetype=mimetype)
+        response.vary.add('Accept')
+        return response
         
     except Exception as e:
         return jsonify({
@@ -87,19 +198,76 @@ def detect_crisis():
 
 @app.route('/cases', methods=['GET'])
 def list_cases():
-    """List all active cases"""
+    """
+    List cases one page at a time, oldest first
+    
+    Query parameters:
+        limit: page size (default 100, max 1000)
+        cursor: next_cursor from the previous page
+        status, severity, category, country: exact-match filters
+        since, until: ISO timestamp range on case creation
+        fields: comma-separated case fields to return (default: all)
+    
+    Response (streamed):
+    {
+        "success": true,
+        "total_cases": 1234,
+        "cases": [...],
+        "count": 100,
+        "next_cursor": 100 (null on the last page)
+    }
+    """
     try:
-        cases = coordinator.list_active_cases()
+        limit = min(int(request.args.get('limit', CASES_PAGE_SIZE)), CASES_PAGE_MAX)
+        cursor = int(request.args.get('cursor', 0))
+        if limit < 1 or cursor < 0:
+            raise ValueError
+    except ValueError:
         return jsonify({
-            'success': True,
-            'total_cases': len(cases),
-            'cases': cases
-        })
+            'error': 'limit and cursor must be positive integers',
+            'success': False
+        }), 400
+    
+    filters = {name: request.args[name] for name in CASE_FILTERS if request.args.get(name)}
+    for name in ('since', 'until'):
+        if name in filters:
+            try:
+                datetime.fromisoformat(filters[name])
+            except ValueError:
+                return jsonify({
+                    'error': f'{name} must be an ISO timestamp',
+                    'success': False
+                }), 400
+    
+    fields = [field for field in request.args.get('fields', '').split(',') if field]
+    
+    try:
+        total = len(coordinator.active_cases)
+        # Fetch one extra case to learn whether another page exists
+        page = coordinator.store.iter_cases(after=cursor, limit=limit + 1, **filters)
     except Exception as e:
         return jsonify({
             'error': str(e),
             'success': False
         }), 500
+    
+    def generate():
+        yield f'{{"success": true, "total_cases": {total}, "cases": ['
+        count = 0
+        last_cursor = cursor
+        next_cursor = None
+        for position, case in page:
+            if count == limit:
+                next_cursor = last_cursor
+                break
+            if fields:
+                case = {field: case[field] for field in fields if field in case}
+            yield (',' if count else '') + json.dumps(case, ensure_ascii=False)
+            count += 1
+            last_cursor = position
+        yield f'], "count": {count}, "next_cursor": {json.dumps(next_cursor)}}}'
+    
+    return Response(stream_with_context(generate()), mimetype='application/json')
 
 @app.route('/case/<case_id>', methods=['GET'])
 def get_case(case_id):
@@ -123,15 +291,68 @@ def get_case(case_id):
             'success': False
         }), 500
 
+@app.route('/followups/due', methods=['GET'])
+def due_follow_ups():
+    """
+    List follow-ups that are due, earliest first
+    
+    Query parameters:
+        before: ISO timestamp (default: now)
+        limit: maximum follow-ups to return (default 100, max 1000)
+    """
+    try:
+        before = request.args.get('before') or datetime.now().isoformat()
+        datetime.fromisoformat(before)
+        limit = min(int(request.args.get('limit', CASES_PAGE_SIZE)), CASES_PAGE_MAX)
+        if limit < 1:
+            raise ValueError
+    except ValueError:
+        return jsonify({
+            'error': 'before must be an ISO timestamp and limit a positive integer',
+            'success': False
+        }), 400
+    
+    try:
+        follow_ups = coordinator.due_follow_ups(before, limit)
+        return jsonify({
+            'success': True,
+            'before': before,
+            'count': len(follow_ups),
+            'scheduled_total': coordinator.scheduled_follow_ups(),
+            'follow_ups': follow_ups,
+            'dispatcher': {
+                'enabled': dispatcher is not None,
+                'dispatched': dispatcher.dispatched if dispatcher else 0,
+                'failed_batches': dispatcher.failed_batches if dispatcher else 0
+            }
+        })
+    except Exception as e:
+        return jsonify({
+            'error': str(e),
+            'success': False
+        }), 500
+
 @app.route('/health', methods=['GET'])
 def health():
     """Detailed health check"""
     try:
+        circuit = coordinator.breaker.stats()
         return jsonify({
-            'status': 'healthy',
+            # Degraded: Gemini is being skipped and keyword fallbacks answer
+            'status': 'healthy' if circuit['state'] == 'closed' else 'degraded',
             'protocols_loaded': sum(len(v) for v in coordinator.protocols.values()),
+            'catalog': coordinator.catalog.stats(),
+            'helplines': coordinator.catalog.current().helpline_resolver.stats(),
             'active_cases': len(coordinator.active_cases),
-            'api_configured': coordinator.model is not None,
+            'case_store': type(coordinator.store).__name__,
+            'warmed_up': coordinator.warmed.is_set(),
+            'api_configured': coordinator.models.configured,
+            'llm_requests': coordinator.limiter.stats(),
+            'llm_circuit': circuit,
+            'llm_batch_circuit': coordinator.batch_breaker.stats(),
+            'classification_coalescing': coordinator.in_flight.stats(),
+            'classification_cache': (coordinator.classification_cache.stats()
+                                     if coordinator.classification_cache else None),
             'timestamp': datetime.now().isoformat()
         })
     except Exception as e:
@@ -0,0 +1,59 @@
+"""
+ASGI variant of the Crisis Response API
+Serves /detect natively on asyncio so requests waiting on Gemini hold no
+thread; every other endpoint is delegated to the Flask app in app.py
+
+Run: uvicorn asgi:app --port 8080
+"""
+
+from a2wsgi import WSGIMiddleware
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+import app as flask_app_module
+from app import (MISSING_DESCRIPTION, MSGPACK_UNAVAILABLE, detect_format, detect_payload,
+                 encode_structured)
+
+app = FastAPI(title='Crisis Response Coordinator', docs_url=None, redoc_url=None)
+
+
+@app.post('/detect')
+async def detect_crisis(request: Request):
+    """Async /detect; same request and response bodies (and formats) as app.py"""
+    try:
+        try:
+            response_format = detect_format(request.headers.get('accept'),
+                                            request.query_params.get('format'))
+        except ValueError as e:
+            return JSONResponse({'error': str(e), 'success': False}, status_code=400)
+        if response_format == 'msgpack' and flask_app_module.msgpack is None:
+            return JSONResponse(MSGPACK_UNAVAILABLE, status_code=406)
+        
+        try:
+            data = await request.json()
+        except ValueError:
+            data = None
+        
+        if not isinstance(data, dict) or 'crisis_description' not in data:
+            return JSONResponse(MISSING_DESCRIPTION, status_code=400)
+        
+        coordinator = flask_app_module.coordinator
+        result = await coordinator.process_crisis_async(
+            data['crisis_description'], data.get('country', 'USA'),
+            render=response_format == 'text'
+        )
+        if response_format == 'text':
+            return JSONResponse(detect_payload(result), headers={'Vary': 'Accept'})
+        body, media_type = encode_structured(result, response_format)
+        return Response(body, media_type=media_type, headers={'Vary': 'Accept'})
+        
+    except Exception as e:
+        return JSONResponse({
+            'error': str(e),
+            'success': False
+        }, status_code=500)
+
+
+# Everything else (/, /cases, /case/<id>, /followups/due, /health) runs the
+# Flask views in the server's thread pool
+app.mount('/', WSGIMiddleware(flask_app_module.app))
@@ -0,0 +1,123 @@
+"""
+Benchmark: worker cold start
+Times a fresh interpreter from `import app` to its first /health answer and
+its first /detect, with and without the background warm-up (WARM_UP), reports
+the slowest imports of app.py (python -X importtime) and checks that heavy
+dependencies (Gemini SDK, NumPy, sklearn) stay off the start-up path.
+
+Run: python benchmarks/bench_cold_start.py
+Exits non-zero when the median /health time exceeds COLD_START_BUDGET seconds
+(default 1.0) or a lazy module was imported before /health answered.
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List, Tuple
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Imported on first use only, never while a worker starts
+LAZY_MODULES = ('google.generativeai', 'numpy', 'sklearn')
+
+PROBE = f"""
+import json, sys, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+client = app.app.test_client()
+response = client.get('/health')
+answered = time.perf_counter()
+lazy_loaded = [m for m in {LAZY_MODULES!r} if m in sys.modules]
+if app.warm_up is not None:
+    app.warm_up.join()
+sent = time.perf_counter()
+client.post('/detect', json={{'crisis_description': 'My father has chest pain'}})
+print(json.dumps({{
+    'import': imported - started,
+    'health': answered - started,
+    'detect': time.perf_counter() - sent,
+    'status': response.status_code,
+    'lazy_loaded': lazy_loaded,
+}}))
+"""
+
+
+def run_python(args: List[str], workdir: str, warm_up: bool = True) -> subprocess.CompletedProcess:
+    env = dict(os.environ, CASES_FILE=os.path.join(workdir, 'cases.json'),
+               CASES_DB=os.path.join(workdir, 'cases.db'), CLASSIFICATION_CACHE_FILE='',
+               WARM_UP='true' if warm_up else 'false')
+    return subprocess.run([sys.executable, *args], cwd=ROOT, env=env,
+                          capture_output=True, text=True, check=True)
+
+
+def cold_start(workdir: str, warm_up: bool) -> Dict:
+    """
+    One fresh worker: seconds to import app, to answer /health and to answer
+    its first /detect (sent once the warm-up, if enabled, has finished)
+    """
+    output = run_python(['-c', PROBE], workdir, warm_up).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def slowest_imports(workdir: str, top: int = 10) -> List[Tuple[str, int]]:
+    """Direct imports of app.py by cumulative microseconds (python -X importtime)"""
+    stderr = run_python(['-X', 'importtime', '-c', 'import app'], workdir, warm_up=False).stderr
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        imports.append((depth, name.strip(), int(cumulative)))
+
+    # importtime lists children before their parent; app is the last line
+    children, app_depth = [], None
+    for depth, name, cumulative in reversed(imports):
+        if name == 'app':
+            app_depth = depth
+        elif app_depth is not None:
+            if depth <= app_depth:
+                break
+            if depth == app_depth + 1:
+                children.append((name, cumulative))
+    return sorted(children, key=lambda item: item[1], reverse=True)[:top]
+
+
+def run_benchmark(runs: int = 5) -> bool:
+    budget = float(os.getenv('COLD_START_BUDGET', 1.0))
+    with tempfile.TemporaryDirectory() as workdir:
+        samples = [cold_start(workdir, warm_up=True) for _ in range(runs)]
+        lazy = [cold_start(workdir, warm_up=False) for _ in range(runs)]
+        imports = slowest_imports(workdir)
+
+    import_s = statistics.median(s['import'] for s in samples)
+    health_s = statistics.median(s['health'] for s in samples)
+    detect_s = statistics.median(s['detect'] for s in samples)
+    lazy_detect_s = statistics.median(s['detect'] for s in lazy)
+    # Checked without the warm-up thread, which imports them on purpose
+    lazy_loaded = sorted({m for s in lazy for m in s['lazy_loaded']})
+
+    print(f"\n{'Slowest imports of app.py':<40} {'Cumulative (ms)':>16}")
+    print("-" * 57)
+    for name, cumulative in imports:
+        print(f"{name:<40} {cumulative / 1000:>16.1f}")
+
+    print(f"\nMedian of {runs} cold starts")
+    print(f"  import app:        {import_s * 1000:8.1f} ms")
+    print(f"  first /health:     {health_s * 1000:8.1f} ms  (budget {budget * 1000:.0f} ms)")
+    print(f"  first /detect:     {detect_s * 1000:8.1f} ms  (after the background warm-up)")
+    print(f"  first /detect:     {lazy_detect_s * 1000:8.1f} ms  (WARM_UP=false, loads on demand)")
+    print(f"  lazy modules used: {', '.join(lazy_loaded) or 'none'}")
+
+    ok = health_s <= budget and not lazy_loaded and \
+        all(s['status'] == 200 for s in samples + lazy)
+    print(f"\n{'PASS' if ok else 'FAIL'}: cold-start budget\n")
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if run_benchmark() else 1)
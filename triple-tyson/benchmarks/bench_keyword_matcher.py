@@ -0,0 +1,122 @@
+"""
+Benchmark: fallback keyword classification
+Compares the precompiled keyword matcher with the previous implementation,
+which rebuilt the keyword lists on every call and rescanned the input with
+any() before collecting matches (and again for mental health severity).
+Both must classify every input identically.
+
+Run: python benchmarks/bench_keyword_matcher.py
+"""
+
+import sys
+import os
+import timeit
+from typing import Dict
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from agents.coordinator_agent import CrisisCoordinator
+from storage.case_store import MemoryCaseStore
+
+
+def legacy_fallback_classification(user_input: str, country: str) -> Dict:
+    """Previous _fallback_classification, kept verbatim for comparison"""
+    user_lower = user_input.lower()
+    
+    # Medical keywords
+    medical_keywords = ['chest pain', 'heart attack', 'stroke', 'bleeding', 'choking', 
+                      'breathing', 'unconscious', 'seizure', 'broken bone']
+    
+    # Mental health keywords
+    mental_keywords = ['suicide', 'kill myself', 'panic attack', 'panic', 'anxiety', 'anxious',
+                     'depressed', 'depression', 'self-harm', 'ptsd', 'trauma', 'want to die',
+                     'overwhelmed', 'stressed', 'mental health', 'nervous', 'worried',
+                     "don't want to live", 'no reason to live', 'hopeless']
+    
+    # Disaster keywords
+    disaster_keywords = ['earthquake', 'flood', 'fire', 'hurricane', 'tornado', 
+                       'tsunami', 'explosion', 'building collapse']
+    
+    if any(kw in user_lower for kw in medical_keywords):
+        return {
+            "category": "medical_emergency",
+            "severity": "critical",
+            "keywords": [kw for kw in medical_keywords if kw in user_lower],
+            "confidence": 0.75,
+            "reasoning": "Keyword-based medical classification",
+            "country": country
+        }
+    elif any(kw in user_lower for kw in mental_keywords):
+        severity = "critical" if any(kw in user_lower for kw in ['suicide', 'kill myself']) else "medium"
+        return {
+            "category": "mental_health_crisis",
+            "severity": severity,
+            "keywords": [kw for kw in mental_keywords if kw in user_lower],
+            "confidence": 0.75,
+            "reasoning": "Keyword-based mental health classification",
+            "country": country
+        }
+    elif any(kw in user_lower for kw in disaster_keywords):
+        return {
+            "category": "disaster_emergency",
+            "severity": "high",
+            "keywords": [kw for kw in disaster_keywords if kw in user_lower],
+            "confidence": 0.75,
+            "reasoning": "Keyword-based disaster classification",
+            "country": country
+        }
+    else:
+        return {
+            "category": "other",
+            "severity": "low",
+            "keywords": [],
+            "confidence": 0.5,
+            "reasoning": "No specific crisis keywords detected",
+            "country": country
+        }
+
+
+SCENARIOS = {
+    'medical': "he collapsed and has chest pain",
+    'mental': "i keep thinking i want to kill myself",
+    'disaster': "now there is a flood",
+    'none': "please send someone to help",
+}
+
+
+def make_report(length: int, ending: str) -> str:
+    """Long free-text report whose keywords sit at the very end"""
+    filler = "we are at home and things were calm until a moment ago when everything changed. "
+    body = (filler * (length // len(filler) + 1))[:length]
+    return body + " " + ending
+
+
+def run_benchmark():
+    coordinator = CrisisCoordinator(case_store=MemoryCaseStore())
+
+    print(f"\n{'Scenario':<10} {'Input chars':<13} {'Legacy (µs)':<13} {'Compiled (µs)':<15} {'Speedup':<8}")
+    print("-" * 62)
+    for scenario, ending in SCENARIOS.items():
+        for length in (100, 10_000, 100_000):
+            report = make_report(length, ending)
+            assert legacy_fallback_classification(report, 'USA') == \
+                coordinator._fallback_classification(report, 'USA')
+            number = max(10, 200_000 // (length + 100))
+
+            legacy = timeit.timeit(
+                lambda: legacy_fallback_classification(report, 'USA'), number=number
+            )
+            compiled = timeit.timeit(
+                lambda: coordinator._fallback_classification(report, 'USA'), number=number
+            )
+
+            legacy_us = legacy / number * 1e6
+            compiled_us = compiled / number * 1e6
+            print(f"{scenario:<10} {length:<13,} {legacy_us:<13.1f} {compiled_us:<15.1f} "
+                  f"{legacy_us / compiled_us:.2f}x")
+    print()
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,77 @@
+"""
+Benchmark: protocol retrieval
+Compares BM25 search (keywords plus the raw report) with the previous
+linear keyword scan, which rebuilt lower-cased keyword sets for every
+protocol on every lookup, on synthetic protocol libraries of growing size.
+
+Run: python benchmarks/bench_protocol_index.py
+"""
+
+import random
+import sys
+import os
+import timeit
+from typing import Dict, List, Optional
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from retrieval.protocol_index import ProtocolIndex
+
+
+def legacy_find_protocol(protocols: List[Dict], keywords: List[str]) -> Optional[Dict]:
+    """Previous _find_protocol, kept verbatim for comparison"""
+    best_match = None
+    best_score = 0
+    
+    for protocol in protocols:
+        protocol_keywords = set(kw.lower() for kw in protocol.get('keywords', []))
+        user_keywords = set(kw.lower() for kw in keywords)
+        
+        overlap = len(protocol_keywords.intersection(user_keywords))
+        if overlap > best_score:
+            best_score = overlap
+            best_match = protocol
+    
+    return best_match
+
+
+def make_library(size: int, rng: random.Random) -> List[Dict]:
+    """Protocols with 6-12 keywords and a few actions from a vocabulary that grows with the library"""
+    vocabulary = [f"symptom{i} sign{i % 97}" for i in range(max(50, size * 2))]
+    return [
+        {'id': f"protocol_{i}", 'name': f"Protocol {i}",
+         'keywords': rng.sample(vocabulary, rng.randint(6, 12)),
+         'protocol': {'immediate_actions': [f"check {word}" for word in rng.sample(vocabulary, 4)]}}
+        for i in range(size)
+    ]
+
+
+def run_benchmark():
+    rng = random.Random(7)
+
+    print(f"\n{'Protocols':<11} {'Legacy (µs)':<13} {'BM25 (µs)':<11} {'Speedup':<8}")
+    print("-" * 43)
+    for size in (10, 100, 1_000, 10_000):
+        library = make_library(size, rng)
+        index = ProtocolIndex({'section': library})
+        queries = [rng.choice(library)['keywords'][:3] + ['unrelated'] for _ in range(20)]
+        report = "we need help now, he says " + " and ".join(queries[0])
+        index.search('section', queries[0], report)  # builds the postings
+        number = max(1, 20_000 // size)
+
+        legacy = timeit.timeit(
+            lambda: [legacy_find_protocol(library, q) for q in queries], number=number
+        )
+        indexed = timeit.timeit(
+            lambda: [index.search('section', q, report) for q in queries], number=number
+        )
+
+        legacy_us = legacy / (number * len(queries)) * 1e6
+        indexed_us = indexed / (number * len(queries)) * 1e6
+        print(f"{size:<11,} {legacy_us:<13.1f} {indexed_us:<11.1f} {legacy_us / indexed_us:.1f}x")
+    print()
+
+
+if __name__ == "__main__":
+    run_benchmark()
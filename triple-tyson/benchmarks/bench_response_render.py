@@ -0,0 +1,143 @@
+"""
+Benchmark: crisis response rendering
+Compares the precompiled response templates with the previous renderer,
+which rebuilt every section of the text with += on each request, by time
+per response and by the tracemalloc peak of rendering one response.
+
+Run: python benchmarks/bench_response_render.py
+"""
+
+import sys
+import os
+import timeit
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from agents.coordinator_agent import CrisisCoordinator
+from storage.case_store import MemoryCaseStore
+
+
+def legacy_generate_response(classification: Dict, protocol: Optional[Dict],
+                             helplines: Dict, case: Dict) -> str:
+    """Previous _generate_response, kept verbatim for comparison"""
+    
+    severity_icons = {
+        'critical': '🚨',
+        'high': '⚠️',
+        'medium': '⚡',
+        'low': 'ℹ️'
+    }
+    
+    category_icons = {
+        'medical_emergency': '🏥',
+        'mental_health_crisis': '🧠',
+        'disaster_emergency': '🌍',
+        'other': '💬'
+    }
+    
+    severity = classification['severity']
+    category = classification['category']
+    
+    response = f"\n{severity_icons.get(severity, '⚠️')} {category_icons.get(category, '💬')} "
+    response += f"{category.replace('_', ' ').upper()} DETECTED - {severity.upper()} SEVERITY\n"
+    response += f"{'='*70}\n\n"
+    
+    # Add immediate actions from protocol
+    if protocol and 'protocol' in protocol:
+        response += "🔴 IMMEDIATE ACTIONS:\n"
+        actions = protocol['protocol'].get('immediate_actions', [])
+        for i, action in enumerate(actions[:6], 1):  # Limit to 6 actions
+            response += f"{i}. {action}\n"
+        response += "\n"
+    
+    # Add emergency helplines
+    if helplines.get('emergency_services'):
+        response += "📞 EMERGENCY CONTACTS:\n"
+        emergency = helplines['emergency_services']
+        if 'emergency' in emergency:
+            response += f"   Emergency Services: {emergency['emergency']}\n"
+        if 'suicide_prevention' in emergency:
+            response += f"   Suicide Prevention: {emergency['suicide_prevention']}\n"
+        if 'crisis_text' in emergency:
+            response += f"   Crisis Text Line: {emergency['crisis_text']}\n"
+        response += "\n"
+    
+    # Add protocol details
+    if protocol:
+        response += f"📋 Protocol: {protocol.get('name', 'General Crisis Response')}\n"
+        response += f"📚 Source: {protocol.get('source', 'Crisis Response Guidelines')}\n\n"
+    
+    # Add warnings if present
+    if protocol and 'protocol' in protocol and 'do_not' in protocol['protocol']:
+        response += "⛔ DO NOT:\n"
+        for warning in protocol['protocol']['do_not'][:4]:
+            response += f"   ✗ {warning}\n"
+        response += "\n"
+    
+    # Add case tracking info
+    response += f"📊 Case ID: {case['id']}\n"
+    response += f"⏰ Follow-up scheduled: {case['follow_up_scheduled'][:16]}\n"
+    response += f"🤖 Confidence: {classification.get('confidence', 0.8):.0%}\n\n"
+    
+    # Add disclaimer
+    response += "⚠️  IMPORTANT: This is an AI assistant. Always call emergency services for life-threatening situations.\n"
+    response += "   This system provides guidance but does NOT replace professional medical or crisis intervention.\n"
+    
+    return response
+
+
+SCENARIOS = {
+    'medical': ("My father is having severe chest pain and difficulty breathing", "USA"),
+    'mental': ("I'm having a panic attack and can't calm down", "UK"),
+    'disaster': ("Earthquake just hit, building is shaking violently", "India"),
+    'other': ("please send someone to help", "Narnia"),
+}
+
+
+def peak_bytes(render: Callable[[], str]) -> int:
+    """Peak memory traced while rendering one response, output included"""
+    render()  # warm the template memo
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        render()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak - before
+
+
+def run_benchmark():
+    coordinator = CrisisCoordinator(case_store=MemoryCaseStore())
+    snapshot = coordinator.catalog.current()
+
+    print(f"\n{'Scenario':<10} {'Chars':<7} {'Legacy (µs)':<13} {'Templates (µs)':<16} {'Speedup':<9} "
+          f"{'Peak bytes legacy / templates':<30}")
+    print("-" * 85)
+    for scenario, (report, country) in SCENARIOS.items():
+        classification = coordinator._fallback_classification(report, country)
+        protocol = coordinator.get_relevant_protocol(classification, report, snapshot)
+        helplines = coordinator.get_helplines(classification, snapshot)
+        case = {'id': 'CASE-0001', 'follow_up_scheduled': datetime.now().isoformat()}
+
+        def legacy():
+            return legacy_generate_response(classification, protocol, helplines, case)
+
+        def templates():
+            return coordinator._generate_response(classification, protocol, helplines, case, snapshot)
+
+        assert legacy() == templates()
+        number = 20_000
+        legacy_us = timeit.timeit(legacy, number=number) / number * 1e6
+        templates_us = timeit.timeit(templates, number=number) / number * 1e6
+        print(f"{scenario:<10} {len(legacy()):<7} {legacy_us:<13.2f} {templates_us:<16.2f} "
+              f"{legacy_us / templates_us:<9.1f}{peak_bytes(legacy):,} / {peak_bytes(templates):,}")
+    print(f"\nTemplate memo: {snapshot.response_templates.stats()}\n")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,97 @@
+"""
+Async Model Access
+Non-blocking Gemini calls with a process-wide concurrency limit
+Demonstrates: Asyncio semaphores, async/sync API bridging
+"""
+
+import asyncio
+import os
+import weakref
+from typing import Optional
+
+from agents.circuit_breaker import CircuitBreaker, default_breaker
+
+
+class ModelLimiter:
+    """
+    Bounds concurrent model requests across every agent in the process:
+    1. `async with limiter:` (or acquire() / release()) waits for one of
+       `limit` request slots
+    2. One semaphore per event loop, since asyncio primitives are bound to
+       the loop that first uses them
+    3. `in_flight` / `waiting` counters for /health
+    """
+
+    def __init__(self, limit: int = 64):
+        self.limit = limit
+        self.in_flight = 0
+        self.waiting = 0
+        self._semaphores = weakref.WeakKeyDictionary()
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.limit)
+        return semaphore
+
+    async def acquire(self):
+        """Wait for a request slot"""
+        self.waiting += 1
+        try:
+            await self._semaphore().acquire()
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+
+    def release(self):
+        self.in_flight -= 1
+        self._semaphore().release()
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.release()
+
+    def stats(self):
+        return {'limit': self.limit, 'in_flight': self.in_flight, 'waiting': self.waiting}
+
+
+# Process-wide cap on in-flight async Gemini calls (LLM_CONCURRENCY, default 64)
+default_limiter = ModelLimiter(int(os.getenv('LLM_CONCURRENCY', 64)))
+
+
+async def generate_content_async(model, prompt: str, limiter: ModelLimiter = default_limiter,
+                                 timeout: Optional[float] = None,
+                                 breaker: CircuitBreaker = default_breaker):
+    """
+    Await model.generate_content(prompt) without blocking the event loop
+
+    Uses the model's native async API when it has one, otherwise runs the
+    blocking call in a worker thread. timeout covers waiting for a limiter
+    slot too; asyncio.TimeoutError is raised when it runs out. Raises
+    CircuitOpenError at once, without queueing, while the breaker is open.
+
+    The breaker only sees the call itself: time queued behind other
+    requests is neither latency nor a failure of the model.
+    """
+    breaker.check()
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    await asyncio.wait_for(limiter.acquire(), timeout)
+    try:
+        remaining = None if timeout is None else timeout - (loop.time() - started)
+        if remaining is not None and remaining <= 0:
+            raise asyncio.TimeoutError("timed out waiting for a model request slot")
+        with breaker.guard():
+            return await asyncio.wait_for(_generate(model, prompt), remaining)
+    finally:
+        limiter.release()
+
+
+async def _generate(model, prompt: str):
+    if hasattr(model, 'generate_content_async'):
+        return await model.generate_content_async(prompt)
+    return await asyncio.to_thread(model.generate_content, prompt)
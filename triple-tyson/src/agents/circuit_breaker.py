@@ -0,0 +1,144 @@
+"""
+Circuit Breaker
+Stops calling Gemini while it is failing or slow, so requests fall back at local latency
+Demonstrates: Closed / open / half-open state machine, sliding-window failure rates
+"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling the model while the circuit is open"""
+
+
+class CircuitBreaker:
+    """
+    Shared breaker for every model call in the process:
+    1. Closed: calls go through; the last `window` outcomes are tracked and
+       the circuit opens once at least `min_calls` were seen and the share
+       of failed or slow (> slow_call_seconds) calls reaches failure_rate
+    2. Open: calls fail fast with CircuitOpenError for open_seconds
+    3. Half-open: up to `probes` trial calls go through; a success closes
+       the circuit, a failure opens it again
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_rate: float = 0.5, slow_call_seconds: float = 5.0,
+                 window: int = 20, min_calls: int = 5, open_seconds: float = 30.0,
+                 probes: int = 1):
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.probes = probes
+
+        self.state = self.CLOSED
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self.rejected = 0
+        self._outcomes = deque(maxlen=window)  # True = failed or slow
+        self._probes_in_flight = 0
+        self._lock = threading.Lock()
+
+    def check(self):
+        """Raise CircuitOpenError while the circuit is open, without admitting a call"""
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self.opened_at < self.open_seconds:
+                self.rejected += 1
+                raise CircuitOpenError("model circuit is open")
+
+    def before_call(self):
+        """Admit a call or raise CircuitOpenError"""
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.open_seconds:
+                    self.rejected += 1
+                    raise CircuitOpenError("model circuit is open")
+                self.state = self.HALF_OPEN
+                self._probes_in_flight = 0
+
+            if self.state == self.HALF_OPEN:
+                if self._probes_in_flight >= self.probes:
+                    self.rejected += 1
+                    raise CircuitOpenError("model circuit is half-open, probe in flight")
+                self._probes_in_flight += 1
+
+    def after_call(self, failed: bool, latency: float):
+        """Record the outcome of an admitted call"""
+        bad = failed or latency > self.slow_call_seconds
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self._probes_in_flight -= 1
+                if bad:
+                    self._open()
+                else:
+                    self.state = self.CLOSED
+                    self._outcomes.clear()
+                return
+
+            self._outcomes.append(bad)
+            if self.state == self.CLOSED and len(self._outcomes) >= self.min_calls and \
+                    sum(self._outcomes) / len(self._outcomes) >= self.failure_rate:
+                self._open()
+
+    def reset(self):
+        """Close the circuit and forget recent outcomes"""
+        with self._lock:
+            self.state = self.CLOSED
+            self._outcomes.clear()
+            self._probes_in_flight = 0
+
+    def _open(self):
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+        self.times_opened += 1
+        self._outcomes.clear()
+
+    @contextmanager
+    def guard(self):
+        """
+        Wrap one model call (works around sync calls and awaits alike):
+
+            with breaker.guard():
+                response = model.generate_content(prompt)
+        """
+        self.before_call()
+        started = time.monotonic()
+        failed = True
+        try:
+            yield
+            failed = False
+        finally:
+            self.after_call(failed, time.monotonic() - started)
+
+    def stats(self) -> Dict:
+        """State and counters for /health"""
+        with self._lock:
+            outcomes = list(self._outcomes)
+            state = self.state
+            if state == self.OPEN and time.monotonic() - self.opened_at >= self.open_seconds:
+                state = self.HALF_OPEN  # next call will probe
+        return {
+            'state': state,
+            'recent_calls': len(outcomes),
+            'recent_failure_rate': round(sum(outcomes) / len(outcomes), 3) if outcomes else 0.0,
+            'times_opened': self.times_opened,
+            'rejected_calls': self.rejected,
+        }
+
+
+# One circuit per process: an outage seen by any agent stops every agent's
+# single-report Gemini calls until a probe succeeds after open_seconds
+default_breaker = CircuitBreaker()
+
+# Bulk classification (classify_many): batch prompts legitimately take longer
+# than single reports, and a failing bulk import must not open the circuit
+# for live /detect traffic
+default_batch_breaker = CircuitBreaker(slow_call_seconds=60.0)
@@ -4,11 +4,94 @@ Main orchestrator that classifies crises and delegates to specialist agents
 Demonstrates: Multi-agent orchestration, prompt engineering, state management
 """
 
+import asyncio
+import copy
 import json
 import os
-from datetime import datetime
-from typing import Dict, List, Optional, Tuple
-import google.generativeai as genai
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple, Union
+
+# Add src to path, so the demo below also runs as a script
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from agents.async_llm import ModelLimiter, default_limiter, generate_content_async
+from agents.circuit_breaker import CircuitBreaker, default_batch_breaker, default_breaker
+from agents.deadline import Deadline, default_budget, generate_within
+from agents.model_registry import LazyModel, ModelRegistry, default_registry
+from agents.singleflight import SingleFlight
+from classification.cache import ClassificationCache, open_classification_cache
+from classification.keyword_matcher import PROTOCOL_SECTIONS, FallbackKeywordMatcher
+from followups import FollowUpIndex, follow_up_payload
+from retrieval.catalog import Catalog, CatalogSnapshot, shared_catalog
+from retrieval.protocol_index import ProtocolIndex
+from storage.case_store import CaseStore, open_case_store
+
+if TYPE_CHECKING:
+    # NumPy-backed; imported on first use so it stays off the cold-start path
+    from classification.linear_model import LinearCrisisClassifier
+
+
+VALID_CATEGORIES = ('medical_emergency', 'mental_health_crisis', 'disaster_emergency', 'other')
+VALID_SEVERITIES = ('critical', 'high', 'medium', 'low')
+
+# Tiered mode answers curated keyword matches of these severities before Gemini
+TIERED_SEVERITIES = ('critical', 'high')
+
+# classify_many packs at most this many reports / characters of report text per call
+BATCH_MAX_REPORTS = 20
+BATCH_MAX_CHARS = 8000
+
+BATCH_CLASSIFICATION_PROMPT = """You are a crisis classification expert. Classify each of the {count} numbered crisis reports below.
+
+Categories (choose ONE per report):
+1. medical_emergency (heart attack, stroke, severe bleeding, choking, etc.)
+2. mental_health_crisis (panic attack, suicidal thoughts, PTSD, severe anxiety)
+3. disaster_emergency (earthquake, flood, fire, hurricane, etc.)
+4. other (general distress, non-emergency)
+
+Severity:
+- critical (immediate life threat, requires emergency services NOW)
+- high (serious situation, needs urgent attention)
+- medium (concerning but not immediately life-threatening)
+- low (general support needed)
+
+Respond with ONLY a JSON array containing one object per report, in this EXACT format:
+[
+    {{"index": 1, "category": "medical_emergency|mental_health_crisis|disaster_emergency|other", "severity": "critical|high|medium|low", "keywords": ["keyword1", "keyword2"], "confidence": 0.0-1.0, "reasoning": "brief explanation"}}
+]
+
+Example for the reports 1. "My father is having chest pain and can't breathe" and 2. "Earthquake just hit, building shaking":
+[
+    {{"index": 1, "category": "medical_emergency", "severity": "critical", "keywords": ["chest pain", "breathing difficulty"], "confidence": 0.95, "reasoning": "Potential cardiac emergency"}},
+    {{"index": 2, "category": "disaster_emergency", "severity": "high", "keywords": ["earthquake", "building shaking"], "confidence": 0.98, "reasoning": "Active seismic event"}}
+]
+
+Reports:
+{reports}
+
+Output:"""
+
+
+@dataclass
+class CrisisResult:
+    """Outcome of handling one crisis report"""
+    case_id: str
+    classification: Dict
+    protocol: Optional[Dict]
+    helplines: Dict
+    follow_up_scheduled: str
+    # Formatted text; None when the caller asked for structured data only
+    response: Optional[str]
+    # Pipeline stages that fell back to local logic (e.g. 'classification')
+    degraded: List[str] = field(default_factory=list)
+    # Tiered mode: answered from keywords, Gemini refinement still running
+    refining: bool = False
+    # Protocol / helpline catalog version the response was built from
+    catalog_version: Optional[str] = None
 
 
 class CrisisCoordinator:
@@ -20,94 +103,238 @@ class CrisisCoordinator:
     4. Maintains case state and follow-up schedules
     """
     
-    def __init__(self, api_key: Optional[str] = None):
+    # Gemini model from the shared registry, created on first use (None in demo mode)
+    model = LazyModel('classification')
+    
+    def __init__(self, api_key: Optional[str] = None, cases_file: Optional[str] = None,
+                 case_store: Optional[CaseStore] = None,
+                 classification_cache: Optional[ClassificationCache] = None,
+                 limiter: Optional[ModelLimiter] = None,
+                 request_deadline: Optional[float] = None,
+                 breaker: Optional[CircuitBreaker] = None,
+                 batch_breaker: Optional[CircuitBreaker] = None,
+                 tiered: Optional[bool] = None,
+                 local_classifier: Optional['LinearCrisisClassifier'] = None,
+                 models: Optional[ModelRegistry] = None,
+                 catalog: Optional[Catalog] = None):
         """Initialize the coordinator with Gemini API"""
-        self.api_key = api_key or os.getenv('GOOGLE_API_KEY')
-        if self.api_key:
-            genai.configure(api_key=self.api_key)
-            self.model = genai.GenerativeModel('gemini-2.0-flash-exp')
-        else:
-            self.model = None
+        self.models = models or default_registry
+        self.models.use_api_key(api_key)
+        if not self.models.configured:
             print("⚠️  Warning: No API key provided. Running in demo mode.")
-        
-        # Load crisis protocols and helplines
-        self.protocols = self._load_protocols()
-        self.helplines = self._load_helplines()
-        
-        # State management with persistent storage
-        self.cases_file = os.path.join(
-            os.path.dirname(__file__), '..', '..', 'cases.json'
+        # Bounds concurrent async Gemini calls (shared process-wide by default)
+        self.limiter = limiter or default_limiter
+        # Skips Gemini entirely during outages (shared process-wide by default)
+        self.breaker = breaker or default_breaker
+        # classify_many's batch calls get their own breaker and slow-call limit
+        self.batch_breaker = batch_breaker or default_batch_breaker
+        # End-to-end seconds per report (REQUEST_DEADLINE); None disables
+        self.request_deadline = request_deadline if request_deadline is not None else default_budget()
+        # Tiered mode (TIERED_CLASSIFICATION): confident keyword verdicts first,
+        # Gemini refines the stored case in the background
+        if tiered is None:
+            tiered = os.getenv('TIERED_CLASSIFICATION', 'false').lower() in ('1', 'true', 'yes')
+        self.tiered = tiered
+        # Refiner threads start on first submit, so non-tiered coordinators never spawn any
+        self._refiner = ThreadPoolExecutor(
+            max_workers=int(os.getenv('REFINE_WORKERS', 4)),
+            thread_name_prefix='classification-refiner'
         )
-        self.active_cases = {}
-        self.case_counter = 0
-        self._load_cases()
-        
-    def _load_protocols(self) -> Dict:
-        """Load crisis protocols from JSON file"""
-        try:
-            protocol_path = os.path.join(
-                os.path.dirname(__file__), 
-                '..', 'data', 'crisis_protocols.json'
-            )
-            with open(protocol_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            print("⚠️  Warning: Crisis protocols file not found")
-            return {}
-    
-    def _load_helplines(self) -> Dict:
-        """Load helpline database from JSON file"""
-        try:
-            helpline_path = os.path.join(
-                os.path.dirname(__file__), 
-                '..', 'data', 'helplines.json'
-            )
-            with open(helpline_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            print("⚠️  Warning: Helplines file not found")
-            return {}
-    
-    def _load_cases(self):
-        """Load existing cases from JSON file"""
-        try:
-            if os.path.exists(self.cases_file):
-                with open(self.cases_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    cases_list = data.get('cases', [])
-                    # Reconstruct active_cases dict
-                    for case in cases_list:
-                        self.active_cases[case['id']] = case
-                    # Update counter
-                    self.case_counter = data.get('metadata', {}).get('total_cases', 0)
-        except (FileNotFoundError, json.JSONDecodeError):
-            # File doesn't exist or is invalid, start fresh
-            pass
-    
-    def _save_cases(self):
-        """Save cases to JSON file"""
+        # Running refinements: added on request threads, removed from their callbacks
+        self._refinements = set()
+        self._refinements_lock = threading.Lock()
+        
+        # Crisis protocols and helplines with their indexes: one hot-reloaded
+        # catalog shared with the specialists (see the properties below)
+        self.catalog = catalog or shared_catalog()
+        # Fallback keyword tables, compiled once
+        self.keyword_matcher = FallbackKeywordMatcher()
+        
+        # Repeated reports reuse earlier Gemini classifications
+        if classification_cache is None:
+            classification_cache = open_classification_cache()
+        self.classification_cache = classification_cache
+        # Concurrent identical reports share one in-flight Gemini classification
+        self.in_flight = SingleFlight()
+        
+        # Local statistical classifier (LOCAL_MODEL) answers confident reports
+        # without Gemini; LOCAL_MODEL_THRESHOLD is the calibrated confidence needed.
+        # Loaded on first use, keeping NumPy out of worker start-up
+        self._local_classifier = local_classifier
+        self._local_classifier_loaded = local_classifier is not None
+        self._local_classifier_lock = threading.Lock()
+        # Set once warm_up() has loaded everything the first report would wait for
+        self.warmed = threading.Event()
+        self.local_threshold = float(os.getenv('LOCAL_MODEL_THRESHOLD', 0.75))
+        
+        # State management with persistent storage (CASE_STORE selects the backend)
+        # (an empty store is falsy as a Mapping, so test for None explicitly)
+        self.store = case_store if case_store is not None else open_case_store(path=cases_file)
+        # A shared store (several workers) answers follow-up queries itself; the
+        # heap then only holds this worker's new cases, to wake its dispatcher
+        self.follow_ups = FollowUpIndex() if self.store.shared else FollowUpIndex.from_store(self.store)
+        
+    @property
+    def local_classifier(self) -> Optional['LinearCrisisClassifier']:
+        """LOCAL_MODEL classifier, loaded on first access (None if not configured)"""
+        if not self._local_classifier_loaded:
+            with self._local_classifier_lock:
+                if not self._local_classifier_loaded:
+                    from classification.linear_model import load_local_classifier
+                    self._local_classifier = load_local_classifier()
+                    self._local_classifier_loaded = True
+        return self._local_classifier
+    
+    @local_classifier.setter
+    def local_classifier(self, classifier: Optional['LinearCrisisClassifier']):
+        self._local_classifier = classifier
+        self._local_classifier_loaded = True
+    
+    def warm_up(self):
+        """
+        Load what start-up leaves lazy, so the first report does not wait for it:
+        the Gemini SDK and model, NumPy with the retrieval postings, and the
+        LOCAL_MODEL classifier
+        """
         try:
-            data = {
-                'cases': list(self.active_cases.values()),
-                'metadata': {
-                    'total_cases': self.case_counter,
-                    'last_updated': datetime.now().isoformat(),
-                    'version': '1.0'
-                }
-            }
-            with open(self.cases_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            self.model  # resolves the lazy Gemini model, importing the SDK
+            self.protocol_index.warm()
+            self.local_classifier  # loads the LOCAL_MODEL file with NumPy
         except Exception as e:
-            print(f"⚠️  Warning: Could not save cases: {e}")
+            print(f"⚠️  Warning: Warm-up failed, loading on first use instead: {e}")
+        finally:
+            self.warmed.set()
+    
+    def start_warm_up(self) -> threading.Thread:
+        """Run warm_up() in a background thread, leaving start-up and /health fast"""
+        thread = threading.Thread(target=self.warm_up, name='coordinator-warm-up', daemon=True)
+        thread.start()
+        return thread
+    
+    @property
+    def protocols(self) -> Dict:
+        """Crisis protocols of the current catalog snapshot"""
+        return self.catalog.current().protocols
+    
+    @property
+    def helplines(self) -> Dict:
+        """Helpline database of the current catalog snapshot"""
+        return self.catalog.current().helplines
+    
+    @property
+    def protocol_index(self) -> ProtocolIndex:
+        return self.catalog.current().protocol_index
     
-    def classify_crisis(self, user_input: str, country: str = "USA") -> Dict:
+    @property
+    def active_cases(self) -> CaseStore:
+        """Read-only mapping of case ID -> case record"""
+        return self.store
+    
+    @property
+    def case_counter(self) -> int:
+        """Number of cases created so far"""
+        return self.store.counter
+    
+    def classify_crisis(self, user_input: str, country: str = "USA",
+                        deadline: Optional[Deadline] = None) -> Dict:
         """
         Classify the crisis type and severity using Gemini
         
         ADK Concept: Advanced Prompt Engineering with few-shot examples
+        Falls back to keywords if Gemini fails or overruns the deadline.
         """
+        # Repeated reports skip the model round trip
+        cache = self.classification_cache if self.model else None
+        if cache is not None:
+            cached = cache.get(user_input, country)
+            if cached is not None:
+                return cached
+        
+        if self.model:
+            local = self._local_classification([(user_input, country)])[0]
+            if local is not None:
+                return local
+            try:
+                # Identical reports already waiting on Gemini share that call
+                return self.in_flight.do(
+                    ClassificationCache.key(user_input, country),
+                    lambda: self._accept_classification(
+                        generate_within(self.model, self._classification_prompt(user_input),
+                                        deadline, 'classification', self.breaker).text,
+                        user_input, country
+                    ),
+                    deadline.remaining() if deadline else None
+                )
+            except Exception as e:
+                print(f"⚠️  Classification error: {e!r}")
+                if deadline:
+                    deadline.degrade('classification')
+                return self._fallback_classification(user_input, country)
+        else:
+            return self._fallback_classification(user_input, country)
+    
+    async def classify_crisis_async(self, user_input: str, country: str = "USA",
+                                    deadline: Optional[Deadline] = None) -> Dict:
+        """classify_crisis that awaits Gemini instead of blocking a worker thread"""
+        cache = self.classification_cache if self.model else None
+        if cache is not None:
+            cached = cache.get(user_input, country)
+            if cached is not None:
+                return cached
         
-        classification_prompt = f"""You are a crisis classification expert. Analyze the following crisis report and classify it.
+        if self.model:
+            local = self._local_classification([(user_input, country)])[0]
+            if local is not None:
+                return local
+            timeout = deadline.remaining() if deadline else None
+            try:
+                if timeout == 0:
+                    raise TimeoutError("no time left for classification")
+                return await self.in_flight.do_async(
+                    ClassificationCache.key(user_input, country),
+                    lambda: self._model_classification_async(user_input, country, timeout),
+                    timeout
+                )
+            except Exception as e:
+                print(f"⚠️  Classification error: {e!r}")
+                if deadline:
+                    deadline.degrade('classification')
+                return self._fallback_classification(user_input, country)
+        else:
+            return self._fallback_classification(user_input, country)
+    
+    async def _model_classification_async(self, user_input: str, country: str,
+                                          timeout: Optional[float]) -> Dict:
+        response = await generate_content_async(
+            self.model, self._classification_prompt(user_input), self.limiter, timeout,
+            self.breaker
+        )
+        return self._accept_classification(response.text, user_input, country)
+    
+    def _local_classification(self, items: Sequence[Tuple[str, str]]) -> List[Optional[Dict]]:
+        """Local classifier verdicts for (text, country) items in one batch, None where not confident"""
+        if self.local_classifier is None or not items:
+            return [None] * len(items)
+        predictions = self.local_classifier.predict([user_input for user_input, _ in items])
+        verdicts = []
+        for (user_input, country), prediction in zip(items, predictions):
+            if prediction['confidence'] < self.local_threshold:
+                verdicts.append(None)
+                continue
+            verdicts.append({
+                "category": prediction['category'],
+                "severity": prediction['severity'],
+                "keywords": self.keyword_matcher.keywords_for(user_input, prediction['category']),
+                "confidence": round(prediction['confidence'], 2),
+                "reasoning": "Local model classification",
+                "country": country
+            })
+        return verdicts
+    
+    @staticmethod
+    def _classification_prompt(user_input: str) -> str:
+        """Few-shot prompt for classifying a single report"""
+        return f"""You are a crisis classification expert. Analyze the following crisis report and classify it.
 
 User Report: "{user_input}"
 
@@ -146,69 +373,171 @@ Output: {{"category": "disaster_emergency", "severity": "high", "keywords": ["ea
 Now classify this:
 Input: "{user_input}"
 Output:"""
-
-        if self.model:
-            try:
-                response = self.model.generate_content(classification_prompt)
-                # Extract JSON from response
-                response_text = response.text.strip()
-                # Remove markdown code blocks if present
-                if response_text.startswith('```'):
-                    response_text = response_text.split('```')[1]
-                    if response_text.startswith('json'):
-                        response_text = response_text[4:]
-                
-                classification = json.loads(response_text.strip())
-                classification['country'] = country
-                return classification
-            except Exception as e:
-                print(f"⚠️  Classification error: {e}")
-                return self._fallback_classification(user_input, country)
-        else:
-            return self._fallback_classification(user_input, country)
     
-    def _fallback_classification(self, user_input: str, country: str) -> Dict:
-        """Simple keyword-based classification fallback"""
-        user_lower = user_input.lower()
-        
-        # Medical keywords
-        medical_keywords = ['chest pain', 'heart attack', 'stroke', 'bleeding', 'choking', 
-                          'breathing', 'unconscious', 'seizure', 'broken bone']
+    def _accept_classification(self, response_text: str, user_input: str, country: str) -> Dict:
+        """Parse and validate a model classification and cache it (ValueError if invalid)"""
+        classification = self._validated(self._parse_model_json(response_text), country)
+        if classification is None:
+            raise ValueError("model classification lacks a valid category or severity")
+        # Only model answers are cached; fallbacks are cheap and may be transient
+        if self.classification_cache is not None:
+            self.classification_cache.put(user_input, country, classification)
+        return classification
+    
+    @staticmethod
+    def _validated(classification, country: str) -> Optional[Dict]:
+        """A model classification with a known category and severity, or None"""
+        if not isinstance(classification, dict) or \
+                classification.get('category') not in VALID_CATEGORIES or \
+                classification.get('severity') not in VALID_SEVERITIES:
+            return None
+        classification.setdefault('keywords', [])
+        classification['country'] = country
+        return classification
+    
+    @staticmethod
+    def _parse_model_json(response_text: str):
+        """Parse JSON from a model response, removing markdown code blocks if present"""
+        response_text = response_text.strip()
+        if response_text.startswith('```'):
+            response_text = response_text.split('```')[1]
+            if response_text.startswith('json'):
+                response_text = response_text[4:]
+        return json.loads(response_text.strip())
+    
+    def classify_many(self, reports: Sequence[Union[str, Tuple[str, str]]],
+                      country: str = "USA", max_batch_size: int = BATCH_MAX_REPORTS,
+                      max_batch_chars: int = BATCH_MAX_CHARS) -> List[Dict]:
+        """
+        Classify many reports, packing several into each Gemini call
         
-        # Mental health keywords
-        mental_keywords = ['suicide', 'kill myself', 'panic attack', 'panic', 'anxiety', 'anxious',
-                         'depressed', 'depression', 'self-harm', 'ptsd', 'trauma', 'want to die',
-                         'overwhelmed', 'stressed', 'mental health', 'nervous', 'worried',
-                         "don't want to live", 'no reason to live', 'hopeless']
+        reports: report texts (classified for `country`) or (text, country) pairs
+        Returns one classification per report, in order. Cached, duplicate and
+        confidently locally-classified reports cost no model call; any report
+        whose result is missing or malformed falls back to keyword
+        classification on its own.
+        """
+        items = [(report, country) if isinstance(report, str) else tuple(report)
+                 for report in reports]
+        results: List[Optional[Dict]] = [None] * len(items)
+        
+        if not self.model:
+            return [self._fallback_classification(text, item_country)
+                    for text, item_country in items]
+        
+        # Reports still needing the model, deduplicated: key -> positions
+        cache = self.classification_cache
+        pending: Dict[Tuple[str, str], List[int]] = {}
+        for position, (text, item_country) in enumerate(items):
+            key = ClassificationCache.key(text, item_country)
+            if key in pending:
+                pending[key].append(position)
+                continue
+            cached = cache.get(text, item_country) if cache is not None else None
+            if cached is not None:
+                results[position] = cached
+            else:
+                pending[key] = [position]
+        
+        # Confident local-classifier verdicts need no model call either
+        groups = list(pending.values())
+        verdicts = self._local_classification([items[positions[0]] for positions in groups])
+        for positions, verdict in zip(groups, verdicts):
+            if verdict is not None:
+                for position in positions:
+                    results[position] = copy.deepcopy(verdict)
+                del pending[ClassificationCache.key(*items[positions[0]])]
+        
+        for batch in self._pack_batches(list(pending.values()), items,
+                                        max_batch_size, max_batch_chars):
+            classifications = self._classify_batch([items[positions[0]] for positions in batch])
+            for positions, classification in zip(batch, classifications):
+                text, item_country = items[positions[0]]
+                if classification is None:
+                    classification = self._fallback_classification(text, item_country)
+                elif cache is not None:
+                    cache.put(text, item_country, classification)
+                results[positions[0]] = classification
+                for duplicate in positions[1:]:
+                    results[duplicate] = copy.deepcopy(classification)
+        
+        return results
+    
+    @staticmethod
+    def _pack_batches(groups: List[List[int]], items: List[Tuple[str, str]],
+                      max_batch_size: int, max_batch_chars: int) -> List[List[List[int]]]:
+        """Split report groups into batches bounded by count and total text length"""
+        batches = []
+        batch: List[List[int]] = []
+        batch_chars = 0
+        for positions in groups:
+            size = len(items[positions[0]][0])
+            if batch and (len(batch) >= max_batch_size or batch_chars + size > max_batch_chars):
+                batches.append(batch)
+                batch, batch_chars = [], 0
+            batch.append(positions)
+            batch_chars += size
+        if batch:
+            batches.append(batch)
+        return batches
+    
+    def _classify_batch(self, items: List[Tuple[str, str]]) -> List[Optional[Dict]]:
+        """One Gemini call for a batch; None for each report without a valid result"""
+        numbered = "\n".join(
+            f"{index}. {json.dumps(text, ensure_ascii=False)}"
+            for index, (text, _) in enumerate(items, 1)
+        )
+        prompt = BATCH_CLASSIFICATION_PROMPT.format(count=len(items), reports=numbered)
         
-        # Disaster keywords
-        disaster_keywords = ['earthquake', 'flood', 'fire', 'hurricane', 'tornado', 
-                           'tsunami', 'explosion', 'building collapse']
+        results: List[Optional[Dict]] = [None] * len(items)
+        try:
+            response = generate_within(self.model, prompt, None, 'classification', self.batch_breaker)
+            parsed = self._parse_model_json(response.text)
+        except Exception as e:
+            print(f"⚠️  Batch classification error: {e}")
+            return results
+        
+        for entry in parsed if isinstance(parsed, list) else []:
+            if not isinstance(entry, dict):
+                continue
+            index = entry.pop('index', None)
+            if not isinstance(index, int) or not 1 <= index <= len(items):
+                continue
+            results[index - 1] = self._validated(entry, items[index - 1][1])
+        return results
+    
+    def _fallback_classification(self, user_input: str, country: str) -> Dict:
+        """Simple keyword-based classification fallback (one pass over the input)"""
+        return self._keyword_classification(self.keyword_matcher.match(user_input), country)
+    
+    def _keyword_classification(self, match: Dict, country: str) -> Dict:
+        """Classification for a keyword matcher result"""
+        category = match['category']
         
-        if any(kw in user_lower for kw in medical_keywords):
+        if category == 'medical_emergency':
             return {
                 "category": "medical_emergency",
                 "severity": "critical",
-                "keywords": [kw for kw in medical_keywords if kw in user_lower],
+                "keywords": match['keywords'],
                 "confidence": 0.75,
                 "reasoning": "Keyword-based medical classification",
                 "country": country
             }
-        elif any(kw in user_lower for kw in mental_keywords):
-            severity = "critical" if any(kw in user_lower for kw in ['suicide', 'kill myself']) else "medium"
+        elif category == 'mental_health_crisis':
+            severity = "critical" if match['critical'] else "medium"
             return {
                 "category": "mental_health_crisis",
                 "severity": severity,
-                "keywords": [kw for kw in mental_keywords if kw in user_lower],
+                "keywords": match['keywords'],
                 "confidence": 0.75,
                 "reasoning": "Keyword-based mental health classification",
                 "country": country
             }
-        elif any(kw in user_lower for kw in disaster_keywords):
+        elif category == 'disaster_emergency':
             return {
                 "category": "disaster_emergency",
                 "severity": "high",
-                "keywords": [kw for kw in disaster_keywords if kw in user_lower],
+                "keywords": match['keywords'],
                 "confidence": 0.75,
                 "reasoning": "Keyword-based disaster classification",
                 "country": country
@@ -223,62 +552,32 @@ Output:"""
                 "country": country
             }
     
-    def get_relevant_protocol(self, classification: Dict) -> Optional[Dict]:
+    def get_relevant_protocol(self, classification: Dict, user_input: Optional[str] = None,
+                              snapshot: Optional[CatalogSnapshot] = None) -> Optional[Dict]:
         """
         Retrieve relevant crisis protocol based on classification
         
-        ADK Concept: RAG (Retrieval-Augmented Generation) - simplified version
-        In production, this would use vector embeddings and semantic search
+        ADK Concept: RAG (Retrieval-Augmented Generation) - BM25 over the
+        protocol library, queried with the extracted keywords and the report
         """
-        category = classification['category']
-        keywords = classification['keywords']
-        
-        # Map categories to protocol sections
-        protocol_map = {
-            'medical_emergency': 'medical_emergencies',
-            'mental_health_crisis': 'mental_health_crises',
-            'disaster_emergency': 'disaster_emergencies'
-        }
-        
-        protocol_section = protocol_map.get(category)
-        if not protocol_section or protocol_section not in self.protocols:
+        protocol_section = PROTOCOL_SECTIONS.get(classification['category'])
+        if not protocol_section:
             return None
         
-        # Find best matching protocol based on keywords
-        protocols = self.protocols[protocol_section]
-        best_match = None
-        best_score = 0
-        
-        for protocol in protocols:
-            # Calculate keyword overlap score
-            protocol_keywords = set(kw.lower() for kw in protocol.get('keywords', []))
-            user_keywords = set(kw.lower() for kw in keywords)
-            
-            overlap = len(protocol_keywords.intersection(user_keywords))
-            if overlap > best_score:
-                best_score = overlap
-                best_match = protocol
-        
-        return best_match
-    
-    def get_helplines(self, classification: Dict) -> Dict:
-        """Get relevant helplines based on crisis type and country"""
-        country = classification.get('country', 'USA')
-        category = classification['category']
-        
-        helplines = {}
-        
-        # Get emergency services
-        if 'global_helplines' in self.helplines:
-            emergency = self.helplines['global_helplines'].get('emergency_services', {})
-            helplines['emergency_services'] = emergency.get(country, emergency.get('USA', {}))
-            
-            # Get category-specific helplines
-            if category == 'mental_health_crisis':
-                mental_health = self.helplines['global_helplines'].get('mental_health', {})
-                helplines['crisis_support'] = mental_health.get(country, mental_health.get('USA', []))
-        
-        return helplines
+        index = (snapshot or self.catalog.current()).protocol_index
+        return index.best(protocol_section, classification['keywords'], user_input)
+    
+    def get_helplines(self, classification: Dict,
+                      snapshot: Optional[CatalogSnapshot] = None) -> Dict:
+        """
+        Get relevant helplines based on crisis type and country
+        
+        One lookup in the catalog's precomputed bundles; country names, aliases
+        and ISO codes are accepted ('US', 'india', 'United Kingdom'). The bundle
+        is shared, so treat it as read-only.
+        """
+        resolver = (snapshot or self.catalog.current()).helpline_resolver
+        return resolver.resolve(classification.get('country'), classification['category'])
     
     def handle_crisis(self, user_input: str, country: str = "USA") -> str:
         """
@@ -286,47 +585,188 @@ Output:"""
         
         ADK Concept: Multi-agent orchestration and state management
         """
+        return self.process_crisis(user_input, country).response
+    
+    def process_crisis(self, user_input: str, country: str = "USA",
+                       deadline: Optional[Deadline] = None, render: bool = True) -> CrisisResult:
+        """
+        Handle a crisis report and return the created case alongside the response
+        
+        render=False skips formatting the response text (result.response is None)
+        for callers that only use the structured fields.
+        """
+        deadline = deadline or self.new_deadline()
+        
+        # Tiered mode: respond from a confident keyword match, refine with Gemini later
+        verdict = self._tiered_verdict(user_input, country)
+        if verdict is not None:
+            result = self._respond(user_input, verdict, deadline, refining=True, render=render)
+            self._track(self._refiner.submit(self._refine_case, result.case_id, user_input, country))
+            return result
+        
         # Step 1: Classify the crisis
-        classification = self.classify_crisis(user_input, country)
+        classification = self.classify_crisis(user_input, country, deadline)
+        return self._respond(user_input, classification, deadline, render=render)
+    
+    async def handle_crisis_async(self, user_input: str, country: str = "USA") -> str:
+        """handle_crisis for asyncio callers"""
+        return (await self.process_crisis_async(user_input, country)).response
+    
+    async def process_crisis_async(self, user_input: str, country: str = "USA",
+                                   deadline: Optional[Deadline] = None,
+                                   render: bool = True) -> CrisisResult:
+        """
+        process_crisis for asyncio callers
+        
+        Gemini is awaited; the case store I/O and the protocol, helpline and
+        response steps run in a worker thread so they never block the loop.
+        """
+        deadline = deadline or self.new_deadline()
+        
+        verdict = self._tiered_verdict(user_input, country)
+        if verdict is not None:
+            result = await asyncio.to_thread(self._respond, user_input, verdict, deadline,
+                                             refining=True, render=render)
+            self._track(asyncio.ensure_future(self._refine_case_async(result.case_id, user_input, country)))
+            return result
+        
+        classification = await self.classify_crisis_async(user_input, country, deadline)
+        return await asyncio.to_thread(self._respond, user_input, classification, deadline, render=render)
+    
+    def _tiered_verdict(self, user_input: str, country: str) -> Optional[Dict]:
+        """Keyword classification confident enough to answer before Gemini, in tiered mode"""
+        if not (self.tiered and self.model):
+            return None
+        classification = self._keyword_classification(self.keyword_matcher.match(user_input), country)
+        return classification if classification['severity'] in TIERED_SEVERITIES else None
+    
+    def _track(self, refinement):
+        """Keep a reference to a running refinement until it finishes"""
+        with self._refinements_lock:
+            self._refinements.add(refinement)
+        refinement.add_done_callback(self._untrack)
+    
+    def _untrack(self, refinement):
+        with self._refinements_lock:
+            self._refinements.discard(refinement)
+    
+    def _refine_case(self, case_id: str, user_input: str, country: str):
+        """Background Gemini classification for a case answered from keywords"""
+        deadline = Deadline(self.request_deadline or 60.0)
+        try:
+            classification = self.classify_crisis(user_input, country, deadline)
+            self._apply_refinement(case_id, classification, not deadline.degraded)
+        except Exception as e:
+            print(f"⚠️  Warning: Could not refine {case_id}: {e}")
+    
+    async def _refine_case_async(self, case_id: str, user_input: str, country: str):
+        deadline = Deadline(self.request_deadline or 60.0)
+        try:
+            classification = await self.classify_crisis_async(user_input, country, deadline)
+            await asyncio.to_thread(self._apply_refinement, case_id, classification, not deadline.degraded)
+        except Exception as e:
+            print(f"⚠️  Warning: Could not refine {case_id}: {e}")
+    
+    def _apply_refinement(self, case_id: str, classification: Dict, succeeded: bool):
+        """Store Gemini's classification; reschedule the follow-up if severity changed"""
+        if not succeeded:
+            # Gemini unavailable: the keyword verdict stands
+            self.store.update(case_id, {'refinement': 'failed'})
+            return
+        
+        case = self.store.get(case_id)
+        if case is None:
+            return
+        
+        snapshot = self.catalog.current()
+        protocol = self.get_relevant_protocol(classification, case.get('user_input'), snapshot)
+        changes = {
+            'classification': classification,
+            'protocol_used': protocol.get('id') if protocol else None,
+            'catalog_version': snapshot.version,
+            'refinement': 'done'
+        }
+        reschedule = case['status'] == 'active' and \
+            classification['severity'] != case['classification']['severity']
+        if reschedule:
+            changes['follow_up_scheduled'] = self._calculate_follow_up(
+                classification['severity'], datetime.fromisoformat(case['timestamp'])
+            )
+        
+        self.store.update(case_id, changes)
+        if reschedule:
+            self.follow_ups.schedule(case_id, changes['follow_up_scheduled'])
+    
+    def wait_for_refinements(self, timeout: Optional[float] = None):
+        """Block until background refinements started by process_crisis finish"""
+        with self._refinements_lock:
+            running = [refinement for refinement in self._refinements
+                       if not isinstance(refinement, asyncio.Future)]
+        wait(running, timeout)
+    
+    def new_deadline(self) -> Optional[Deadline]:
+        """Fresh per-report deadline, or None if deadlines are disabled"""
+        return Deadline(self.request_deadline) if self.request_deadline else None
+    
+    def _respond(self, user_input: str, classification: Dict,
+                 deadline: Optional[Deadline] = None, refining: bool = False,
+                 render: bool = True) -> CrisisResult:
+        """Steps after classification: protocol, helplines, case record, response"""
+        # One catalog snapshot for the whole response, even if a reload lands meanwhile
+        snapshot = self.catalog.current()
         
         # Step 2: Retrieve relevant protocol (RAG)
-        protocol = self.get_relevant_protocol(classification)
+        protocol = self.get_relevant_protocol(classification, user_input, snapshot)
         
         # Step 3: Get helplines
-        helplines = self.get_helplines(classification)
+        helplines = self.get_helplines(classification, snapshot)
         
         # Step 4: Create case record (State Management)
-        case_id = self._create_case(user_input, classification, protocol)
-        
-        # Step 5: Generate response
-        response = self._generate_response(classification, protocol, helplines, case_id)
-        
-        return response
+        case = self._create_case(user_input, classification, protocol, refining, snapshot.version)
+        
+        # Step 5: Generate response (skipped for structured-only callers)
+        response = self._generate_response(classification, protocol, helplines, case, snapshot) \
+            if render else None
+        
+        return CrisisResult(
+            case_id=case['id'],
+            classification=classification,
+            protocol=protocol,
+            helplines=helplines,
+            follow_up_scheduled=case['follow_up_scheduled'],
+            response=response,
+            degraded=list(deadline.degraded) if deadline else [],
+            refining=refining,
+            catalog_version=snapshot.version
+        )
     
-    def _create_case(self, user_input: str, classification: Dict, protocol: Optional[Dict]) -> str:
+    def _create_case(self, user_input: str, classification: Dict, protocol: Optional[Dict],
+                     refining: bool = False, catalog_version: Optional[str] = None) -> Dict:
         """Create and store case record for follow-up tracking"""
-        self.case_counter += 1
-        case_id = f"CASE-{self.case_counter:05d}"
+        case_id = self.store.next_case_id()
         
-        self.active_cases[case_id] = {
+        case = {
             'id': case_id,
             'timestamp': datetime.now().isoformat(),
             'user_input': user_input,
             'classification': classification,
             'protocol_used': protocol.get('id') if protocol else None,
+            'catalog_version': catalog_version,
             'status': 'active',
             'follow_up_scheduled': self._calculate_follow_up(classification['severity'])
         }
+        if refining:
+            # Gemini will replace the keyword classification ('done' / 'failed')
+            case['refinement'] = 'pending'
         
         # Save to persistent storage
-        self._save_cases()
+        self.store.put(case)
+        self.follow_ups.schedule(case_id, case['follow_up_scheduled'])
         
-        return case_id
+        return case
     
-    def _calculate_follow_up(self, severity: str) -> str:
-        """Calculate when to follow up based on severity"""
-        from datetime import timedelta
-        
+    def _calculate_follow_up(self, severity: str, start: Optional[datetime] = None) -> str:
+        """Calculate when to follow up based on severity (from now, or from start)"""
         follow_up_times = {
             'critical': timedelta(hours=2),
             'high': timedelta(hours=6),
@@ -334,84 +774,47 @@ Output:"""
             'low': timedelta(days=3)
         }
         
-        follow_up = datetime.now() + follow_up_times.get(severity, timedelta(days=1))
+        follow_up = (start or datetime.now()) + follow_up_times.get(severity, timedelta(days=1))
         return follow_up.isoformat()
     
     def _generate_response(self, classification: Dict, protocol: Optional[Dict], 
-                          helplines: Dict, case_id: str) -> str:
-        """Generate formatted crisis response"""
-        
-        severity_icons = {
-            'critical': '🚨',
-            'high': '⚠️',
-            'medium': '⚡',
-            'low': 'ℹ️'
-        }
-        
-        category_icons = {
-            'medical_emergency': '🏥',
-            'mental_health_crisis': '🧠',
-            'disaster_emergency': '🌍',
-            'other': '💬'
-        }
-        
-        severity = classification['severity']
-        category = classification['category']
-        
-        response = f"\n{severity_icons.get(severity, '⚠️')} {category_icons.get(category, '💬')} "
-        response += f"{category.replace('_', ' ').upper()} DETECTED - {severity.upper()} SEVERITY\n"
-        response += f"{'='*70}\n\n"
-        
-        # Add immediate actions from protocol
-        if protocol and 'protocol' in protocol:
-            response += "🔴 IMMEDIATE ACTIONS:\n"
-            actions = protocol['protocol'].get('immediate_actions', [])
-            for i, action in enumerate(actions[:6], 1):  # Limit to 6 actions
-                response += f"{i}. {action}\n"
-            response += "\n"
-        
-        # Add emergency helplines
-        if helplines.get('emergency_services'):
-            response += "📞 EMERGENCY CONTACTS:\n"
-            emergency = helplines['emergency_services']
-            if 'emergency' in emergency:
-                response += f"   Emergency Services: {emergency['emergency']}\n"
-            if 'suicide_prevention' in emergency:
-                response += f"   Suicide Prevention: {emergency['suicide_prevention']}\n"
-            if 'crisis_text' in emergency:
-                response += f"   Crisis Text Line: {emergency['crisis_text']}\n"
-            response += "\n"
-        
-        # Add protocol details
-        if protocol:
-            response += f"📋 Protocol: {protocol.get('name', 'General Crisis Response')}\n"
-            response += f"📚 Source: {protocol.get('source', 'Crisis Response Guidelines')}\n\n"
-        
-        # Add warnings if present
-        if protocol and 'protocol' in protocol and 'do_not' in protocol['protocol']:
-            response += "⛔ DO NOT:\n"
-            for warning in protocol['protocol']['do_not'][:4]:
-                response += f"   ✗ {warning}\n"
-            response += "\n"
-        
-        # Add case tracking info
-        response += f"📊 Case ID: {case_id}\n"
-        response += f"⏰ Follow-up scheduled: {self.active_cases[case_id]['follow_up_scheduled'][:16]}\n"
-        response += f"🤖 Confidence: {classification.get('confidence', 0.8):.0%}\n\n"
-        
-        # Add disclaimer
-        response += "⚠️  IMPORTANT: This is an AI assistant. Always call emergency services for life-threatening situations.\n"
-        response += "   This system provides guidance but does NOT replace professional medical or crisis intervention.\n"
-        
-        return response
+                          helplines: Dict, case: Dict,
+                          snapshot: Optional[CatalogSnapshot] = None) -> str:
+        """Generate formatted crisis response from the catalog's precompiled templates"""
+        templates = (snapshot or self.catalog.current()).response_templates
+        return templates.render(classification, protocol, helplines, case)
     
     def get_case_status(self, case_id: str) -> Optional[Dict]:
         """Retrieve case information for follow-up"""
-        return self.active_cases.get(case_id)
+        return self.store.get(case_id)
     
     def list_active_cases(self) -> List[Dict]:
         """List all active cases"""
-        return list(self.active_cases.values())
+        return self.store.list_cases()
+    
+    def due_follow_ups(self, before: Optional[str] = None, limit: Optional[int] = None) -> List[Dict]:
+        """Follow-ups due at or before the ISO timestamp (default: now), earliest first"""
+        before = before or datetime.now().isoformat()
+        if self.store.shared:
+            # Other workers' cases are only in the store (indexed on status, follow-up time)
+            return [follow_up_payload(case) for case in self.store.due_follow_ups(before, limit=limit)]
+        due = []
+        for case_id, _ in self.follow_ups.due(before, limit):
+            case = self.store.get(case_id)
+            if case is not None:
+                due.append(follow_up_payload(case))
+        return due
+    
+    def scheduled_follow_ups(self) -> int:
+        """Number of active cases with a follow-up scheduled"""
+        if self.store.shared:
+            return self.store.count_follow_ups()
+        return len(self.follow_ups)
+    
+    def find_cases(self, status: Optional[str] = None, severity: Optional[str] = None,
+                   category: Optional[str] = None) -> List[Dict]:
+        """Find cases by status, severity and/or category"""
+        return self.store.find_cases(status=status, severity=severity, category=category)
 
 
 # Demo usage
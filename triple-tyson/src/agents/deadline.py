@@ -0,0 +1,58 @@
+"""
+Request Deadline
+End-to-end time budget for one crisis report, shared by its model calls
+Demonstrates: Deadline propagation, graceful degradation
+"""
+
+import os
+import time
+from typing import List, Optional
+
+from agents.circuit_breaker import CircuitBreaker, default_breaker
+
+
+def default_budget() -> Optional[float]:
+    """REQUEST_DEADLINE in seconds (default 10); 0 disables the deadline"""
+    budget = float(os.getenv('REQUEST_DEADLINE', 10))
+    return budget if budget > 0 else None
+
+
+class Deadline:
+    """
+    Time budget for one report:
+    1. A model call may take whatever is left of the budget (remaining());
+       the local steps around it (protocol lookup, helplines, case record,
+       response) take milliseconds and are not budgeted
+    2. Stages that fall back to local logic are recorded in `degraded`
+    """
+
+    def __init__(self, budget: float):
+        self.budget = budget
+        self.started = time.monotonic()
+        self.degraded: List[str] = []
+
+    def remaining(self) -> float:
+        """Seconds left (0 once the budget is spent)"""
+        return max(0.0, self.started + self.budget - time.monotonic())
+
+    def degrade(self, stage: str):
+        """Record that a stage fell back to its local path"""
+        if stage not in self.degraded:
+            self.degraded.append(stage)
+
+
+def generate_within(model, prompt: str, deadline: Optional[Deadline], stage: str,
+                    breaker: CircuitBreaker = default_breaker):
+    """
+    Blocking model.generate_content for a stage, bounded by the deadline
+
+    Raises TimeoutError without calling the model once the budget is spent,
+    and CircuitOpenError while the breaker is open.
+    """
+    timeout = deadline.remaining() if deadline else None
+    if timeout == 0:
+        raise TimeoutError(f"no time left for {stage}")
+    with breaker.guard():
+        if timeout is None:
+            return model.generate_content(prompt)
+        return model.generate_content(prompt, request_options={'timeout': timeout})
@@ -0,0 +1,102 @@
+"""
+Model Registry
+One lazily configured Gemini client shared by every agent in the process
+Demonstrates: Lazy initialization, shared client pools, per-task model selection
+"""
+
+import os
+import threading
+from typing import Dict, Optional
+
+DEFAULT_MODEL = 'gemini-2.0-flash-exp'
+
+
+class ModelRegistry:
+    """
+    Process-wide source of Gemini model handles:
+    1. The SDK is imported and configured on first use, and only once, so
+       every agent shares its client and upstream connection pool
+    2. One GenerativeModel per model name, created on first request
+    3. Model name per task from GEMINI_MODEL_<TASK> (e.g.
+       GEMINI_MODEL_CLASSIFICATION), else GEMINI_MODEL, else the default
+    """
+
+    def __init__(self, api_key: Optional[str] = None):
+        self._api_key = api_key
+        self._configured_key: Optional[str] = None
+        self._models: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def api_key(self) -> Optional[str]:
+        return self._api_key or os.getenv('GOOGLE_API_KEY')
+
+    @property
+    def configured(self) -> bool:
+        """Whether an API key is available (without initializing anything)"""
+        return bool(self.api_key)
+
+    def use_api_key(self, api_key: Optional[str]):
+        """Use a key passed explicitly to an agent for the whole process"""
+        if api_key:
+            self._api_key = api_key
+
+    @staticmethod
+    def model_name(task: Optional[str] = None) -> str:
+        if task:
+            name = os.getenv(f'GEMINI_MODEL_{task.upper()}')
+            if name:
+                return name
+        return os.getenv('GEMINI_MODEL', DEFAULT_MODEL)
+
+    def get(self, task: Optional[str] = None):
+        """Model for the task, or None without an API key (demo mode)"""
+        api_key = self.api_key
+        if not api_key:
+            return None
+        name = self.model_name(task)
+        model = self._models.get(name)
+        if model is not None and self._configured_key == api_key:
+            return model
+
+        with self._lock:
+            import google.generativeai as genai
+            if self._configured_key != api_key:
+                genai.configure(api_key=api_key)
+                self._configured_key = api_key
+                self._models.clear()
+            model = self._models.get(name)
+            if model is None:
+                model = self._models[name] = genai.GenerativeModel(name)
+            return model
+
+
+class LazyModel:
+    """
+    Agent attribute resolving to the registry's model for `task` on first
+    access; assigning it (e.g. a stub, or None for demo mode) overrides it
+    """
+
+    def __init__(self, task: str):
+        self.task = task
+
+    def __set_name__(self, owner, name):
+        self.attr = '_' + name
+
+    def __get__(self, agent, owner=None):
+        if agent is None:
+            return self
+        try:
+            return agent.__dict__[self.attr]
+        except KeyError:
+            model = agent.models.get(self.task)
+            if model is not None:
+                agent.__dict__[self.attr] = model
+            return model
+
+    def __set__(self, agent, value):
+        agent.__dict__[self.attr] = value
+
+
+# Agents built without a registry configure the SDK here, once per process
+default_registry = ModelRegistry()
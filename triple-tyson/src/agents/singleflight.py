@@ -0,0 +1,100 @@
+"""
+Singleflight
+Coalesces concurrent identical requests into one shared call
+Demonstrates: Request deduplication for threads and asyncio tasks
+"""
+
+import asyncio
+import copy
+import threading
+import weakref
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+class _Call:
+    """One in-flight call shared by a leader thread and its followers"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time:
+    1. The first caller for a key (the leader) runs the function
+    2. Callers arriving while it runs wait for and share its result (or
+       exception) instead of starting their own call
+    3. `executed` / `coalesced` count shared calls and collapsed callers
+
+    Followers receive deep copies, so callers may modify results freely.
+    do() serves threads, do_async() asyncio tasks; their calls are tracked
+    separately.
+    """
+
+    def __init__(self):
+        self.executed = 0
+        self.coalesced = 0
+        self._calls: Dict[Hashable, _Call] = {}
+        self._tasks = weakref.WeakKeyDictionary()  # event loop -> {key: Task}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[[], Any], timeout: Optional[float] = None) -> Any:
+        """Run fn() or join the identical call in flight; followers wait up to timeout"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+            else:
+                self.coalesced += 1
+
+        if leader:
+            try:
+                call.result = fn()
+                return call.result
+            except BaseException as e:
+                call.error = e
+                raise
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+
+        if not call.done.wait(timeout):
+            raise TimeoutError("timed out waiting for the shared call")
+        if call.error is not None:
+            raise call.error
+        return copy.deepcopy(call.result)
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Awaitable[Any]],
+                       timeout: Optional[float] = None) -> Any:
+        """
+        Await fn() or join the identical call in flight, waiting up to timeout
+
+        The shared call runs as its own task, so a caller timing out or
+        being cancelled does not cancel it for the others.
+        """
+        tasks = self._tasks.setdefault(asyncio.get_running_loop(), {})
+        task = tasks.get(key)
+        leader = task is None
+        if leader:
+            task = tasks[key] = asyncio.ensure_future(fn())
+            task.add_done_callback(lambda _: tasks.pop(key, None))
+            self.executed += 1
+        else:
+            self.coalesced += 1
+
+        result = await asyncio.wait_for(asyncio.shield(task), timeout)
+        return result if leader else copy.deepcopy(result)
+
+    def stats(self) -> Dict:
+        """Counters for /health"""
+        calls = self.executed + self.coalesced
+        return {
+            'executed': self.executed,
+            'coalesced': self.coalesced,
+            'coalesced_share': round(self.coalesced / calls, 3) if calls else 0.0,
+        }
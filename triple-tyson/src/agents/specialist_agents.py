@@ -4,10 +4,18 @@ Handles medical crises with specialized medical knowledge
 Demonstrates: Specialized agent behavior, tool use for medical databases
 """
 
-import json
 import os
+import sys
 from typing import Dict, List, Optional
-import google.generativeai as genai
+
+# Add src to path, so the demo below also runs as a script
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from agents.async_llm import ModelLimiter, default_limiter, generate_content_async
+from agents.circuit_breaker import CircuitBreaker, default_breaker
+from agents.deadline import Deadline, generate_within
+from agents.model_registry import LazyModel, ModelRegistry, default_registry
+from retrieval.catalog import Catalog, shared_catalog
 
 
 class MedicalEmergencyAgent:
@@ -16,49 +24,83 @@ class MedicalEmergencyAgent:
     Provides detailed medical emergency guidance
     """
     
-    def __init__(self, api_key: Optional[str] = None):
-        self.api_key = api_key or os.getenv('GOOGLE_API_KEY')
-        if self.api_key:
-            genai.configure(api_key=self.api_key)
-            self.model = genai.GenerativeModel('gemini-2.0-flash-exp')
-        else:
-            self.model = None
-        
-        self.protocols = self._load_medical_protocols()
+    model = LazyModel('medical_assessment')
     
-    def _load_medical_protocols(self) -> Dict:
-        """Load medical emergency protocols"""
-        try:
-            protocol_path = os.path.join(
-                os.path.dirname(__file__), 
-                '..', 'data', 'crisis_protocols.json'
-            )
-            with open(protocol_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                return data.get('medical_emergencies', [])
-        except FileNotFoundError:
-            return []
+    def __init__(self, api_key: Optional[str] = None, limiter: Optional[ModelLimiter] = None,
+                 breaker: Optional[CircuitBreaker] = None, models: Optional[ModelRegistry] = None,
+                 catalog: Optional[Catalog] = None):
+        self.models = models or default_registry
+        self.models.use_api_key(api_key)
+        self.limiter = limiter or default_limiter
+        self.breaker = breaker or default_breaker
+        
+        self.catalog = catalog or shared_catalog()
     
-    def assess_medical_emergency(self, symptoms: str, classification: Dict) -> Dict:
+    def assess_medical_emergency(self, symptoms: str, classification: Dict,
+                                 deadline: Optional[Deadline] = None) -> Dict:
         """
         Assess medical emergency and provide detailed guidance
         
-        Uses medical knowledge base and Gemini for assessment
+        Uses medical knowledge base and Gemini for assessment; the Gemini call
+        is bounded by what is left of the deadline
         """
         
         # Find matching protocol
-        protocol = self._find_protocol(classification.get('keywords', []))
+        protocol = self._find_protocol(classification.get('keywords', []), symptoms)
         
         if not protocol:
-            return {
-                'assessment': 'Unable to determine specific medical emergency',
-                'action': 'Call emergency services immediately: 911 (USA) / 108 (India)',
-                'protocol': None
-            }
+            return self._no_protocol_assessment()
         
         # Generate detailed assessment using Gemini
         if self.model:
-            assessment_prompt = f"""You are a medical emergency specialist AI. 
+            try:
+                response = generate_within(self.model, self._assessment_prompt(symptoms, protocol),
+                                           deadline, 'enrichment', self.breaker)
+                assessment = response.text.strip()
+            except:
+                if deadline:
+                    deadline.degrade('enrichment')
+                assessment = f"Potential {protocol.get('name')}. Immediate medical attention required."
+        else:
+            assessment = f"Potential {protocol.get('name')}. Immediate medical attention required."
+        
+        return self._assessment(assessment, protocol)
+    
+    async def assess_medical_emergency_async(self, symptoms: str, classification: Dict,
+                                             deadline: Optional[Deadline] = None) -> Dict:
+        """assess_medical_emergency that awaits Gemini instead of blocking"""
+        protocol = self._find_protocol(classification.get('keywords', []), symptoms)
+        
+        if not protocol:
+            return self._no_protocol_assessment()
+        
+        if self.model:
+            try:
+                response = await generate_content_async(
+                    self.model, self._assessment_prompt(symptoms, protocol), self.limiter,
+                    deadline.remaining() if deadline else None, self.breaker
+                )
+                assessment = response.text.strip()
+            except:
+                if deadline:
+                    deadline.degrade('enrichment')
+                assessment = f"Potential {protocol.get('name')}. Immediate medical attention required."
+        else:
+            assessment = f"Potential {protocol.get('name')}. Immediate medical attention required."
+        
+        return self._assessment(assessment, protocol)
+    
+    @staticmethod
+    def _no_protocol_assessment() -> Dict:
+        return {
+            'assessment': 'Unable to determine specific medical emergency',
+            'action': 'Call emergency services immediately: 911 (USA) / 108 (India)',
+            'protocol': None
+        }
+    
+    @staticmethod
+    def _assessment_prompt(symptoms: str, protocol: Dict) -> str:
+        return f"""You are a medical emergency specialist AI. 
 
 Symptoms reported: {symptoms}
 
@@ -70,15 +112,9 @@ Provide a brief assessment (2-3 sentences) explaining:
 3. What could happen if not treated quickly
 
 Keep response clear, calm, and actionable. Do NOT diagnose - only provide emergency guidance."""
-
-            try:
-                response = self.model.generate_content(assessment_prompt)
-                assessment = response.text.strip()
-            except:
-                assessment = f"Potential {protocol.get('name')}. Immediate medical attention required."
-        else:
-            assessment = f"Potential {protocol.get('name')}. Immediate medical attention required."
-        
+    
+    @staticmethod
+    def _assessment(assessment: str, protocol: Dict) -> Dict:
         return {
             'assessment': assessment,
             'protocol': protocol,
@@ -87,21 +123,9 @@ Keep response clear, calm, and actionable. Do NOT diagnose - only provide emerge
             'warnings': protocol.get('protocol', {}).get('do_not', [])
         }
     
-    def _find_protocol(self, keywords: List[str]) -> Optional[Dict]:
+    def _find_protocol(self, keywords: List[str], text: Optional[str] = None) -> Optional[Dict]:
         """Find best matching medical protocol"""
-        best_match = None
-        best_score = 0
-        
-        for protocol in self.protocols:
-            protocol_keywords = set(kw.lower() for kw in protocol.get('keywords', []))
-            user_keywords = set(kw.lower() for kw in keywords)
-            
-            overlap = len(protocol_keywords.intersection(user_keywords))
-            if overlap > best_score:
-                best_score = overlap
-                best_match = protocol
-        
-        return best_match
+        return self.catalog.current().protocol_index.best('medical_emergencies', keywords, text)
     
     def get_cpr_instructions(self) -> str:
         """Provide CPR instructions"""
@@ -137,49 +161,81 @@ class MentalHealthAgent:
     Provides empathetic, evidence-based mental health support
     """
     
-    def __init__(self, api_key: Optional[str] = None):
-        self.api_key = api_key or os.getenv('GOOGLE_API_KEY')
-        if self.api_key:
-            genai.configure(api_key=self.api_key)
-            self.model = genai.GenerativeModel('gemini-2.0-flash-exp')
-        else:
-            self.model = None
-        
-        self.protocols = self._load_mental_health_protocols()
+    model = LazyModel('mental_health_support')
     
-    def _load_mental_health_protocols(self) -> Dict:
-        """Load mental health crisis protocols"""
-        try:
-            protocol_path = os.path.join(
-                os.path.dirname(__file__), 
-                '..', 'data', 'crisis_protocols.json'
-            )
-            with open(protocol_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                return data.get('mental_health_crises', [])
-        except FileNotFoundError:
-            return []
+    def __init__(self, api_key: Optional[str] = None, limiter: Optional[ModelLimiter] = None,
+                 breaker: Optional[CircuitBreaker] = None, models: Optional[ModelRegistry] = None,
+                 catalog: Optional[Catalog] = None):
+        self.models = models or default_registry
+        self.models.use_api_key(api_key)
+        self.limiter = limiter or default_limiter
+        self.breaker = breaker or default_breaker
+        
+        self.catalog = catalog or shared_catalog()
     
-    def provide_support(self, user_input: str, classification: Dict) -> Dict:
+    def provide_support(self, user_input: str, classification: Dict,
+                        deadline: Optional[Deadline] = None) -> Dict:
         """
         Provide mental health crisis support
         
-        Uses empathetic language and evidence-based techniques
+        Uses empathetic language and evidence-based techniques; the Gemini
+        call is bounded by what is left of the deadline
         """
         
         # Find matching protocol
-        protocol = self._find_protocol(classification.get('keywords', []))
+        protocol = self._find_protocol(classification.get('keywords', []), user_input)
         
         # Check for suicidal ideation - highest priority
-        is_suicidal = any(kw in user_input.lower() for kw in 
-                         ['suicide', 'kill myself', 'end it all', 'want to die', 'no reason to live'])
-        
-        if is_suicidal:
+        if self._is_suicidal(user_input):
             return self._handle_suicidal_crisis(user_input, protocol)
         
         # Generate empathetic response
         if self.model and protocol:
-            support_prompt = f"""You are a compassionate mental health crisis counselor AI.
+            try:
+                response = generate_within(self.model, self._support_prompt(user_input, protocol),
+                                           deadline, 'enrichment', self.breaker)
+                empathetic_message = response.text.strip()
+            except:
+                if deadline:
+                    deadline.degrade('enrichment')
+                empathetic_message = "I hear you, and what you're feeling is valid. You're not alone in this."
+        else:
+            empathetic_message = "I hear you, and what you're feeling is valid. You're not alone in this."
+        
+        return self._support(empathetic_message, protocol)
+    
+    async def provide_support_async(self, user_input: str, classification: Dict,
+                                    deadline: Optional[Deadline] = None) -> Dict:
+        """provide_support that awaits Gemini instead of blocking"""
+        protocol = self._find_protocol(classification.get('keywords', []), user_input)
+        
+        if self._is_suicidal(user_input):
+            return self._handle_suicidal_crisis(user_input, protocol)
+        
+        if self.model and protocol:
+            try:
+                response = await generate_content_async(
+                    self.model, self._support_prompt(user_input, protocol), self.limiter,
+                    deadline.remaining() if deadline else None, self.breaker
+                )
+                empathetic_message = response.text.strip()
+            except:
+                if deadline:
+                    deadline.degrade('enrichment')
+                empathetic_message = "I hear you, and what you're feeling is valid. You're not alone in this."
+        else:
+            empathetic_message = "I hear you, and what you're feeling is valid. You're not alone in this."
+        
+        return self._support(empathetic_message, protocol)
+    
+    @staticmethod
+    def _is_suicidal(user_input: str) -> bool:
+        return any(kw in user_input.lower() for kw in
+                   ['suicide', 'kill myself', 'end it all', 'want to die', 'no reason to live'])
+    
+    @staticmethod
+    def _support_prompt(user_input: str, protocol: Dict) -> str:
+        return f"""You are a compassionate mental health crisis counselor AI.
 
 User is experiencing: {protocol.get('name')}
 User said: "{user_input}"
@@ -191,15 +247,8 @@ Provide a brief, empathetic response (3-4 sentences) that:
 4. Reminds them this is temporary
 
 Use warm, supportive language. Be concise and actionable."""
-
-            try:
-                response = self.model.generate_content(support_prompt)
-                empathetic_message = response.text.strip()
-            except:
-                empathetic_message = "I hear you, and what you're feeling is valid. You're not alone in this."
-        else:
-            empathetic_message = "I hear you, and what you're feeling is valid. You're not alone in this."
-        
+    
+    def _support(self, empathetic_message: str, protocol: Optional[Dict]) -> Dict:
         return {
             'empathetic_response': empathetic_message,
             'protocol': protocol,
@@ -228,21 +277,9 @@ Use warm, supportive language. Be concise and actionable."""
             ]
         }
     
-    def _find_protocol(self, keywords: List[str]) -> Optional[Dict]:
+    def _find_protocol(self, keywords: List[str], text: Optional[str] = None) -> Optional[Dict]:
         """Find best matching mental health protocol"""
-        best_match = None
-        best_score = 0
-        
-        for protocol in self.protocols:
-            protocol_keywords = set(kw.lower() for kw in protocol.get('keywords', []))
-            user_keywords = set(kw.lower() for kw in keywords)
-            
-            overlap = len(protocol_keywords.intersection(user_keywords))
-            if overlap > best_score:
-                best_score = overlap
-                best_match = protocol
-        
-        return best_match
+        return self.catalog.current().protocol_index.best('mental_health_crises', keywords, text)
     
     def _get_crisis_resources(self) -> Dict:
         """Get mental health crisis resources"""
@@ -266,27 +303,15 @@ class DisasterResponseAgent:
     Provides disaster-specific safety protocols
     """
     
-    def __init__(self, api_key: Optional[str] = None):
-        self.api_key = api_key or os.getenv('GOOGLE_API_KEY')
-        self.protocols = self._load_disaster_protocols()
-    
-    def _load_disaster_protocols(self) -> Dict:
-        """Load disaster response protocols"""
-        try:
-            protocol_path = os.path.join(
-                os.path.dirname(__file__), 
-                '..', 'data', 'crisis_protocols.json'
-            )
-            with open(protocol_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                return data.get('disaster_emergencies', [])
-        except FileNotFoundError:
-            return []
+    def __init__(self, api_key: Optional[str] = None, *, catalog: Optional[Catalog] = None):
+        # Guidance comes straight from the protocols; no model is needed, so
+        # api_key is accepted like the other agents' but unused
+        self.catalog = catalog or shared_catalog()
     
     def provide_disaster_guidance(self, disaster_type: str, classification: Dict) -> Dict:
         """Provide disaster-specific safety guidance"""
         
-        protocol = self._find_protocol(classification.get('keywords', []))
+        protocol = self._find_protocol(classification.get('keywords', []), disaster_type)
         
         if not protocol:
             return {
@@ -304,21 +329,13 @@ class DisasterResponseAgent:
             'warnings': protocol.get('protocol', {}).get('do_not', [])
         }
     
-    def _find_protocol(self, keywords: List[str]) -> Optional[Dict]:
+    async def provide_disaster_guidance_async(self, disaster_type: str, classification: Dict) -> Dict:
+        """Async counterpart of provide_disaster_guidance (no model call, never blocks)"""
+        return self.provide_disaster_guidance(disaster_type, classification)
+    
+    def _find_protocol(self, keywords: List[str], text: Optional[str] = None) -> Optional[Dict]:
         """Find best matching disaster protocol"""
-        best_match = None
-        best_score = 0
-        
-        for protocol in self.protocols:
-            protocol_keywords = set(kw.lower() for kw in protocol.get('keywords', []))
-            user_keywords = set(kw.lower() for kw in keywords)
-            
-            overlap = len(protocol_keywords.intersection(user_keywords))
-            if overlap > best_score:
-                best_score = overlap
-                best_match = protocol
-        
-        return best_match
+        return self.catalog.current().protocol_index.best('disaster_emergencies', keywords, text)
 
 
 # Demo
@@ -0,0 +1,200 @@
+"""
+Classification Cache
+Remembers recent Gemini classifications so repeated reports skip the LLM
+Demonstrates: LRU eviction, TTL expiry, warm restarts from a local file
+"""
+
+import atexit
+import copy
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+
+def normalize_input(text: str) -> str:
+    """Case- and whitespace-insensitive form of a crisis report"""
+    return ' '.join(text.casefold().split())
+
+
+class ClassificationCache:
+    """
+    Bounded cache of classifications keyed on (normalized input, country):
+    1. Least recently used entries are evicted beyond max_size
+    2. Entries expire ttl seconds after they were stored
+    3. Optionally persisted to a JSON file, saved in the background and on
+       exit, so a restarted process starts warm
+
+    Lookups return copies, so callers may modify the classification freely.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = 3600.0,
+                 path: Optional[str] = None, save_interval: float = 60.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.path = path
+        self.save_interval = save_interval
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        # key -> (expiry as a Unix timestamp, classification)
+        self._entries: 'OrderedDict[Tuple[str, str], Tuple[float, Dict]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._stopped = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+
+        if path:
+            self.load()
+
+    @staticmethod
+    def key(user_input: str, country: str) -> Tuple[str, str]:
+        return normalize_input(user_input), country
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, user_input: str, country: str) -> Optional[Dict]:
+        """Cached classification for this report, or None"""
+        key = self.key(user_input, country)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.time():
+                del self._entries[key]
+                self._dirty = True
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return copy.deepcopy(entry[1])
+
+    def put(self, user_input: str, country: str, classification: Dict):
+        """Store a classification, evicting the least recently used beyond max_size"""
+        key = self.key(user_input, country)
+        entry = (time.time() + self.ttl, copy.deepcopy(classification))
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            self._dirty = True
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._dirty = True
+
+    def stats(self) -> Dict:
+        """Counters for /health"""
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'ttl_seconds': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            'persistent': bool(self.path),
+        }
+
+    def load(self):
+        """Read unexpired entries from the cache file, oldest first"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+
+        now = time.time()
+        with self._lock:
+            for item in data.get('entries', []):
+                if item['expires'] > now:
+                    key = (item['input'], item['country'])
+                    self._entries[key] = (item['expires'], item['classification'])
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def save(self):
+        """Atomically write the unexpired entries to the cache file"""
+        if not self.path:
+            return
+        now = time.time()
+        with self._lock:
+            entries = [
+                {'input': key[0], 'country': key[1], 'expires': expires,
+                 'classification': classification}
+                for key, (expires, classification) in self._entries.items()
+                if expires > now
+            ]
+            self._dirty = False
+
+        # A unique temporary file per save: workers sharing the cache file
+        # must not write into each other's half-finished copy
+        directory, name = os.path.split(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(prefix=name + '.', suffix='.tmp', dir=directory)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'entries': entries}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def start(self):
+        """Save changes every save_interval seconds and once more at exit"""
+        if not self.path or self._worker is not None:
+            return
+        self._worker = threading.Thread(
+            target=self._save_loop, name='classification-cache-saver', daemon=True
+        )
+        self._worker.start()
+        atexit.register(self.close)
+
+    def _save_loop(self):
+        while not self._stopped.wait(self.save_interval):
+            if self._dirty:
+                try:
+                    self.save()
+                except Exception as e:
+                    print(f"⚠️  Warning: Could not save classification cache: {e}")
+
+    def close(self):
+        """Stop the saver and write pending changes"""
+        self._stopped.set()
+        if self._worker is not None:
+            self._worker.join(timeout=5)
+            self._worker = None
+        if self._dirty:
+            try:
+                self.save()
+            except Exception as e:
+                print(f"⚠️  Warning: Could not save classification cache: {e}")
+
+
+def open_classification_cache() -> Optional[ClassificationCache]:
+    """
+    Create the configured classification cache, or None if disabled
+
+    CLASSIFICATION_CACHE_SIZE (default 1024, 0 disables),
+    CLASSIFICATION_CACHE_TTL (seconds, default 3600),
+    CLASSIFICATION_CACHE_FILE (optional persistence file)
+    """
+    max_size = int(os.getenv('CLASSIFICATION_CACHE_SIZE', 1024))
+    if max_size <= 0:
+        return None
+    cache = ClassificationCache(
+        max_size=max_size,
+        ttl=float(os.getenv('CLASSIFICATION_CACHE_TTL', 3600)),
+        path=os.getenv('CLASSIFICATION_CACHE_FILE') or None
+    )
+    cache.start()
+    return cache
@@ -0,0 +1,78 @@
+"""
+Keyword Matcher
+Compiled keyword tables for the fallback classifier
+Demonstrates: Precomputed lookup structures, scan-once keyword matching
+"""
+
+from typing import Dict, List
+
+
+# Curated keywords decide the category, checked in this priority order
+FALLBACK_KEYWORDS = {
+    'medical_emergency': [
+        'chest pain', 'heart attack', 'stroke', 'bleeding', 'choking',
+        'breathing', 'unconscious', 'seizure', 'broken bone'
+    ],
+    'mental_health_crisis': [
+        'suicide', 'kill myself', 'panic attack', 'panic', 'anxiety', 'anxious',
+        'depressed', 'depression', 'self-harm', 'ptsd', 'trauma', 'want to die',
+        'overwhelmed', 'stressed', 'mental health', 'nervous', 'worried',
+        "don't want to live", 'no reason to live', 'hopeless'
+    ],
+    'disaster_emergency': [
+        'earthquake', 'flood', 'fire', 'hurricane', 'tornado',
+        'tsunami', 'explosion', 'building collapse'
+    ],
+}
+
+# Mental health keywords that raise severity to critical
+CRITICAL_MENTAL_KEYWORDS = ['suicide', 'kill myself']
+
+# crisis_protocols.json section for each category
+PROTOCOL_SECTIONS = {
+    'medical_emergency': 'medical_emergencies',
+    'mental_health_crisis': 'mental_health_crises',
+    'disaster_emergency': 'disaster_emergencies',
+}
+
+
+class FallbackKeywordMatcher:
+    """
+    Keyword classifier used when Gemini is unavailable:
+    1. Curated keywords (substring match) decide the category, in priority
+       order medical > mental health > disaster
+    2. The hits of the winning category are reused for severity
+
+    Tables are compiled once per coordinator. Each keyword is checked at
+    most once per call with str's C-level search, stopping at the first
+    category with a hit.
+    """
+
+    def __init__(self):
+        self.curated = {category: tuple(kw.lower() for kw in keywords)
+                        for category, keywords in FALLBACK_KEYWORDS.items()}
+        self.critical = tuple(kw.lower() for kw in CRITICAL_MENTAL_KEYWORDS)
+
+    def match(self, text: str) -> Dict:
+        """
+        Classify text by keywords
+
+        Returns {'category': str or None, 'keywords': [...], 'critical': bool}
+        """
+        text = text.lower()
+
+        for category, keywords in self.curated.items():
+            hits = [kw for kw in keywords if kw in text]
+            if hits:
+                return {
+                    'category': category,
+                    'keywords': hits,
+                    'critical': any(kw in hits for kw in self.critical)
+                }
+
+        return {'category': None, 'keywords': [], 'critical': False}
+
+    def keywords_for(self, text: str, category: str) -> List[str]:
+        """Curated keywords of one category found in text"""
+        text = text.lower()
+        return [kw for kw in self.curated.get(category, ()) if kw in text]
@@ -0,0 +1,266 @@
+"""
+Follow-up Scheduler
+Keeps case follow-ups in a due-time heap and dispatches them when due
+Demonstrates: Priority queues, background workers, pluggable delivery sinks
+"""
+
+import heapq
+import json
+import os
+import threading
+import urllib.request
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+
+def follow_up_payload(case: Dict) -> Dict:
+    """Compact follow-up record sent to sinks and returned by /followups/due"""
+    classification = case.get('classification', {})
+    return {
+        'case_id': case['id'],
+        'follow_up_scheduled': case['follow_up_scheduled'],
+        'severity': classification.get('severity'),
+        'category': classification.get('category'),
+        'country': classification.get('country'),
+        'status': case.get('status'),
+    }
+
+
+class FollowUpIndex:
+    """
+    Min-heap of (follow-up time, case ID) kept in sync with the case store:
+    1. schedule() is O(log N); rescheduling leaves a stale heap entry that
+       is skipped lazily instead of being searched for
+    2. due() walks only the due prefix of the heap, O(k log k) for k items
+    3. pop_due() removes due items for dispatch
+
+    Times are ISO strings as produced by datetime.isoformat(), which sort
+    chronologically as plain strings.
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[str, str]] = []
+        self._scheduled: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        # Set whenever a new earliest follow-up is scheduled
+        self.wakeup = threading.Event()
+
+    @classmethod
+    def from_store(cls, store) -> 'FollowUpIndex':
+        """Build the index from every active case's follow-up time"""
+        index = cls()
+        for case_id, due in store.follow_up_times():
+            index._scheduled[case_id] = due
+            index._heap.append((due, case_id))
+        heapq.heapify(index._heap)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._scheduled)
+
+    def schedule(self, case_id: str, due: str):
+        """Schedule (or reschedule) a case's follow-up"""
+        with self._lock:
+            self._scheduled[case_id] = due
+            heapq.heappush(self._heap, (due, case_id))
+            is_earliest = self._heap[0] == (due, case_id)
+        if is_earliest:
+            self.wakeup.set()
+
+    def _is_current(self, due: str, case_id: str) -> bool:
+        return self._scheduled.get(case_id) == due
+
+    def next_due(self) -> Optional[str]:
+        """Earliest scheduled follow-up time, if any"""
+        with self._lock:
+            while self._heap and not self._is_current(*self._heap[0]):
+                heapq.heappop(self._heap)
+            return self._heap[0][0] if self._heap else None
+
+    def due(self, before: str, limit: Optional[int] = None) -> List[Tuple[str, str]]:
+        """(case ID, follow-up time) due at or before `before`, earliest first, without removing"""
+        result = []
+        seen = set()
+        with self._lock:
+            heap = self._heap
+            # Best-first walk over the heap array: a node is only visited
+            # after its parent, so the walk stops at the first non-due node
+            frontier = [(heap[0], 0)] if heap else []
+            while frontier and (limit is None or len(result) < limit):
+                (due, case_id), position = heapq.heappop(frontier)
+                if due > before:
+                    break
+                if self._is_current(due, case_id) and case_id not in seen:
+                    seen.add(case_id)
+                    result.append((case_id, due))
+                for child in (2 * position + 1, 2 * position + 2):
+                    if child < len(heap):
+                        heapq.heappush(frontier, (heap[child], child))
+        return result
+
+    def pop_due(self, before: str, limit: int) -> List[Tuple[str, str]]:
+        """Remove and return up to `limit` follow-ups due at or before `before`"""
+        batch = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= before and len(batch) < limit:
+                due, case_id = heapq.heappop(self._heap)
+                if self._is_current(due, case_id):
+                    del self._scheduled[case_id]
+                    batch.append((case_id, due))
+        return batch
+
+
+class FileFollowUpSink:
+    """Appends each dispatched follow-up to a JSON lines file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def send(self, follow_ups: List[Dict]):
+        lines = ''.join(json.dumps(item, ensure_ascii=False) + '\n' for item in follow_ups)
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(lines)
+
+
+class WebhookFollowUpSink:
+    """POSTs each batch of follow-ups as {"follow_ups": [...]} to a URL"""
+
+    def __init__(self, url: str, timeout: float = 10.0):
+        self.url = url
+        self.timeout = timeout
+
+    def send(self, follow_ups: List[Dict]):
+        body = json.dumps({'follow_ups': follow_ups}).encode('utf-8')
+        request = urllib.request.Request(
+            self.url, data=body, method='POST',
+            headers={'Content-Type': 'application/json'}
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+def open_follow_up_sink(target: Optional[str] = None):
+    """
+    Create the configured follow-up sink, or None if dispatch is disabled
+
+    target (FOLLOWUP_SINK): an http(s) URL for a webhook, otherwise a file path
+    """
+    target = target or os.getenv('FOLLOWUP_SINK')
+    if not target:
+        return None
+    if target.startswith(('http://', 'https://')):
+        return WebhookFollowUpSink(target)
+    return FileFollowUpSink(target)
+
+
+class FollowUpDispatcher:
+    """
+    Background worker that delivers due follow-ups in batches:
+    1. Sleeps until the earliest follow-up (or a new earlier one) is due
+    2. Takes due items from the index, or for a shared store (SQLite with
+       several workers) from the store's indexed due query, since each
+       worker's index only holds the cases that worker created
+    3. Claims each case in the store before sending (claim_follow_up), so
+       concurrent dispatchers in other workers never send the same follow-up
+    4. Marks delivered cases 'follow_up_sent'; failed batches are retried
+       after retry_delay, as are claims whose dispatcher died mid-send
+    """
+
+    def __init__(self, store, index: FollowUpIndex, sink, batch_size: int = 100,
+                 poll_interval: float = 30.0, retry_delay: timedelta = timedelta(minutes=5)):
+        self.store = store
+        self.index = index
+        self.sink = sink
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.retry_delay = retry_delay
+        self.dispatched = 0
+        self.failed_batches = 0
+        self._stopped = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start dispatching in a daemon thread"""
+        if self._worker is None:
+            self._worker = threading.Thread(
+                target=self._run, name='follow-up-dispatcher', daemon=True
+            )
+            self._worker.start()
+
+    def stop(self):
+        self._stopped.set()
+        self.index.wakeup.set()
+        if self._worker is not None:
+            self._worker.join(timeout=5)
+            self._worker = None
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self.index.wakeup.clear()
+            try:
+                self.dispatch_due()
+            except Exception as e:
+                print(f"⚠️  Warning: Follow-up dispatch failed: {e}")
+
+            timeout = self.poll_interval
+            next_due = self.index.next_due()
+            if next_due:
+                wait = (datetime.fromisoformat(next_due) - datetime.now()).total_seconds()
+                timeout = max(0.0, min(timeout, wait))
+            self.index.wakeup.wait(timeout)
+
+    def _due_batch(self, before: str) -> List[Tuple[str, str]]:
+        """(case ID, follow-up time) of up to batch_size due follow-ups"""
+        if not self.store.shared:
+            return self.index.pop_due(before, self.batch_size)
+        # The index only wakes this dispatcher; drop its due entries, the
+        # store has the authoritative (and complete) list
+        self.index.pop_due(before, len(self.index))
+        return [(case['id'], case['follow_up_scheduled'])
+                for case in self.store.due_follow_ups(before, limit=self.batch_size)]
+
+    def dispatch_due(self, now: Optional[datetime] = None) -> int:
+        """Send every follow-up due at `now`; returns how many were delivered"""
+        now = now or datetime.now()
+        before = now.isoformat()
+        sent = 0
+
+        retry_at = (now + self.retry_delay).isoformat()
+
+        while True:
+            batch = self._due_batch(before)
+            if not batch:
+                return sent
+
+            follow_ups = []
+            for case_id, due in batch:
+                case = self.store.claim_follow_up(case_id, due, retry_at)
+                if case is not None:
+                    follow_ups.append({**follow_up_payload(case), 'follow_up_scheduled': due})
+            if not follow_ups:
+                if self.store.shared:
+                    # Everything left was claimed by another worker
+                    return sent
+                continue
+
+            try:
+                self.sink.send(follow_ups)
+            except Exception as e:
+                print(f"⚠️  Warning: Follow-up sink failed, retrying later: {e}")
+                self.failed_batches += 1
+                # The claims already moved the cases to retry_at in the store
+                for item in follow_ups:
+                    self.index.schedule(item['case_id'], retry_at)
+                return sent
+
+            sent_at = datetime.now().isoformat()
+            for item in follow_ups:
+                self.store.update(item['case_id'], {
+                    'status': 'follow_up_sent',
+                    'follow_up_scheduled': item['follow_up_scheduled'],
+                    'follow_up_sent_at': sent_at
+                })
+            sent += len(follow_ups)
+            self.dispatched += len(follow_ups)
@@ -0,0 +1,292 @@
+"""
+Crisis Catalog
+Versioned, hot-reloadable snapshots of the protocol and helpline data
+Demonstrates: Immutable snapshots, atomic swaps, background file watching, precompiled artifacts
+"""
+
+import hashlib
+import json
+import marshal
+import os
+import sys
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+from retrieval.helplines import HelplineResolver
+from retrieval.protocol_index import ProtocolIndex
+from retrieval.response_templates import ResponseTemplates
+from retrieval.schema import validate_catalog
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
+PROTOCOLS_PATH = os.path.join(DATA_DIR, 'crisis_protocols.json')
+HELPLINES_PATH = os.path.join(DATA_DIR, 'helplines.json')
+
+# Artifact header, followed by the Python major/minor version (marshal's format is per version)
+ARTIFACT_MAGIC = b'CRISISCAT1'
+
+
+def _read_raw(path: str, missing_warning: str) -> bytes:
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    except FileNotFoundError:
+        print(f"⚠️  Warning: {missing_warning}")
+        return b''
+
+
+def _read_json(path: str, missing_warning: str) -> Tuple[Dict, bytes]:
+    raw = _read_raw(path, missing_warning)
+    return (json.loads(raw) if raw else {}), raw
+
+
+def _version(raw_protocols: bytes, raw_helplines: bytes) -> str:
+    return hashlib.sha256(raw_protocols + b'\0' + raw_helplines).hexdigest()[:12]
+
+
+def source_version(protocols_path: str = PROTOCOLS_PATH, helplines_path: str = HELPLINES_PATH) -> str:
+    """Catalog version of the data files, without parsing them"""
+    return _version(_read_raw(protocols_path, "Crisis protocols file not found"),
+                    _read_raw(helplines_path, "Helplines file not found"))
+
+
+def load_protocols(path: Optional[str] = None) -> Dict:
+    """Load crisis protocols from JSON file"""
+    return _read_json(path or PROTOCOLS_PATH, "Crisis protocols file not found")[0]
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """
+    One consistent version of the protocol and helpline data with the
+    indexes built from it. Never modified once published (treat protocols
+    and helplines as read-only), so a request keeps a coherent view across
+    reloads by holding on to the snapshot it started with.
+    """
+    version: str
+    protocols: Dict
+    helplines: Dict
+    protocol_index: ProtocolIndex
+    helpline_resolver: HelplineResolver
+    response_templates: ResponseTemplates
+    source: str = 'json'  # or 'artifact'
+    loaded_at: str = field(default_factory=lambda: datetime.now().isoformat())
+
+
+def build_snapshot(protocols_path: str = PROTOCOLS_PATH, helplines_path: str = HELPLINES_PATH,
+                   warm: bool = False, validate: bool = False) -> CatalogSnapshot:
+    """
+    Parse the data files and index them; version = content hash of both files
+
+    warm=True also builds the retrieval postings now instead of on the
+    first search (used off the request path by reloads). validate=True
+    raises CatalogSchemaError for data that does not match the schema.
+    """
+    protocols, raw_protocols = _read_json(protocols_path, "Crisis protocols file not found")
+    helplines, raw_helplines = _read_json(helplines_path, "Helplines file not found")
+    if validate:
+        validate_catalog(protocols, helplines)
+    index = ProtocolIndex(protocols)
+    if warm:
+        index.warm()
+    return CatalogSnapshot(
+        version=_version(raw_protocols, raw_helplines),
+        protocols=protocols,
+        helplines=helplines,
+        protocol_index=index,
+        helpline_resolver=HelplineResolver(helplines),
+        response_templates=ResponseTemplates(protocols),
+    )
+
+
+def compile_catalog(output: str, protocols_path: str = PROTOCOLS_PATH,
+                    helplines_path: str = HELPLINES_PATH) -> CatalogSnapshot:
+    """
+    Validate the data files and write them, with their retrieval index, to
+    one marshal artifact that load_artifact() reads in one go
+    """
+    snapshot = build_snapshot(protocols_path, helplines_path, validate=True)
+    payload = {
+        'version': snapshot.version,
+        'protocols': snapshot.protocols,
+        'helplines': snapshot.helplines,
+        'protocol_index': snapshot.protocol_index.compiled(),
+    }
+    header = ARTIFACT_MAGIC + bytes(sys.version_info[:2])
+    temp_path = output + '.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(header + marshal.dumps(payload))
+    os.replace(temp_path, output)
+    return snapshot
+
+
+def load_artifact(path: str, version: str) -> Optional[CatalogSnapshot]:
+    """Snapshot from a compiled artifact, or None if it is missing, unreadable or stale"""
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return None
+    header = ARTIFACT_MAGIC + bytes(sys.version_info[:2])
+    if not data.startswith(header):
+        return None
+    try:
+        payload = marshal.loads(memoryview(data)[len(header):])
+    except (EOFError, ValueError, TypeError):
+        return None
+    if not isinstance(payload, dict) or payload.get('version') != version:
+        return None
+
+    protocols = payload['protocols']
+    return CatalogSnapshot(
+        version=version,
+        protocols=protocols,
+        helplines=payload['helplines'],
+        protocol_index=ProtocolIndex(protocols, compiled=payload['protocol_index']),
+        helpline_resolver=HelplineResolver(payload['helplines']),
+        response_templates=ResponseTemplates(protocols),
+        source='artifact',
+    )
+
+
+class Catalog:
+    """
+    Holds the live CatalogSnapshot:
+    1. current() returns it; swapping in a new one is a single reference
+       assignment, so readers never see a half-built catalog
+    2. reload() rebuilds from the data files once their size or mtime
+       changes; missing files or data failing the schema keep the previous
+       snapshot
+    3. start() polls the files every reload_interval seconds on a daemon
+       thread, so parsing and indexing never happen on the request path
+
+    With an artifact_path (see compile_catalog), start-up loads the
+    precompiled artifact and parses the JSON files only if it is stale.
+    """
+
+    def __init__(self, protocols_path: Optional[str] = None, helplines_path: Optional[str] = None,
+                 reload_interval: float = 30.0, artifact_path: Optional[str] = None):
+        self.protocols_path = protocols_path or PROTOCOLS_PATH
+        self.helplines_path = helplines_path or HELPLINES_PATH
+        self.reload_interval = reload_interval
+        self.reloads = 0
+        self.failed_reloads = 0
+
+        self._signature = self._stat()
+        self._snapshot = self._initial_snapshot(artifact_path)
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+
+    def current(self) -> CatalogSnapshot:
+        return self._snapshot
+
+    def _initial_snapshot(self, artifact_path: Optional[str]) -> CatalogSnapshot:
+        if artifact_path:
+            snapshot = load_artifact(artifact_path, source_version(self.protocols_path, self.helplines_path))
+            if snapshot is not None:
+                return snapshot
+            print(f"⚠️  Warning: Catalog artifact {artifact_path} is missing or stale, loading JSON")
+        return build_snapshot(self.protocols_path, self.helplines_path)
+
+    def _stat(self) -> Tuple:
+        signature = []
+        for path in (self.protocols_path, self.helplines_path):
+            try:
+                stat = os.stat(path)
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+
+    def reload(self, force: bool = False) -> bool:
+        """Swap in a fresh snapshot if the data files changed; True if swapped"""
+        with self._lock:
+            signature = self._stat()
+            if signature == self._signature and not force:
+                return False
+            # A half-written file fails here and is retried once it changes again
+            self._signature = signature
+            try:
+                if None in signature:
+                    raise FileNotFoundError("catalog data file missing")
+                snapshot = build_snapshot(self.protocols_path, self.helplines_path,
+                                          warm=True, validate=True)
+            except (OSError, ValueError) as e:
+                self.failed_reloads += 1
+                print(f"⚠️  Warning: Could not reload catalog, keeping {self._snapshot.version}: {e}")
+                return False
+            if snapshot.version == self._snapshot.version:
+                return False
+            self._snapshot = snapshot
+            self.reloads += 1
+            return True
+
+    def start(self):
+        """Watch the data files every reload_interval seconds (0 disables)"""
+        if self.reload_interval <= 0 or self._worker is not None:
+            return
+        self._worker = threading.Thread(target=self._watch, name='catalog-watcher', daemon=True)
+        self._worker.start()
+
+    def _watch(self):
+        while not self._stopped.wait(self.reload_interval):
+            try:
+                self.reload()
+            except Exception as e:
+                print(f"⚠️  Warning: Catalog watcher error: {e}")
+
+    def close(self):
+        self._stopped.set()
+        if self._worker is not None:
+            self._worker.join(timeout=5)
+            self._worker = None
+
+    def stats(self) -> Dict:
+        """Version and reload counters for /health"""
+        snapshot = self._snapshot
+        return {
+            'version': snapshot.version,
+            'source': snapshot.source,
+            'loaded_at': snapshot.loaded_at,
+            'reloads': self.reloads,
+            'failed_reloads': self.failed_reloads,
+        }
+
+
+def open_catalog() -> Catalog:
+    """
+    Create the catalog over src/data and start watching it
+
+    CATALOG_RELOAD_INTERVAL (seconds between file checks, default 30, 0 disables),
+    CATALOG_ARTIFACT (optional precompiled catalog, see compile_catalog)
+    """
+    catalog = Catalog(reload_interval=float(os.getenv('CATALOG_RELOAD_INTERVAL', 30)),
+                      artifact_path=os.getenv('CATALOG_ARTIFACT') or None)
+    catalog.start()
+    return catalog
+
+
+@lru_cache(maxsize=None)
+def shared_catalog() -> Catalog:
+    """Catalog shared by the coordinator and specialist agents, opened on first use"""
+    return open_catalog()
+
+
+if __name__ == '__main__':
+    # Validate src/data and compile it for fast start-up (run from the repo root):
+    #   PYTHONPATH=src python -m retrieval.catalog [output]
+    from retrieval.schema import CatalogSchemaError
+
+    output = sys.argv[1] if len(sys.argv) > 1 else os.path.join(DATA_DIR, '..', '..', 'catalog.bin')
+    try:
+        snapshot = compile_catalog(output)
+    except CatalogSchemaError as e:
+        print("❌ Catalog data does not match the schema:")
+        for problem in e.problems:
+            print(f"   - {problem}")
+        sys.exit(1)
+    protocols = sum(len(entries) for entries in snapshot.protocols.values())
+    print(f"✅ Compiled catalog {snapshot.version} ({protocols} protocols) to {output}")
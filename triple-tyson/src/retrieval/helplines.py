@@ -0,0 +1,122 @@
+"""
+Helpline Resolver
+Precomputed helpline bundles per (country, crisis category)
+Demonstrates: Alias normalization, precomputed lookup tables, fallback accounting
+"""
+
+import os
+import threading
+from collections import Counter
+from typing import Dict, Optional, Tuple
+
+# Names and ISO codes accepted for the countries in helplines.json, besides
+# the data's own keys
+COUNTRY_ALIASES = {
+    'USA': ('us', 'usa', 'united states', 'united states of america', 'america'),
+    'India': ('in', 'ind', 'india', 'bharat'),
+    'UK': ('uk', 'gb', 'gbr', 'united kingdom', 'great britain', 'britain',
+           'england', 'scotland', 'wales', 'northern ireland'),
+    'Canada': ('ca', 'can', 'canada'),
+    'Australia': ('au', 'aus', 'australia'),
+}
+
+CATEGORIES = ('medical_emergency', 'mental_health_crisis', 'disaster_emergency', 'other')
+
+# Distinct unrecognized inputs remembered for /health
+MAX_UNKNOWN_TRACKED = 256
+
+
+def normalize_country(name: str) -> str:
+    """Case-, dot- and spacing-insensitive country key ('U.S.A.' -> 'usa')"""
+    name = name.casefold().replace('.', '').replace('-', ' ').replace('_', ' ')
+    return ' '.join(name.split())
+
+
+class HelplineResolver:
+    """
+    Helpline bundles for every (country, category), built once per catalog:
+    1. Country names, aliases and ISO codes map to the data's country key
+    2. Each bundle holds the country's emergency services, plus crisis
+       support lines for mental health crises; a country without its own
+       crisis lines gets the international directory before the default
+       country's numbers
+    3. Unrecognized countries get the default country's bundle (DEFAULT_COUNTRY)
+       and are counted, as are bundles completed from fallbacks
+
+    Bundles are shared between requests and must be treated as read-only.
+    """
+
+    def __init__(self, helplines: Dict, default_country: Optional[str] = None):
+        groups = helplines.get('global_helplines')
+        emergency = (groups or {}).get('emergency_services', {})
+        mental_health = (groups or {}).get('mental_health', {})
+        countries = (set(emergency) | set(mental_health)) - {'international'}
+
+        self._aliases: Dict[str, str] = {}
+        for country, aliases in COUNTRY_ALIASES.items():
+            if country in countries:
+                for alias in aliases:
+                    self._aliases[normalize_country(alias)] = country
+        for country in countries:
+            self._aliases[normalize_country(country)] = country
+
+        default_country = default_country or os.getenv('DEFAULT_COUNTRY', 'USA')
+        self.default_country = self._aliases.get(normalize_country(default_country), default_country)
+
+        # (country, category) -> (bundle, completed from a fallback)
+        self._bundles: Dict[Tuple[str, str], Tuple[Dict, bool]] = {}
+        for country in countries | {self.default_country}:
+            for category in CATEGORIES:
+                self._bundles[country, category] = self._bundle(
+                    groups, emergency, mental_health, country, category
+                )
+
+        self.resolved = 0
+        self.unknown_country = 0
+        self.partial = 0
+        self._unknown = Counter()
+        self._lock = threading.Lock()
+
+    def _bundle(self, groups: Optional[Dict], emergency: Dict, mental_health: Dict,
+                country: str, category: str) -> Tuple[Dict, bool]:
+        if groups is None:
+            return {}, False
+        partial = country not in emergency
+        bundle = {'emergency_services': emergency.get(country, emergency.get(self.default_country, {}))}
+        if category == 'mental_health_crisis':
+            if country in mental_health:
+                bundle['crisis_support'] = mental_health[country]
+            else:
+                partial = True
+                international = mental_health.get('international')
+                bundle['crisis_support'] = [international] if international else \
+                    mental_health.get(self.default_country, [])
+        return bundle, partial
+
+    def resolve(self, country: Optional[str], category: str) -> Dict:
+        """Helplines for a country (any accepted spelling; None = default) and crisis category"""
+        key = normalize_country(country or '')
+        canonical = self._aliases.get(key) if key else self.default_country
+        if category not in CATEGORIES:
+            category = 'other'
+        bundle, partial = self._bundles[canonical or self.default_country, category]
+        with self._lock:
+            self.resolved += 1
+            if canonical is None:
+                self.unknown_country += 1
+                if key in self._unknown or len(self._unknown) < MAX_UNKNOWN_TRACKED:
+                    self._unknown[key] += 1
+            elif partial:
+                self.partial += 1
+        return bundle
+
+    def stats(self) -> Dict:
+        """Lookup and fallback counters for /health"""
+        with self._lock:
+            return {
+                'default_country': self.default_country,
+                'resolved': self.resolved,
+                'unknown_country': self.unknown_country,
+                'partial': self.partial,
+                'top_unknown': self._unknown.most_common(5),
+            }
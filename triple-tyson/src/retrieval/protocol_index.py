@@ -0,0 +1,172 @@
+"""
+Protocol Index
+BM25 ranked retrieval over the crisis protocol library
+Demonstrates: Inverted indexes, BM25 scoring, vectorized top-k retrieval
+"""
+
+import math
+import re
+from array import array
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Protocol fields that are indexed, with their term-frequency weight
+FIELD_WEIGHTS = {
+    'name': 2.0,
+    'keywords': 3.0,
+    'warning_signs': 1.0,
+    'immediate_actions': 0.5,
+}
+
+STOPWORDS = frozenset(
+    "a an and are as at be been but by for from has have he her his i if in into is it its "
+    "me my of on or our she so than that the their them then there they this to too was "
+    "we were what when where which who will with you your".split()
+)
+
+_TOKEN = re.compile(r"[^\W_]+(?:'[^\W_]+)?")
+
+
+def normalize_keyword(keyword: str) -> str:
+    """Case- and spacing-insensitive form of a keyword"""
+    return ' '.join(keyword.casefold().split())
+
+
+def _stem(token: str) -> str:
+    """Light suffix stripping, so 'breathing' / 'flooded' / 'flames' meet their stems"""
+    for suffix, keep in (('ing', 4), ('ed', 4), ('s', 3)):
+        if token.endswith(suffix) and len(token) - len(suffix) >= keep and not token.endswith('ss'):
+            return token[:-len(suffix)]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased, stemmed word tokens without stopwords; word order is ignored"""
+    return [_stem(token) for token in _TOKEN.findall(text.casefold()) if token not in STOPWORDS]
+
+
+def _field_texts(protocol: Dict, field: str) -> List[str]:
+    value = protocol.get(field, protocol.get('protocol', {}).get(field))
+    if value is None:
+        return []
+    return [value] if isinstance(value, str) else list(value)
+
+
+class ProtocolIndex:
+    """
+    BM25 index over every protocol's name, keywords, warning signs and
+    immediate actions (weighted per FIELD_WEIGHTS):
+    1. Each term's postings hold the protocols containing it and their
+       precomputed BM25 weights, so a query only sums its terms' postings
+    2. search() ranks one section against extracted keywords and/or the raw
+       report; word order does not matter ("breathing difficulty" finds
+       "difficulty breathing")
+    3. Statistics span the whole library; results are the top-k protocols
+       of the section with a positive score, ties in library order
+
+    The postings become NumPy arrays on the first search (or warm()), so
+    importing NumPy stays off the worker start-up path.
+    """
+
+    def __init__(self, protocols: Dict[str, List[Dict]], k1: float = 1.2, b: float = 0.75,
+                 compiled: Optional[Dict] = None):
+        self.protocols = protocols
+        self.k1 = compiled['k1'] if compiled else k1
+        self.b = compiled['b'] if compiled else b
+        self._compiled = compiled
+        self._postings = None  # term -> (protocol positions, BM25 weights)
+        self._bounds: Dict[str, Tuple[int, int]] = {}  # section -> slice of positions
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def section(self, section: str) -> List[Dict]:
+        return self.protocols.get(section, [])
+
+    def compiled(self) -> Dict:
+        """
+        Index in plain types for the catalog artifact (postings as raw int64 /
+        float64 bytes); ProtocolIndex(protocols, compiled=...) restores it
+        """
+        if self._compiled is None:
+            self._compiled = self._compile()
+        return self._compiled
+
+    def _compile(self) -> Dict:
+        bounds, documents = {}, []
+        for section, entries in self.protocols.items():
+            bounds[section] = (len(documents), len(documents) + len(entries))
+            for protocol in entries:
+                frequencies = Counter()
+                for field, weight in FIELD_WEIGHTS.items():
+                    for text in _field_texts(protocol, field):
+                        for term in tokenize(text):
+                            frequencies[term] += weight
+                documents.append(frequencies)
+
+        size = len(documents)
+        lengths = [sum(frequencies.values()) for frequencies in documents]
+        average_length = (sum(lengths) / len(lengths)) if lengths else 1.0
+        document_frequency = Counter(term for frequencies in documents for term in frequencies)
+
+        postings: Dict[str, Tuple[array, array]] = {}
+        for position, frequencies in enumerate(documents):
+            norm = self.k1 * (1 - self.b + self.b * lengths[position] / average_length)
+            for term, frequency in frequencies.items():
+                df = document_frequency[term]
+                idf = math.log(1 + (size - df + 0.5) / (df + 0.5))
+                positions, weights = postings.setdefault(term, (array('q'), array('d')))
+                positions.append(position)
+                weights.append(idf * frequency * (self.k1 + 1) / (frequency + norm))
+        return {
+            'k1': self.k1,
+            'b': self.b,
+            'size': size,
+            'bounds': bounds,
+            'postings': {term: (positions.tobytes(), weights.tobytes())
+                         for term, (positions, weights) in postings.items()},
+        }
+
+    def warm(self):
+        """Load the postings into NumPy now rather than on the first search"""
+        if self._postings is None:
+            with self._lock:
+                if self._postings is None:
+                    import numpy as np
+                    compiled = self.compiled()
+                    self._bounds = dict(compiled['bounds'])
+                    self._size = compiled['size']
+                    self._postings = {
+                        term: (np.frombuffer(positions, dtype=np.int64),
+                               np.frombuffer(weights, dtype=np.float64))
+                        for term, (positions, weights) in compiled['postings'].items()
+                    }
+
+    def search(self, section: str, keywords: Iterable[str] = (), text: Optional[str] = None,
+               k: int = 3) -> List[Tuple[Dict, float]]:
+        """Top-k (protocol, score) pairs of the section for the keywords and report text"""
+        self.warm()
+        start, end = self._bounds.get(section, (0, 0))
+        if start == end:
+            return []
+
+        terms = tokenize(' '.join(keywords))
+        if text:
+            terms += tokenize(text)
+        hits = [self._postings[term] for term in terms if term in self._postings]
+        if not hits:
+            return []
+
+        import numpy as np
+        scores = np.bincount(np.concatenate([positions for positions, _ in hits]),
+                             weights=np.concatenate([weights for _, weights in hits]),
+                             minlength=self._size)[start:end]
+        ranked = np.argsort(-scores, kind='stable')[:k]
+        entries = self.protocols[section]
+        return [(entries[i], round(float(scores[i]), 4)) for i in ranked if scores[i] > 0]
+
+    def best(self, section: str, keywords: Iterable[str] = (),
+             text: Optional[str] = None) -> Optional[Dict]:
+        """Highest-ranked protocol of the section, or None without any match"""
+        ranked = self.search(section, keywords, text, k=1)
+        return ranked[0][0] if ranked else None
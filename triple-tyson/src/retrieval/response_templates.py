@@ -0,0 +1,165 @@
+"""
+Response Templates
+Precompiled text for the static sections of crisis responses
+Demonstrates: Template precompilation, memoized fragments, allocation-light rendering
+"""
+
+import threading
+from typing import Dict, Optional, Tuple
+
+from classification.keyword_matcher import PROTOCOL_SECTIONS
+
+SEVERITY_ICONS = {
+    'critical': '🚨',
+    'high': '⚠️',
+    'medium': '⚡',
+    'low': 'ℹ️'
+}
+
+CATEGORY_ICONS = {
+    'medical_emergency': '🏥',
+    'mental_health_crisis': '🧠',
+    'disaster_emergency': '🌍',
+    'other': '💬'
+}
+
+# Emergency numbers shown, in order, with their labels
+CONTACT_LABELS = (
+    ('emergency', 'Emergency Services'),
+    ('suicide_prevention', 'Suicide Prevention'),
+    ('crisis_text', 'Crisis Text Line'),
+)
+
+MAX_ACTIONS = 6
+MAX_WARNINGS = 4
+
+DISCLAIMER = (
+    "⚠️  IMPORTANT: This is an AI assistant. Always call emergency services for life-threatening situations.\n"
+    "   This system provides guidance but does NOT replace professional medical or crisis intervention.\n"
+)
+
+# Labels around the only per-case fields (case ID, follow-up, confidence);
+# everything before them is shared by every case with the same protocol,
+# contacts, category and severity
+CASE_ID_LABEL = "📊 Case ID: "
+FOLLOW_UP_LABEL = "\n⏰ Follow-up scheduled: "
+CONFIDENCE_LABEL = "\n🤖 Confidence: "
+CASE_END = "\n\n"
+
+# Distinct rendered prefixes kept before the memo is cleared
+MAX_PREFIXES = 4096
+
+
+def render_header(category: str, severity: str) -> str:
+    return (f"\n{SEVERITY_ICONS.get(severity, '⚠️')} {CATEGORY_ICONS.get(category, '💬')} "
+            f"{category.replace('_', ' ').upper()} DETECTED - {severity.upper()} SEVERITY\n"
+            f"{'=' * 70}\n\n")
+
+
+def render_contacts(emergency: Dict) -> str:
+    if not emergency:
+        return ''
+    lines = ["📞 EMERGENCY CONTACTS:\n"]
+    for key, label in CONTACT_LABELS:
+        if key in emergency:
+            lines.append(f"   {label}: {emergency[key]}\n")
+    lines.append("\n")
+    return ''.join(lines)
+
+
+def render_protocol(protocol: Optional[Dict]) -> Tuple[str, str]:
+    """(immediate actions, protocol details and DO NOT list) sections for a protocol"""
+    if not protocol:
+        return '', ''
+    steps = protocol.get('protocol')
+
+    actions = []
+    if steps is not None:
+        actions.append("🔴 IMMEDIATE ACTIONS:\n")
+        for i, action in enumerate(steps.get('immediate_actions', [])[:MAX_ACTIONS], 1):
+            actions.append(f"{i}. {action}\n")
+        actions.append("\n")
+
+    details = [f"📋 Protocol: {protocol.get('name', 'General Crisis Response')}\n",
+               f"📚 Source: {protocol.get('source', 'Crisis Response Guidelines')}\n\n"]
+    if steps is not None and 'do_not' in steps:
+        details.append("⛔ DO NOT:\n")
+        for warning in steps['do_not'][:MAX_WARNINGS]:
+            details.append(f"   ✗ {warning}\n")
+        details.append("\n")
+    return ''.join(actions), ''.join(details)
+
+
+class ResponseTemplates:
+    """
+    Crisis response text for one catalog snapshot:
+    1. The protocol sections (immediate actions, name and source, DO NOT
+       list) of every catalog protocol and the header of every category and
+       severity are rendered once, when the snapshot is built
+    2. The static prefix of a response (header, actions, contacts, details)
+       is joined once per (category, severity, protocol, contacts) and reused
+    3. render() joins that prefix, the case ID, follow-up time and
+       confidence and the constant labels and disclaimer in one pass, so the
+       response is the only sizeable string allocated per request
+
+    Protocols that are not part of the catalog are rendered uncached.
+    """
+
+    def __init__(self, protocols: Dict):
+        self._protocols: Dict[str, Tuple[Dict, Tuple[str, str]]] = {}
+        for section in PROTOCOL_SECTIONS.values():
+            for protocol in protocols.get(section, []):
+                self._protocols[protocol.get('id')] = (protocol, render_protocol(protocol))
+        self._headers = {
+            (category, severity): render_header(category, severity)
+            for category in CATEGORY_ICONS for severity in SEVERITY_ICONS
+        }
+        self._prefixes: Dict[Tuple, str] = {}
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _protocol_sections(self, protocol: Optional[Dict]) -> Tuple[Optional[str], Tuple[str, str]]:
+        """(cache key, sections); the key is None for protocols outside the catalog"""
+        if not protocol:
+            return '', ('', '')
+        entry = self._protocols.get(protocol.get('id'))
+        if entry is not None and entry[0] is protocol:
+            return protocol['id'], entry[1]
+        return None, render_protocol(protocol)
+
+    def prefix(self, category: str, severity: str, protocol: Optional[Dict], helplines: Dict) -> str:
+        """Everything before the per-case fields"""
+        protocol_key, (actions, details) = self._protocol_sections(protocol)
+        emergency = helplines.get('emergency_services') or {}
+        key = (category, severity, protocol_key, emergency.get('emergency'),
+               emergency.get('suicide_prevention'), emergency.get('crisis_text'))
+
+        prefix = self._prefixes.get(key) if protocol_key is not None else None
+        if prefix is not None:
+            self.hits += 1
+            return prefix
+
+        header = self._headers.get((category, severity)) or render_header(category, severity)
+        prefix = ''.join((header, actions, render_contacts(emergency), details))
+        if protocol_key is not None:
+            with self._lock:
+                self.misses += 1
+                if len(self._prefixes) >= MAX_PREFIXES:
+                    self._prefixes.clear()
+                self._prefixes[key] = prefix
+        return prefix
+
+    def render(self, classification: Dict, protocol: Optional[Dict], helplines: Dict, case: Dict) -> str:
+        """Formatted crisis response for a case"""
+        return ''.join((
+            self.prefix(classification['category'], classification['severity'], protocol, helplines),
+            CASE_ID_LABEL, case['id'],
+            FOLLOW_UP_LABEL, case['follow_up_scheduled'][:16],
+            CONFIDENCE_LABEL, f"{classification.get('confidence', 0.8):.0%}",
+            CASE_END, DISCLAIMER,
+        ))
+
+    def stats(self) -> Dict:
+        """Prefix memo counters"""
+        return {'prefixes': len(self._prefixes), 'hits': self.hits, 'misses': self.misses}
@@ -0,0 +1,106 @@
+"""
+Catalog Schema
+Structural checks for crisis_protocols.json and helplines.json
+Demonstrates: Fail-fast data validation at build and reload time
+"""
+
+from typing import Dict, List
+
+from classification.keyword_matcher import PROTOCOL_SECTIONS
+
+SEVERITIES = ('critical', 'high', 'medium', 'low')
+
+
+class CatalogSchemaError(ValueError):
+    """Raised with every problem found in the catalog data"""
+
+    def __init__(self, problems: List[str]):
+        super().__init__("invalid catalog data: " + "; ".join(problems))
+        self.problems = problems
+
+
+def _is_text_list(value, allow_empty: bool = True) -> bool:
+    return isinstance(value, list) and (allow_empty or bool(value)) and \
+        all(isinstance(item, str) and item.strip() for item in value)
+
+
+def protocol_problems(protocols) -> List[str]:
+    """
+    Each section of PROTOCOL_SECTIONS is a list of protocols with a unique
+    string id, a name, non-empty keywords, a valid severity and a 'protocol'
+    object of step lists (immediate_actions, during_earthquake, do_not, ...)
+    or nested objects (e.g. fast_test), with at least one non-empty list
+    """
+    if not isinstance(protocols, dict):
+        return ["protocols: expected an object of sections"]
+
+    problems, seen = [], set()
+    for section in PROTOCOL_SECTIONS.values():
+        entries = protocols.get(section)
+        if not isinstance(entries, list):
+            problems.append(f"{section}: expected a list of protocols")
+            continue
+        for position, protocol in enumerate(entries):
+            where = f"{section}[{position}]"
+            if not isinstance(protocol, dict):
+                problems.append(f"{where}: expected an object")
+                continue
+            protocol_id = protocol.get('id')
+            if not isinstance(protocol_id, str) or not protocol_id:
+                problems.append(f"{where}.id: expected a non-empty string")
+            elif protocol_id in seen:
+                problems.append(f"{where}.id: duplicate id {protocol_id!r}")
+            else:
+                seen.add(protocol_id)
+            if not isinstance(protocol.get('name'), str) or not protocol['name']:
+                problems.append(f"{where}.name: expected a non-empty string")
+            if not _is_text_list(protocol.get('keywords'), allow_empty=False):
+                problems.append(f"{where}.keywords: expected a non-empty list of strings")
+            if protocol.get('severity') not in SEVERITIES:
+                problems.append(f"{where}.severity: expected one of {', '.join(SEVERITIES)}")
+            steps = protocol.get('protocol')
+            if not isinstance(steps, dict):
+                problems.append(f"{where}.protocol: expected an object")
+                continue
+            if not any(isinstance(value, list) and value for value in steps.values()):
+                problems.append(f"{where}.protocol: expected at least one non-empty list of steps")
+            for field, value in steps.items():
+                if isinstance(value, list) and not _is_text_list(value):
+                    problems.append(f"{where}.protocol.{field}: expected a list of strings")
+                elif not isinstance(value, (list, dict)):
+                    problems.append(f"{where}.protocol.{field}: expected a list or object")
+    return problems
+
+
+def helpline_problems(helplines) -> List[str]:
+    """
+    global_helplines maps each service group to entries keyed by country (or
+    resource name); emergency_services entries map service -> number
+    """
+    if not isinstance(helplines, dict) or not isinstance(helplines.get('global_helplines'), dict):
+        return ["helplines: expected an object with a 'global_helplines' object"]
+
+    problems = []
+    groups = helplines['global_helplines']
+    if 'emergency_services' not in groups:
+        problems.append("global_helplines.emergency_services: missing")
+    for group, entries in groups.items():
+        if not isinstance(entries, dict):
+            problems.append(f"global_helplines.{group}: expected an object")
+            continue
+        for key, entry in entries.items():
+            if not isinstance(entry, (dict, list)):
+                problems.append(f"global_helplines.{group}.{key}: expected an object or list")
+        if group == 'emergency_services':
+            for country, numbers in entries.items():
+                if isinstance(numbers, dict) and not all(isinstance(v, str) for v in numbers.values()):
+                    problems.append(f"global_helplines.emergency_services.{country}: "
+                                    f"expected string numbers")
+    return problems
+
+
+def validate_catalog(protocols: Dict, helplines: Dict):
+    """Raise CatalogSchemaError listing every problem in the two data files"""
+    problems = protocol_problems(protocols) + helpline_problems(helplines)
+    if problems:
+        raise CatalogSchemaError(problems)
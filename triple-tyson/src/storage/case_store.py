@@ -0,0 +1,359 @@
+"""
+Case Store
+Pluggable persistence for crisis cases behind the coordinator
+Demonstrates: State management, storage abstraction, indexed lookups
+"""
+
+import os
+import threading
+from abc import abstractmethod
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from storage.journal import CaseJournal
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, single-process use only
+    fcntl = None
+
+
+class CaseStore(Mapping):
+    """
+    Abstract case store:
+    1. Allocates case IDs (CASE-00001, CASE-00002, ...)
+    2. Stores and retrieves case records by ID
+    3. Answers filtered lookups (status, severity, category, due follow-ups)
+
+    Behaves as a read-only mapping of case ID -> case record.
+    """
+
+    # Whether other processes write the same store (e.g. gunicorn workers);
+    # process-local views such as the follow-up heap are then incomplete
+    shared = False
+
+    @staticmethod
+    def format_case_id(number: int) -> str:
+        """Format a case counter value as a case ID"""
+        return f"CASE-{number:05d}"
+
+    @property
+    @abstractmethod
+    def counter(self) -> int:
+        """Number of case IDs allocated so far"""
+
+    @abstractmethod
+    def next_case_id(self) -> str:
+        """Allocate the next case ID"""
+
+    @abstractmethod
+    def put(self, case: Dict):
+        """Insert or replace a case record"""
+
+    @abstractmethod
+    def update(self, case_id: str, changes: Dict) -> Optional[Dict]:
+        """Atomically merge changes into a case; returns the new record or None"""
+
+    @abstractmethod
+    def list_cases(self) -> List[Dict]:
+        """All cases in creation order"""
+
+    @abstractmethod
+    def find_cases(self, status: Optional[str] = None, severity: Optional[str] = None,
+                   category: Optional[str] = None) -> List[Dict]:
+        """Cases matching every given field, in creation order"""
+
+    @abstractmethod
+    def due_follow_ups(self, before: str, status: str = 'active',
+                       limit: Optional[int] = None) -> List[Dict]:
+        """Cases whose follow-up is scheduled at or before the ISO timestamp, earliest first"""
+
+    @abstractmethod
+    def claim_follow_up(self, case_id: str, due: str, lease_until: str) -> Optional[Dict]:
+        """
+        Atomically take an active case's follow-up for delivery: only if it is
+        still scheduled at `due`, move it to `lease_until` and return the case
+
+        Of several dispatchers racing for the same follow-up exactly one wins;
+        if the winner dies before marking it sent, it is due again at lease_until.
+        """
+
+    @abstractmethod
+    def follow_up_times(self, status: str = 'active') -> Iterator[Tuple[str, str]]:
+        """(case ID, follow-up time) for every case with the given status"""
+
+    @abstractmethod
+    def count_follow_ups(self, status: str = 'active') -> int:
+        """Number of cases with the given status and a follow-up scheduled"""
+
+    @abstractmethod
+    def iter_cases(self, after: int = 0, limit: Optional[int] = None,
+                   **filters) -> Iterator[Tuple[int, Dict]]:
+        """
+        Lazily yield (cursor, case) in creation order, starting after cursor
+
+        filters: status, severity, category, country (exact match) and
+        since / until (ISO timestamp range on case creation)
+        """
+
+    def values(self):
+        return self.list_cases()
+
+    def close(self):
+        """Release files, connections and background workers"""
+
+
+def case_matches(case: Dict, status: Optional[str] = None, severity: Optional[str] = None,
+                 category: Optional[str] = None, country: Optional[str] = None,
+                 since: Optional[str] = None, until: Optional[str] = None) -> bool:
+    """Check a case record against the store filters"""
+    classification = case.get('classification', {})
+    if status and case.get('status') != status:
+        return False
+    if severity and classification.get('severity') != severity:
+        return False
+    if category and classification.get('category') != category:
+        return False
+    if country and classification.get('country') != country:
+        return False
+    if since and case.get('timestamp', '') < since:
+        return False
+    if until and case.get('timestamp', '') >= until:
+        return False
+    return True
+
+
+class AtomicCounter:
+    """Thread-safe monotonically increasing counter"""
+
+    def __init__(self, value: int = 0):
+        self._value = value
+        self._lock = threading.Lock()
+
+    @property
+    def value(self) -> int:
+        return self._value
+
+    def increment(self) -> int:
+        """Increment and return the new value"""
+        with self._lock:
+            self._value += 1
+            return self._value
+
+
+class MemoryCaseStore(CaseStore):
+    """
+    Thread-safe in-memory case store:
+    1. Case IDs come from an atomic counter
+    2. Writers lock only the stripe owning the case ID, so concurrent
+       /detect requests rarely contend
+    3. Records are replaced, never mutated, and IDs are appended to an
+       append-only order log after their record is visible; readers copy a
+       prefix of that log and never iterate the dict, so they take a
+       consistent snapshot without holding any lock
+    """
+
+    STRIPES = 16
+
+    def __init__(self, cases: Optional[Dict[str, Dict]] = None, counter: int = 0):
+        self._cases: Dict[str, Dict] = dict(cases or {})
+        self._order: List[str] = list(self._cases)
+        self._counter = AtomicCounter(counter)
+        self._stripes = [threading.Lock() for _ in range(self.STRIPES)]
+
+    def _stripe(self, case_id: str) -> threading.Lock:
+        return self._stripes[hash(case_id) % self.STRIPES]
+
+    @property
+    def counter(self) -> int:
+        return self._counter.value
+
+    def next_case_id(self) -> str:
+        return self.format_case_id(self._counter.increment())
+
+    def put(self, case: Dict):
+        with self._stripe(case['id']):
+            self._store(case)
+
+    def update(self, case_id: str, changes: Dict) -> Optional[Dict]:
+        with self._stripe(case_id):
+            current = self._cases.get(case_id)
+            if current is None:
+                return None
+            case = {**current, **changes}
+            self._store(case)
+            return case
+
+    def _store(self, case: Dict):
+        """Publish a record; the caller holds the stripe lock for its ID"""
+        is_new = case['id'] not in self._cases
+        self._cases[case['id']] = case
+        if is_new:
+            self._order.append(case['id'])
+        self._persist(case)
+
+    def _persist(self, case: Dict):
+        """Hook for durable backends; the in-memory store keeps nothing"""
+
+    def snapshot(self) -> List[Dict]:
+        """Consistent point-in-time list of cases in creation order"""
+        cases = self._cases
+        return [cases[case_id] for case_id in self._order[:]]
+
+    def __getitem__(self, case_id: str) -> Dict:
+        return self._cases[case_id]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._order[:])
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def list_cases(self) -> List[Dict]:
+        return self.snapshot()
+
+    def find_cases(self, status: Optional[str] = None, severity: Optional[str] = None,
+                   category: Optional[str] = None) -> List[Dict]:
+        return [
+            case for case in self.snapshot()
+            if case_matches(case, status=status, severity=severity, category=category)
+        ]
+
+    def due_follow_ups(self, before: str, status: str = 'active',
+                       limit: Optional[int] = None) -> List[Dict]:
+        due = [
+            case for case in self.snapshot()
+            if case.get('status') == status and case.get('follow_up_scheduled', '') <= before
+        ]
+        return sorted(due, key=lambda case: case['follow_up_scheduled'])[:limit]
+
+    def claim_follow_up(self, case_id: str, due: str, lease_until: str) -> Optional[Dict]:
+        with self._stripe(case_id):
+            current = self._cases.get(case_id)
+            if current is None or current.get('status') != 'active' or \
+                    current.get('follow_up_scheduled') != due:
+                return None
+            case = {**current, 'follow_up_scheduled': lease_until}
+            self._store(case)
+            return case
+
+    def follow_up_times(self, status: str = 'active') -> Iterator[Tuple[str, str]]:
+        for case in self.snapshot():
+            if case.get('status') == status and case.get('follow_up_scheduled'):
+                yield case['id'], case['follow_up_scheduled']
+
+    def count_follow_ups(self, status: str = 'active') -> int:
+        return sum(1 for _ in self.follow_up_times(status))
+
+    def iter_cases(self, after: int = 0, limit: Optional[int] = None,
+                   **filters) -> Iterator[Tuple[int, Dict]]:
+        # Cursor is the position in the append-only order log
+        end = len(self._order)
+        yielded = 0
+        for position in range(after, end):
+            if limit is not None and yielded >= limit:
+                return
+            case = self._cases[self._order[position]]
+            if case_matches(case, **filters):
+                yielded += 1
+                yield position + 1, case
+
+
+class JournalCaseStore(MemoryCaseStore):
+    """
+    In-memory case store persisted to cases.json plus an append-only journal
+    Filtered lookups walk every case; use SQLiteCaseStore for large stores.
+
+    State lives in process memory, so only one store may own the files;
+    open_case_store() shares one store per file within a process, and
+    multi-worker deployments must use SQLiteCaseStore.
+    """
+
+    def __init__(self, cases_file: str, journal: Optional[CaseJournal] = None):
+        self.cases_file = cases_file
+        self.closed = False
+        self._lock_file = self._acquire_process_lock(cases_file + '.lock')
+        self.journal = journal or CaseJournal(cases_file)
+        cases, counter = self.journal.load()
+        super().__init__(cases, counter)
+        self.journal.start()
+
+    def _acquire_process_lock(self, lock_path: str):
+        """
+        Hold an exclusive lock so no other store writes the same journal
+
+        flock() locks belong to the open file, so a second store on the same
+        file conflicts even within this process (lockf() locks would not).
+        """
+        if fcntl is None:
+            return None
+        lock_file = open(lock_path, 'a')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            raise RuntimeError(
+                f"{self.cases_file} is already open in this or another process; "
+                "share it with open_case_store(), or set CASE_STORE=sqlite to run multiple workers"
+            )
+        return lock_file
+
+    def _persist(self, case: Dict):
+        try:
+            self.journal.append(case, self.counter)
+        except Exception as e:
+            print(f"⚠️  Warning: Could not save cases: {e}")
+
+    def close(self):
+        self.closed = True
+        self.journal.close()
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+
+# JournalCaseStore per cases file (real path), shared by every coordinator
+# in the process
+_journal_stores: Dict[str, JournalCaseStore] = {}
+_journal_stores_lock = threading.Lock()
+
+
+def shared_journal_store(cases_file: str) -> JournalCaseStore:
+    """The process's open JournalCaseStore for cases_file, opened on first use"""
+    key = os.path.realpath(cases_file)
+    with _journal_stores_lock:
+        store = _journal_stores.get(key)
+        if store is None or store.closed:
+            store = _journal_stores[key] = JournalCaseStore(cases_file)
+        return store
+
+
+def open_case_store(kind: Optional[str] = None, path: Optional[str] = None) -> CaseStore:
+    """
+    Create the configured case store
+
+    kind: 'json' (cases.json + journal, default; one store per file is
+          shared within the process), 'sqlite' or 'memory' (not persisted),
+          from CASE_STORE
+    path: store file, from CASES_FILE / CASES_DB, defaulting next to the app
+
+    A new, empty SQLite store first imports the JSON store's cases and
+    counter (CASES_FILE), so switching backends keeps history and case IDs.
+    """
+    kind = (kind or os.getenv('CASE_STORE') or 'json').lower()
+    base_dir = os.path.join(os.path.dirname(__file__), '..', '..')
+
+    if kind == 'sqlite':
+        from storage.sqlite_store import SQLiteCaseStore
+        store = SQLiteCaseStore(path or os.getenv('CASES_DB') or os.path.join(base_dir, 'cases.db'))
+        cases_file = os.getenv('CASES_FILE') or os.path.join(base_dir, 'cases.json')
+        imported = store.import_json_store(cases_file)
+        if imported:
+            print(f"📥 Imported {imported} cases from {cases_file} into {store.db_path}")
+        return store
+    if kind == 'json':
+        return shared_journal_store(path or os.getenv('CASES_FILE') or os.path.join(base_dir, 'cases.json'))
+    if kind == 'memory':
+        return MemoryCaseStore()
+
+    raise ValueError(f"Unknown case store '{kind}' (expected 'json', 'sqlite' or 'memory')")
@@ -0,0 +1,194 @@
+"""
+Append-only Case Journal
+Persists one JSON line per case mutation instead of rewriting cases.json
+Demonstrates: Write-ahead logging, background compaction, crash-safe replay
+"""
+
+import json
+import os
+import shutil
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+
+class CaseJournal:
+    """
+    Journal-backed persistence for the case store:
+    1. Every case mutation is appended as one JSON line (O(1) per write)
+    2. A background thread periodically folds the journal into the snapshot,
+       rebuilt from the files on disk rather than from any one store's memory
+    3. On startup, snapshot + journal are replayed; a torn last line is dropped
+    """
+
+    def __init__(self, snapshot_path: str, compact_threshold: int = 500,
+                 compact_interval: float = 60.0, fsync: bool = False):
+        self.snapshot_path = snapshot_path
+        self.journal_path = snapshot_path + '.journal'
+        # Journal being folded into the snapshot; survives a crash mid-compaction
+        self.rotated_path = self.journal_path + '.compacting'
+        self.compact_threshold = compact_threshold
+        self.compact_interval = compact_interval
+        self.fsync = fsync
+
+        self._lock = threading.Lock()
+        self._compact_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._file = None
+        self._pending = 0
+        self._worker: Optional[threading.Thread] = None
+        self._closed = False
+
+    def load(self) -> Tuple[Dict[str, Dict], int]:
+        """Replay snapshot and journal, returning (cases by id, case counter)"""
+        cases, counter = self._read_snapshot()
+
+        replayed = 0
+        for path in (self.rotated_path, self.journal_path):
+            count, counter = self._replay(path, cases, counter)
+            replayed += count
+
+        self._pending = replayed
+        return cases, counter
+
+    def _read_snapshot(self) -> Tuple[Dict[str, Dict], int]:
+        """Cases by id and case counter from the snapshot file"""
+        cases = {}
+        counter = 0
+        try:
+            with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            for case in data.get('cases', []):
+                cases[case['id']] = case
+            counter = data.get('metadata', {}).get('total_cases', 0)
+        except (FileNotFoundError, json.JSONDecodeError):
+            # Snapshot doesn't exist or is invalid, rely on the journal alone
+            pass
+        return cases, counter
+
+    def _replay(self, path: str, cases: Dict[str, Dict], counter: int) -> Tuple[int, int]:
+        """Apply journal records from path; truncate a torn trailing record"""
+        if not os.path.exists(path):
+            return 0, counter
+
+        count = 0
+        valid_bytes = 0
+        with open(path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    record = json.loads(line)
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    break
+                counter = self._apply(record, cases, counter)
+                valid_bytes += len(line)
+                count += 1
+
+        # A crash mid-append leaves a partial line; cut it so new appends stay parseable
+        if valid_bytes != os.path.getsize(path):
+            with open(path, 'r+b') as f:
+                f.truncate(valid_bytes)
+
+        return count, counter
+
+    @staticmethod
+    def _apply(record: Dict, cases: Dict[str, Dict], counter: int) -> int:
+        """Apply a single journal record to the in-memory cases"""
+        if record.get('op') == 'put':
+            case = record['case']
+            cases[case['id']] = case
+        return max(counter, record.get('counter', 0))
+
+    def append(self, case: Dict, counter: int):
+        """Append a case mutation to the journal"""
+        line = json.dumps({'op': 'put', 'case': case, 'counter': counter},
+                          ensure_ascii=False) + '\n'
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.journal_path, 'a', encoding='utf-8')
+            self._file.write(line)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            self._pending += 1
+            pending = self._pending
+
+        if pending >= self.compact_threshold:
+            self._wake.set()
+
+    def start(self):
+        """Start background compaction"""
+        if self._worker is None:
+            self._worker = threading.Thread(
+                target=self._compaction_loop, name='case-journal-compactor', daemon=True
+            )
+            self._worker.start()
+
+    def _compaction_loop(self):
+        """Compact when enough records accumulate or the interval elapses"""
+        while not self._closed:
+            self._wake.wait(self.compact_interval)
+            self._wake.clear()
+            if self._pending and not self._closed:
+                try:
+                    self.compact()
+                except Exception as e:
+                    print(f"⚠️  Warning: Journal compaction failed: {e}")
+
+    def compact(self):
+        """Fold journal records into a fresh snapshot"""
+        with self._compact_lock:
+            # Rotate the journal atomically w.r.t. appends
+            with self._lock:
+                if self._file is not None:
+                    self._file.close()
+                    self._file = None
+                if os.path.exists(self.journal_path):
+                    if os.path.exists(self.rotated_path):
+                        # Left over from an interrupted compaction; keep its records
+                        with open(self.journal_path, 'rb') as src, \
+                                open(self.rotated_path, 'ab') as dst:
+                            shutil.copyfileobj(src, dst)
+                        os.remove(self.journal_path)
+                    else:
+                        os.replace(self.journal_path, self.rotated_path)
+                self._pending = 0
+
+            # Slow part runs without blocking appends. The new snapshot is
+            # the old one plus the rotated records, read back from disk, so
+            # records this process never loaded are kept too.
+            cases, counter = self._read_snapshot()
+            _, counter = self._replay(self.rotated_path, cases, counter)
+            self._write_snapshot(list(cases.values()), counter)
+            if os.path.exists(self.rotated_path):
+                os.remove(self.rotated_path)
+
+    def _write_snapshot(self, cases: List[Dict], counter: int):
+        """Atomically replace the snapshot file"""
+        data = {
+            'cases': cases,
+            'metadata': {
+                'total_cases': counter,
+                'last_updated': datetime.now().isoformat(),
+                'version': '1.0'
+            }
+        }
+        tmp_path = self.snapshot_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+
+    def close(self):
+        """Stop the compactor and close the journal file"""
+        self._closed = True
+        self._wake.set()
+        if self._worker is not None:
+            self._worker.join(timeout=5)
+            self._worker = None
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
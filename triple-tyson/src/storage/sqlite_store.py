@@ -0,0 +1,267 @@
+"""
+SQLite Case Store
+Indexed, on-disk case storage for large deployments
+Demonstrates: WAL journaling, parameterized (cached) statements, secondary indexes
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from storage.case_store import CaseStore
+from storage.journal import CaseJournal
+
+
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS cases (
+        seq INTEGER PRIMARY KEY,
+        id TEXT NOT NULL UNIQUE,
+        timestamp TEXT NOT NULL,
+        status TEXT NOT NULL,
+        severity TEXT,
+        category TEXT,
+        country TEXT,
+        follow_up_scheduled TEXT,
+        data TEXT NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS idx_cases_status ON cases (status)",
+    "CREATE INDEX IF NOT EXISTS idx_cases_severity ON cases (severity, status)",
+    "CREATE INDEX IF NOT EXISTS idx_cases_category ON cases (category, status)",
+    "CREATE INDEX IF NOT EXISTS idx_cases_follow_up ON cases (status, follow_up_scheduled)",
+    "CREATE INDEX IF NOT EXISTS idx_cases_country ON cases (country)",
+    "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)",
+    "INSERT OR IGNORE INTO meta (key, value) VALUES ('case_counter', 0)",
+]
+
+# Statement text is constant so sqlite3's per-connection statement cache reuses
+# the compiled statement; only the bound parameters change between calls.
+SQL_UPSERT = """INSERT INTO cases
+    (id, timestamp, status, severity, category, country, follow_up_scheduled, data)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (id) DO UPDATE SET
+        status = excluded.status,
+        severity = excluded.severity,
+        category = excluded.category,
+        country = excluded.country,
+        follow_up_scheduled = excluded.follow_up_scheduled,
+        data = excluded.data"""
+SQL_GET = "SELECT data FROM cases WHERE id = ?"
+SQL_LIST = "SELECT data FROM cases ORDER BY seq"
+SQL_IDS = "SELECT id FROM cases ORDER BY seq"
+SQL_COUNT = "SELECT COUNT(*) FROM cases"
+SQL_DUE = """SELECT data FROM cases
+    WHERE status = ? AND follow_up_scheduled <= ?
+    ORDER BY follow_up_scheduled LIMIT ?"""
+SQL_FOLLOW_UP_TIMES = """SELECT id, follow_up_scheduled FROM cases
+    WHERE status = ? AND follow_up_scheduled IS NOT NULL"""
+SQL_COUNT_FOLLOW_UPS = """SELECT COUNT(*) FROM cases
+    WHERE status = ? AND follow_up_scheduled IS NOT NULL"""
+SQL_COUNTER = "SELECT value FROM meta WHERE key = 'case_counter'"
+SQL_BUMP_COUNTER = "UPDATE meta SET value = value + 1 WHERE key = 'case_counter'"
+SQL_SET_COUNTER = "UPDATE meta SET value = ? WHERE key = 'case_counter'"
+
+FILTER_COLUMNS = ('status', 'severity', 'category')
+FILTER_CLAUSES = {
+    'status': 'status = ?',
+    'severity': 'severity = ?',
+    'category': 'category = ?',
+    'country': 'country = ?',
+    'since': 'timestamp >= ?',
+    'until': 'timestamp < ?',
+}
+
+
+class SQLiteCaseStore(CaseStore):
+    """
+    Case store backed by a single SQLite database file:
+    1. WAL mode so readers never block the writer
+    2. One connection per thread (sqlite3 connections are not thread-safe)
+    3. Indexed columns for status, severity, category and follow-up time;
+       the full record is kept as JSON in the data column
+
+    Safe to share between processes (e.g. gunicorn workers): case IDs come
+    from a counter row bumped inside a write transaction, so two workers
+    can never allocate the same ID, and follow-ups are claimed the same way.
+    """
+
+    shared = True
+
+    def __init__(self, db_path: str, timeout: float = 30.0):
+        self.db_path = db_path
+        self.timeout = timeout
+        self._local = threading.local()
+
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        for statement in SCHEMA:
+            conn.execute(statement)
+
+    def _conn(self) -> sqlite3.Connection:
+        """Connection for the calling thread (reopened after a fork)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=self.timeout,
+                                   isolation_level=None, cached_statements=256)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @property
+    def counter(self) -> int:
+        return self._conn().execute(SQL_COUNTER).fetchone()[0]
+
+    def is_empty(self) -> bool:
+        """No cases stored and no case ID ever allocated"""
+        return len(self) == 0 and self.counter == 0
+
+    def import_json_store(self, cases_file: str) -> int:
+        """
+        One-time import of a JSON case store (cases.json plus its journal)
+
+        Runs only while the database is empty, so switching CASE_STORE from
+        json to sqlite keeps the case history and case IDs continue from the
+        JSON counter. Returns the number of cases imported.
+        """
+        if not self.is_empty() or not any(
+                os.path.exists(path) for path in (cases_file, cases_file + '.journal')):
+            return 0
+        cases, counter = CaseJournal(cases_file).load()
+
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Another worker may have imported (or created a case) meanwhile
+            if not self.is_empty():
+                conn.execute("ROLLBACK")
+                return 0
+            for case in cases.values():
+                self.put(case)
+            conn.execute(SQL_SET_COUNTER, (max(counter, len(cases)),))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return len(cases)
+
+    def next_case_id(self) -> str:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(SQL_BUMP_COUNTER)
+            number = conn.execute(SQL_COUNTER).fetchone()[0]
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return self.format_case_id(number)
+
+    def put(self, case: Dict):
+        classification = case.get('classification', {})
+        self._conn().execute(SQL_UPSERT, (
+            case['id'],
+            case['timestamp'],
+            case['status'],
+            classification.get('severity'),
+            classification.get('category'),
+            classification.get('country'),
+            case.get('follow_up_scheduled'),
+            json.dumps(case, ensure_ascii=False),
+        ))
+
+    def update(self, case_id: str, changes: Dict) -> Optional[Dict]:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(SQL_GET, (case_id,)).fetchone()
+            case = None
+            if row is not None:
+                case = {**json.loads(row[0]), **changes}
+                self.put(case)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return case
+
+    def __getitem__(self, case_id: str) -> Dict:
+        row = self._conn().execute(SQL_GET, (case_id,)).fetchone()
+        if row is None:
+            raise KeyError(case_id)
+        return json.loads(row[0])
+
+    def __iter__(self) -> Iterator[str]:
+        return (row[0] for row in self._conn().execute(SQL_IDS))
+
+    def __len__(self) -> int:
+        return self._conn().execute(SQL_COUNT).fetchone()[0]
+
+    def list_cases(self) -> List[Dict]:
+        return [json.loads(row[0]) for row in self._conn().execute(SQL_LIST)]
+
+    def find_cases(self, status: Optional[str] = None, severity: Optional[str] = None,
+                   category: Optional[str] = None) -> List[Dict]:
+        filters = {'status': status, 'severity': severity, 'category': category}
+        clauses = [f"{column} = ?" for column in FILTER_COLUMNS if filters[column]]
+        params = [filters[column] for column in FILTER_COLUMNS if filters[column]]
+
+        sql = "SELECT data FROM cases"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY seq"
+        return [json.loads(row[0]) for row in self._conn().execute(sql, params)]
+
+    def due_follow_ups(self, before: str, status: str = 'active',
+                       limit: Optional[int] = None) -> List[Dict]:
+        # LIMIT -1 means no limit in SQLite
+        rows = self._conn().execute(SQL_DUE, (status, before, -1 if limit is None else limit))
+        return [json.loads(row[0]) for row in rows]
+
+    def claim_follow_up(self, case_id: str, due: str, lease_until: str) -> Optional[Dict]:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(SQL_GET, (case_id,)).fetchone()
+            case = None
+            if row is not None:
+                current = json.loads(row[0])
+                if current.get('status') == 'active' and current.get('follow_up_scheduled') == due:
+                    case = {**current, 'follow_up_scheduled': lease_until}
+                    self.put(case)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return case
+
+    def follow_up_times(self, status: str = 'active') -> Iterator[Tuple[str, str]]:
+        return iter(self._conn().execute(SQL_FOLLOW_UP_TIMES, (status,)).fetchall())
+
+    def count_follow_ups(self, status: str = 'active') -> int:
+        # Counted inside idx_cases_follow_up, without reading case rows
+        return self._conn().execute(SQL_COUNT_FOLLOW_UPS, (status,)).fetchone()[0]
+
+    def iter_cases(self, after: int = 0, limit: Optional[int] = None,
+                   **filters) -> Iterator[Tuple[int, Dict]]:
+        # Keyset pagination on seq: cost depends on the page, not the offset
+        clauses = ["seq > ?"]
+        params = [after]
+        for name, clause in FILTER_CLAUSES.items():
+            if filters.get(name):
+                clauses.append(clause)
+                params.append(filters[name])
+
+        sql = "SELECT seq, data FROM cases WHERE " + " AND ".join(clauses) + " ORDER BY seq"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        for seq, data in self._conn().execute(sql, params):
+            yield seq, json.loads(data)
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
+            conn.close()
+            self._local.conn = None
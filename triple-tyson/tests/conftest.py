@@ -0,0 +1,126 @@
+"""
+Shared pytest fixtures for Crisis Response Coordinator tests
+"""
+
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from agents.circuit_breaker import default_batch_breaker, default_breaker
+from agents.coordinator_agent import CrisisCoordinator
+from classification.cache import ClassificationCache
+from storage.case_store import MemoryCaseStore
+
+MODEL_ANSWER = {'category': 'medical_emergency', 'severity': 'critical', 'keywords': ['chest pain'],
+                'confidence': 0.9, 'reasoning': 'model'}
+
+
+class StubModel:
+    """
+    Stand-in for a Gemini model:
+    1. Answers with `answer` as JSON (a string is sent as is; a callable is
+       called with the prompt and its result sent)
+    2. Counts calls and records prompts and request timeouts
+    3. Takes `delay` seconds, failing with TimeoutError once a shorter
+       request timeout expires; raises `error` if set
+    4. gated=True holds every answer until `release` is set
+    5. The async API tracks how many calls are in flight at once (`peak`)
+    """
+
+    def __init__(self, answer=None, delay=0.0, error=None, gated=False):
+        self.answer = MODEL_ANSWER if answer is None else answer
+        self.delay = delay
+        self.error = error
+        self.release = threading.Event()
+        if not gated:
+            self.release.set()
+        self.calls = 0
+        self.prompts = []
+        self.timeouts = []
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def _record(self, prompt, timeout=None):
+        with self._lock:
+            self.calls += 1
+            self.prompts.append(prompt)
+            self.timeouts.append(timeout)
+
+    def _response(self, prompt):
+        if self.error is not None:
+            raise self.error
+        answer = self.answer(prompt) if callable(self.answer) else self.answer
+        text = answer if isinstance(answer, str) else json.dumps(answer)
+        return type('Response', (), {'text': text})()
+
+    def generate_content(self, prompt, request_options=None):
+        timeout = (request_options or {}).get('timeout')
+        self._record(prompt, timeout)
+        self.release.wait(5)
+        if timeout is not None and timeout < self.delay:
+            time.sleep(timeout)
+            raise TimeoutError("deadline exceeded")
+        time.sleep(self.delay)
+        return self._response(prompt)
+
+    async def generate_content_async(self, prompt):
+        self._record(prompt)
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            if not self.release.is_set():
+                await asyncio.to_thread(self.release.wait, 5)
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        return self._response(prompt)
+
+
+@pytest.fixture
+def stub_model():
+    """StubModel factory: stub_model(answer=..., delay=..., error=..., gated=...)"""
+    return StubModel
+
+
+@pytest.fixture
+def make_coordinator():
+    """
+    Coordinator factory: make_coordinator(model, **options) builds a
+    coordinator over an in-memory store with the classification cache off
+    (unless options say otherwise) and `model` in place of Gemini
+    """
+    def make(model=None, **options):
+        options.setdefault('case_store', MemoryCaseStore())
+        options.setdefault('classification_cache', ClassificationCache(max_size=0))
+        coordinator = CrisisCoordinator(**options)
+        coordinator.model = model
+        return coordinator
+    return make
+
+
+@pytest.fixture(autouse=True)
+def isolated_cases_file(tmp_path, monkeypatch):
+    """Keep every test's case store out of the repository's cases.json"""
+    cases_file = tmp_path / 'cases.json'
+    monkeypatch.setenv('CASES_FILE', str(cases_file))
+    monkeypatch.setenv('CASES_DB', str(tmp_path / 'cases.db'))
+    return cases_file
+
+
+@pytest.fixture(autouse=True)
+def closed_circuit():
+    """Start every test with the shared model circuits closed"""
+    default_breaker.reset()
+    default_batch_breaker.reset()
+    yield
+    default_breaker.reset()
+    default_batch_breaker.reset()
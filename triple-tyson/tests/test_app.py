@@ -0,0 +1,136 @@
+"""
+Tests for the Flask API
+"""
+
+import sys
+import os
+
+import pytest
+
+# Add app and src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from agents.coordinator_agent import CrisisCoordinator
+from storage.case_store import MemoryCaseStore
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """Flask test client backed by a fresh in-memory coordinator"""
+    import app as app_module
+    monkeypatch.setattr(app_module, 'coordinator', CrisisCoordinator(case_store=MemoryCaseStore()))
+    app_module.app.config['TESTING'] = True
+    return app_module.app.test_client()
+
+
+def test_detect_returns_created_case(client):
+    """/detect reports the case created for this request"""
+    first = client.post('/detect', json={'crisis_description': 'Chest pain emergency'}).get_json()
+    second = client.post('/detect', json={'crisis_description': 'Panic attack'}).get_json()
+
+    assert first['case_id'] == 'CASE-00001'
+    assert first['classification']['category'] == 'medical_emergency'
+    assert second['case_id'] == 'CASE-00002'
+    assert second['classification']['category'] == 'mental_health_crisis'
+    assert 'CASE-00002' in second['response']
+
+
+def test_detect_requires_description(client):
+    """/detect rejects requests without a crisis description"""
+    response = client.post('/detect', json={})
+    assert response.status_code == 400
+
+
+def test_detect_structured_json_skips_text(client, monkeypatch):
+    """Accept: application/vnd.crisis+json returns protocol steps and helplines, no rendered text"""
+    import app as app_module
+    monkeypatch.setattr(app_module.coordinator, '_generate_response',
+                        lambda *args, **kwargs: pytest.fail("text rendered for a structured request"))
+
+    response = client.post('/detect', json={'crisis_description': 'Chest pain emergency'},
+                           headers={'Accept': 'application/vnd.crisis+json'})
+    payload = response.get_json(force=True)
+
+    assert response.mimetype == 'application/vnd.crisis+json'
+    assert 'Accept' in response.headers['Vary']
+    assert 'response' not in payload
+    assert payload['case_id'] == 'CASE-00001'
+    assert payload['protocol']['steps']['immediate_actions']
+    assert payload['helplines']['emergency_services']['emergency'] == '911'
+
+
+def test_detect_format_negotiation(client):
+    """?format= wins over Accept; plain JSON and */* keep the text response"""
+    text = client.post('/detect', json={'crisis_description': 'Flood'},
+                       headers={'Accept': 'application/json, */*'}).get_json()
+    structured = client.post('/detect?format=json', json={'crisis_description': 'Flood'},
+                             headers={'Accept': 'application/msgpack'})
+
+    assert 'CASE-00001' in text['response']
+    assert structured.mimetype == 'application/vnd.crisis+json'
+    assert client.post('/detect?format=xml', json={'crisis_description': 'Flood'}).status_code == 400
+
+
+def test_detect_msgpack(client, monkeypatch):
+    """MessagePack carries the structured payload; without msgpack it is refused before processing"""
+    msgpack = pytest.importorskip('msgpack')
+    import app as app_module
+
+    response = client.post('/detect', json={'crisis_description': 'Panic attack'},
+                           headers={'Accept': 'application/msgpack'})
+    payload = msgpack.unpackb(response.data)
+    assert response.mimetype == 'application/msgpack'
+    assert payload['classification']['category'] == 'mental_health_crisis'
+    assert payload['helplines']['crisis_support']
+
+    monkeypatch.setattr(app_module, 'msgpack', None)
+    refused = client.post('/detect?format=msgpack', json={'crisis_description': 'Panic attack'})
+    assert refused.status_code == 406
+    assert len(app_module.coordinator.active_cases) == 1
+
+
+def test_cases_paginates_with_cursor(client):
+    """/cases walks every case exactly once across pages"""
+    for crisis in ["Chest pain", "Panic attack", "Flood", "Earthquake", "Choking"]:
+        client.post('/detect', json={'crisis_description': crisis})
+
+    seen = []
+    cursor = 0
+    while cursor is not None:
+        page = client.get(f'/cases?limit=2&cursor={cursor}').get_json()
+        assert page['total_cases'] == 5
+        assert page['count'] <= 2
+        seen.extend(case['id'] for case in page['cases'])
+        cursor = page['next_cursor']
+
+    assert seen == ['CASE-00001', 'CASE-00002', 'CASE-00003', 'CASE-00004', 'CASE-00005']
+
+
+def test_cases_filters_and_projection(client):
+    """/cases applies filters and returns only the requested fields"""
+    client.post('/detect', json={'crisis_description': 'Chest pain', 'country': 'India'})
+    client.post('/detect', json={'crisis_description': 'Flood', 'country': 'USA'})
+    client.post('/detect', json={'crisis_description': 'Choking', 'country': 'USA'})
+
+    page = client.get('/cases?category=medical_emergency&country=USA&fields=id,status').get_json()
+    assert page['cases'] == [{'id': 'CASE-00003', 'status': 'active'}]
+    assert page['next_cursor'] is None
+
+    assert client.get('/cases?since=2999-01-01').get_json()['cases'] == []
+    assert client.get('/cases?limit=0').status_code == 400
+    assert client.get('/cases?since=yesterday').status_code == 400
+
+
+def test_followups_due_endpoint(client):
+    """/followups/due lists follow-ups due before the given time"""
+    client.post('/detect', json={'crisis_description': 'Chest pain emergency'})
+    client.post('/detect', json={'crisis_description': 'Panic attack'})
+
+    assert client.get('/followups/due').get_json()['follow_ups'] == []
+
+    page = client.get('/followups/due?before=2999-01-01T00:00:00&limit=1').get_json()
+    assert page['count'] == 1
+    assert page['scheduled_total'] == 2
+    assert page['follow_ups'][0]['case_id'] == 'CASE-00001'
+    assert client.get('/followups/due?before=soon').status_code == 400
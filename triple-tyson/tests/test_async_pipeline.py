@@ -0,0 +1,119 @@
+"""
+Tests for the asyncio coordinator pipeline and the ASGI app
+"""
+
+import asyncio
+import sys
+import os
+import threading
+
+import pytest
+
+# Add app and src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from agents.async_llm import ModelLimiter
+from agents.circuit_breaker import CircuitBreaker
+from agents.specialist_agents import MedicalEmergencyAgent
+from storage.case_store import MemoryCaseStore
+
+
+def test_concurrent_reports_are_bounded_by_limiter(stub_model, make_coordinator):
+    """Many reports wait on the model concurrently, never beyond the limit"""
+    limiter = ModelLimiter(limit=10)
+    coordinator = make_coordinator(stub_model(delay=0.05), limiter=limiter)
+
+    async def run():
+        return await asyncio.gather(*(
+            coordinator.process_crisis_async(f"Chest pain report {i}") for i in range(100)
+        ))
+
+    results = asyncio.run(run())
+
+    assert coordinator.model.peak == 10
+    assert limiter.stats() == {'limit': 10, 'in_flight': 0, 'waiting': 0}
+    assert len({result.case_id for result in results}) == 100
+    assert all(result.classification['reasoning'] == 'model' for result in results)
+
+
+def test_time_queued_for_the_limiter_does_not_trip_the_breaker(stub_model, make_coordinator):
+    """Only the model call counts as latency, not the wait for a request slot"""
+    breaker = CircuitBreaker(slow_call_seconds=0.1, window=5, min_calls=3)
+    coordinator = make_coordinator(stub_model(delay=0.02), limiter=ModelLimiter(limit=1),
+                                   breaker=breaker, request_deadline=0)
+
+    async def run():
+        return await asyncio.gather(*(
+            coordinator.process_crisis_async(f"Chest pain report {i}") for i in range(20)
+        ))
+
+    results = asyncio.run(run())
+
+    assert breaker.state == 'closed'
+    assert all(result.classification['reasoning'] == 'model' for result in results)
+
+
+class ThreadRecordingStore(MemoryCaseStore):
+    """MemoryCaseStore that records which thread each write runs in"""
+
+    def __init__(self):
+        super().__init__()
+        self.threads = []
+
+    def put(self, case):
+        self.threads.append(threading.get_ident())
+        super().put(case)
+
+
+def test_case_creation_runs_off_the_event_loop(make_coordinator):
+    """Storing the case and rendering the response do not block the loop thread"""
+    store = ThreadRecordingStore()
+    coordinator = make_coordinator(case_store=store)
+
+    async def run():
+        return threading.get_ident(), await coordinator.process_crisis_async("Chest pain")
+
+    loop_thread, result = asyncio.run(run())
+
+    assert store.threads and loop_thread not in store.threads
+    assert result.case_id in result.response
+
+
+def test_async_matches_sync_in_demo_mode(make_coordinator):
+    """Without a model the async pipeline gives the same answers as the sync one"""
+    coordinator = make_coordinator()
+
+    result = asyncio.run(coordinator.process_crisis_async("Panic attack", 'UK'))
+    assert result.classification == coordinator.classify_crisis("Panic attack", 'UK')
+    assert result.case_id in result.response
+
+    agent = MedicalEmergencyAgent()
+    agent.model = None
+    classification = {'keywords': ['chest pain']}
+    assert asyncio.run(agent.assess_medical_emergency_async("chest pain", classification)) == \
+        agent.assess_medical_emergency("chest pain", classification)
+
+
+def test_asgi_detect_and_delegated_routes(monkeypatch, make_coordinator):
+    """The ASGI app serves /detect natively and the rest through Flask"""
+    pytest.importorskip('fastapi')
+    pytest.importorskip('httpx')
+    from fastapi.testclient import TestClient
+    import app as app_module
+    import asgi
+
+    monkeypatch.setattr(app_module, 'coordinator', make_coordinator())
+    client = TestClient(asgi.app)
+
+    created = client.post('/detect', json={'crisis_description': 'Flood in the street'}).json()
+    assert created['case_id'] == 'CASE-00001'
+    assert created['classification']['category'] == 'disaster_emergency'
+    assert client.post('/detect', json={}).status_code == 400
+    structured = client.post('/detect?format=json', json={'crisis_description': 'Flood in the street'})
+    assert structured.headers['content-type'] == 'application/vnd.crisis+json'
+    assert structured.json()['protocol']['steps'] and 'response' not in structured.json()
+
+    case = client.get('/case/CASE-00001').json()
+    assert case['case']['id'] == 'CASE-00001'
+    assert client.get('/health').json()['llm_requests']['limit'] > 0
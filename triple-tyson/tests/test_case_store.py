@@ -0,0 +1,260 @@
+"""
+Tests for the pluggable case stores
+"""
+
+import multiprocessing
+import sys
+import os
+import threading
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from agents.coordinator_agent import CrisisCoordinator
+from storage.case_store import JournalCaseStore, MemoryCaseStore, open_case_store
+from storage.sqlite_store import SQL_COUNT_FOLLOW_UPS, SQLiteCaseStore
+
+
+@pytest.fixture(params=['json', 'sqlite', 'memory'])
+def store_kind(request, monkeypatch):
+    """Run a test against each case store backend"""
+    monkeypatch.setenv('CASE_STORE', request.param)
+    return request.param
+
+
+def test_store_selected_from_environment(store_kind):
+    """CASE_STORE picks the backend"""
+    store = open_case_store()
+    expected = {'json': JournalCaseStore, 'sqlite': SQLiteCaseStore, 'memory': MemoryCaseStore}
+    assert type(store) is expected[store_kind]
+    store.close()
+
+
+def test_coordinator_keeps_a_given_empty_store(store_kind):
+    """An empty store passed to the coordinator is used, not replaced by CASE_STORE's"""
+    store = MemoryCaseStore()
+    assert len(store) == 0
+
+    coordinator = CrisisCoordinator(case_store=store)
+    coordinator.handle_crisis("Flood")
+
+    assert coordinator.store is store
+    assert [case['user_input'] for case in store.values()] == ["Flood"]
+
+
+def test_coordinator_workflow(store_kind):
+    """Cases created by the coordinator are retrievable from either backend"""
+    coordinator = CrisisCoordinator()
+    for crisis in ["Chest pain emergency", "I want to kill myself", "Flood"]:
+        coordinator.handle_crisis(crisis)
+
+    assert coordinator.case_counter == 3
+    assert len(coordinator.active_cases) == 3
+    assert [c['id'] for c in coordinator.list_active_cases()] == \
+        ['CASE-00001', 'CASE-00002', 'CASE-00003']
+    assert coordinator.get_case_status('CASE-00002')['user_input'] == "I want to kill myself"
+    assert coordinator.get_case_status('CASE-99999') is None
+
+
+def test_filtered_lookups(store_kind):
+    """find_cases and due_follow_ups filter on indexed fields"""
+    coordinator = CrisisCoordinator()
+    for crisis in ["Chest pain emergency", "Panic attack", "I want to kill myself"]:
+        coordinator.handle_crisis(crisis)
+
+    critical = coordinator.find_cases(status='active', severity='critical')
+    assert [c['id'] for c in critical] == ['CASE-00001', 'CASE-00003']
+
+    mental = coordinator.find_cases(category='mental_health_crisis')
+    assert [c['id'] for c in mental] == ['CASE-00002', 'CASE-00003']
+
+    # Critical follow-ups (2h) come before medium ones (1 day)
+    far_future = '9999-12-31T00:00:00'
+    due = coordinator.store.due_follow_ups(far_future)
+    assert [c['classification']['severity'] for c in due] == ['critical', 'critical', 'medium']
+    assert coordinator.store.due_follow_ups('2000-01-01T00:00:00') == []
+
+    coordinator.store.update('CASE-00002', {'status': 'closed'})
+    assert coordinator.store.count_follow_ups() == 2
+    assert coordinator.store.count_follow_ups('closed') == 1
+
+
+def test_update_merges_fields(store_kind):
+    """update() merges changes into the stored record"""
+    coordinator = CrisisCoordinator()
+    coordinator.handle_crisis("Flood")
+
+    updated = coordinator.store.update('CASE-00001', {'status': 'closed'})
+    assert updated['status'] == 'closed'
+    assert updated['user_input'] == "Flood"
+    assert coordinator.get_case_status('CASE-00001')['status'] == 'closed'
+    assert coordinator.store.update('CASE-99999', {'status': 'closed'}) is None
+
+
+def test_concurrent_writers_and_readers():
+    """Parallel case creation yields unique IDs while readers take snapshots"""
+    coordinator = CrisisCoordinator(case_store=MemoryCaseStore())
+    errors = []
+    stop = threading.Event()
+
+    def write():
+        for _ in range(200):
+            coordinator.handle_crisis("Chest pain emergency")
+
+    def read():
+        try:
+            while not stop.is_set():
+                snapshot = coordinator.list_active_cases()
+                ids = [case['id'] for case in snapshot]
+                assert len(set(ids)) == len(ids)
+                coordinator.find_cases(severity='critical')
+        except Exception as e:
+            errors.append(e)
+
+    readers = [threading.Thread(target=read) for _ in range(2)]
+    writers = [threading.Thread(target=write) for _ in range(8)]
+    for thread in readers + writers:
+        thread.start()
+    for thread in writers:
+        thread.join()
+    stop.set()
+    for thread in readers:
+        thread.join()
+
+    assert errors == []
+    assert coordinator.case_counter == 1600
+    assert len(coordinator.active_cases) == 1600
+    assert len({case['id'] for case in coordinator.list_active_cases()}) == 1600
+
+
+def test_sqlite_persists_without_loading_history(tmp_path):
+    """A reopened SQLite store sees prior cases and continues the counter"""
+    db_path = str(tmp_path / 'cases.db')
+    coordinator = CrisisCoordinator(case_store=SQLiteCaseStore(db_path))
+    coordinator.handle_crisis("Earthquake")
+
+    reopened = CrisisCoordinator(case_store=SQLiteCaseStore(db_path))
+    assert reopened.case_counter == 1
+    assert 'CASE-00001' in reopened.active_cases
+    reopened.handle_crisis("Fire in the building")
+    assert reopened.case_counter == 2
+
+
+def test_sqlite_uses_indexes(tmp_path):
+    """Severity and follow-up lookups and counts are index scans, not table scans"""
+    store = SQLiteCaseStore(str(tmp_path / 'cases.db'))
+    conn = store._conn()
+
+    plan = conn.execute(
+        "EXPLAIN QUERY PLAN SELECT data FROM cases WHERE severity = ? AND status = ?",
+        ('critical', 'active')
+    ).fetchall()
+    assert any('idx_cases_severity' in row[-1] for row in plan)
+
+    plan = conn.execute(
+        "EXPLAIN QUERY PLAN SELECT data FROM cases WHERE status = ? AND follow_up_scheduled <= ?",
+        ('active', '2030-01-01')
+    ).fetchall()
+    assert any('idx_cases_follow_up' in row[-1] for row in plan)
+
+    plan = conn.execute("EXPLAIN QUERY PLAN " + SQL_COUNT_FOLLOW_UPS, ('active',)).fetchall()
+    assert any('COVERING INDEX idx_cases_follow_up' in row[-1] for row in plan)
+
+
+def test_new_sqlite_store_imports_json_cases(isolated_cases_file):
+    """An empty SQLite store takes over cases.json's cases and counter, once"""
+    json_store = JournalCaseStore(str(isolated_cases_file))
+    coordinator = CrisisCoordinator(case_store=json_store)
+    for crisis in ["Chest pain emergency", "Flood"]:
+        coordinator.handle_crisis(crisis)
+    json_store.close()
+
+    store = open_case_store('sqlite')
+    assert [case['user_input'] for case in store.list_cases()] == ["Chest pain emergency", "Flood"]
+    assert store.find_cases(severity='critical')[0]['id'] == 'CASE-00001'
+    assert store.next_case_id() == 'CASE-00003'
+
+    # Already populated: reopening imports nothing again
+    assert store.import_json_store(str(isolated_cases_file)) == 0
+    assert len(open_case_store('sqlite')) == 2
+
+
+def _allocate_case_ids(db_path, count, queue):
+    """Worker process: allocate case IDs from a shared SQLite store"""
+    store = SQLiteCaseStore(db_path)
+    queue.put([store.next_case_id() for _ in range(count)])
+
+
+def test_sqlite_ids_unique_across_processes(tmp_path):
+    """Concurrent worker processes never allocate the same case ID"""
+    db_path = str(tmp_path / 'cases.db')
+    SQLiteCaseStore(db_path)
+
+    ctx = multiprocessing.get_context('fork')
+    queue = ctx.Queue()
+    workers = [ctx.Process(target=_allocate_case_ids, args=(db_path, 25, queue))
+               for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    case_ids = [case_id for _ in workers for case_id in queue.get(timeout=30)]
+    for worker in workers:
+        worker.join()
+
+    assert len(set(case_ids)) == 100
+    assert SQLiteCaseStore(db_path).counter == 100
+
+
+def _hold_journal_store(cases_file, ready, release):
+    """Worker process: keep a journal store open until told to exit"""
+    store = JournalCaseStore(cases_file)
+    ready.set()
+    release.wait(30)
+    store.close()
+
+
+def test_journal_store_is_single_process(tmp_path):
+    """A second process cannot open a journal store that is already in use"""
+    cases_file = str(tmp_path / 'cases.json')
+    ctx = multiprocessing.get_context('fork')
+    ready, release = ctx.Event(), ctx.Event()
+    holder = ctx.Process(target=_hold_journal_store, args=(cases_file, ready, release))
+    holder.start()
+    try:
+        assert ready.wait(30)
+        with pytest.raises(RuntimeError, match='CASE_STORE=sqlite'):
+            JournalCaseStore(cases_file)
+    finally:
+        release.set()
+        holder.join()
+
+    JournalCaseStore(cases_file).close()
+
+
+def test_journal_store_is_single_owner_within_a_process(tmp_path):
+    """A second store on an open cases file fails instead of silently diverging"""
+    cases_file = str(tmp_path / 'cases.json')
+    store = open_case_store('json', cases_file)
+    try:
+        with pytest.raises(RuntimeError, match='open_case_store'):
+            JournalCaseStore(cases_file)
+        assert open_case_store('json', cases_file) is store
+    finally:
+        store.close()
+
+
+def test_iter_cases_pages_and_filters(store_kind):
+    """iter_cases resumes after a cursor and applies filters on every backend"""
+    coordinator = CrisisCoordinator()
+    for crisis in ["Chest pain", "Panic attack", "Choking", "Flood"]:
+        coordinator.handle_crisis(crisis)
+
+    first = list(coordinator.store.iter_cases(limit=2))
+    assert [case['id'] for _, case in first] == ['CASE-00001', 'CASE-00002']
+    rest = list(coordinator.store.iter_cases(after=first[-1][0]))
+    assert [case['id'] for _, case in rest] == ['CASE-00003', 'CASE-00004']
+
+    medical = coordinator.store.iter_cases(category='medical_emergency', country='USA')
+    assert [case['id'] for _, case in medical] == ['CASE-00001', 'CASE-00003']
+    assert list(coordinator.store.iter_cases(until='2000-01-01')) == []
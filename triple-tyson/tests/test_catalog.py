@@ -0,0 +1,138 @@
+"""
+Tests for the hot-reloadable protocol and helpline catalog
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from agents.coordinator_agent import CrisisCoordinator
+from agents.specialist_agents import DisasterResponseAgent, MedicalEmergencyAgent
+from retrieval.catalog import HELPLINES_PATH, PROTOCOLS_PATH, Catalog, compile_catalog, shared_catalog
+from retrieval.schema import CatalogSchemaError
+from storage.case_store import MemoryCaseStore
+
+
+def copy_catalog(tmp_path):
+    """Catalog over copies of the shipped data files"""
+    protocols_path, helplines_path = tmp_path / 'protocols.json', tmp_path / 'helplines.json'
+    with open(PROTOCOLS_PATH, encoding='utf-8') as f:
+        protocols = json.load(f)
+    protocols_path.write_text(json.dumps(protocols), encoding='utf-8')
+    with open(HELPLINES_PATH, encoding='utf-8') as f:
+        helplines_path.write_text(f.read(), encoding='utf-8')
+    catalog = Catalog(str(protocols_path), str(helplines_path), reload_interval=0)
+    return catalog, protocols_path, protocols
+
+
+def rename_cardiac_protocol(protocols_path, protocols, name):
+    protocols['medical_emergencies'][0]['name'] = name
+    protocols_path.write_text(json.dumps(protocols), encoding='utf-8')
+    stat = os.stat(protocols_path)
+    os.utime(protocols_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_reload_swaps_in_a_new_version(tmp_path):
+    """Changed files produce a new snapshot; the old one stays intact for its holders"""
+    catalog, protocols_path, protocols = copy_catalog(tmp_path)
+    before = catalog.current()
+    assert catalog.reload() is False
+
+    rename_cardiac_protocol(protocols_path, protocols, 'Heart Attack (revised)')
+    assert catalog.reload() is True
+
+    after = catalog.current()
+    assert after.version != before.version
+    assert after.protocol_index.best('medical_emergencies', ['chest pain'])['name'] == 'Heart Attack (revised)'
+    assert before.protocol_index.best('medical_emergencies', ['chest pain'])['name'] != 'Heart Attack (revised)'
+    assert catalog.stats()['reloads'] == 1
+
+
+def test_invalid_file_keeps_previous_snapshot(tmp_path):
+    """A half-written or broken file is rejected and the live catalog keeps serving"""
+    catalog, protocols_path, _ = copy_catalog(tmp_path)
+    before = catalog.current()
+
+    protocols_path.write_text('{"medical_emergencies": [', encoding='utf-8')
+    assert catalog.reload() is False
+    assert catalog.current() is before
+    assert catalog.stats()['failed_reloads'] == 1
+
+
+def test_disaster_agent_takes_its_catalog_by_keyword(tmp_path):
+    """A positional API key, as before, is not mistaken for the catalog"""
+    catalog, _, _ = copy_catalog(tmp_path)
+
+    assert DisasterResponseAgent('api-key').catalog is shared_catalog()
+    assert DisasterResponseAgent(catalog=catalog).catalog is catalog
+    with pytest.raises(TypeError):
+        DisasterResponseAgent(None, catalog)
+
+    agent = DisasterResponseAgent('api-key')
+    assert agent.provide_disaster_guidance('earthquake', {'keywords': ['earthquake']})['protocol']
+
+
+def test_cases_record_their_catalog_version(tmp_path):
+    """Each case and result carries the version it was built from; agents see reloads"""
+    catalog, protocols_path, protocols = copy_catalog(tmp_path)
+    coordinator = CrisisCoordinator(case_store=MemoryCaseStore(), catalog=catalog)
+    coordinator.model = None
+    agent = MedicalEmergencyAgent(catalog=catalog)
+    agent.model = None
+
+    first = coordinator.process_crisis("My father is having chest pain")
+    rename_cardiac_protocol(protocols_path, protocols, 'Heart Attack (revised)')
+    catalog.reload()
+    second = coordinator.process_crisis("My father is having chest pain")
+
+    assert first.catalog_version != second.catalog_version
+    assert coordinator.store.get(first.case_id)['catalog_version'] == first.catalog_version
+    assert coordinator.store.get(second.case_id)['catalog_version'] == catalog.current().version
+    assert second.protocol['name'] == 'Heart Attack (revised)'
+    assert agent._find_protocol(['chest pain'])['name'] == 'Heart Attack (revised)'
+
+
+def test_precompiled_artifact_matches_json(tmp_path):
+    """Start-up from the artifact gives the same catalog; a stale artifact falls back to JSON"""
+    catalog, protocols_path, protocols = copy_catalog(tmp_path)
+    artifact = str(tmp_path / 'catalog.bin')
+    compile_catalog(artifact, catalog.protocols_path, catalog.helplines_path)
+
+    compiled = Catalog(catalog.protocols_path, catalog.helplines_path, 0, artifact).current()
+    parsed = catalog.current()
+    assert compiled.source == 'artifact' and compiled.version == parsed.version
+    assert compiled.protocols == parsed.protocols and compiled.helplines == parsed.helplines
+    report = "my father has chest pain and difficulty breathing"
+    assert compiled.protocol_index.search('medical_emergencies', [], report) == \
+        parsed.protocol_index.search('medical_emergencies', [], report)
+
+    rename_cardiac_protocol(protocols_path, protocols, 'Heart Attack (revised)')
+    stale = Catalog(catalog.protocols_path, catalog.helplines_path, 0, artifact).current()
+    assert stale.source == 'json'
+    assert stale.protocols['medical_emergencies'][0]['name'] == 'Heart Attack (revised)'
+
+
+def test_schema_violations_fail_the_build_and_reloads(tmp_path):
+    """Data failing the schema is rejected by compile_catalog and by hot reloads"""
+    catalog, protocols_path, protocols = copy_catalog(tmp_path)
+    before = catalog.current()
+
+    protocols['medical_emergencies'][1]['severity'] = 'urgent'
+    protocols['medical_emergencies'][2]['id'] = protocols['medical_emergencies'][0]['id']
+    rename_cardiac_protocol(protocols_path, protocols, 'Heart Attack (revised)')
+
+    with pytest.raises(CatalogSchemaError) as error:
+        compile_catalog(str(tmp_path / 'catalog.bin'), catalog.protocols_path, catalog.helplines_path)
+    assert error.value.problems == [
+        "medical_emergencies[1].severity: expected one of critical, high, medium, low",
+        "medical_emergencies[2].id: duplicate id 'cardiac_emergency'",
+    ]
+    assert not (tmp_path / 'catalog.bin').exists()
+
+    assert catalog.reload() is False
+    assert catalog.current() is before
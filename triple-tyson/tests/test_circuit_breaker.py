@@ -0,0 +1,74 @@
+"""
+Tests for the model circuit breaker
+"""
+
+import sys
+import os
+import time
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from agents.circuit_breaker import CircuitBreaker, CircuitOpenError
+from agents.specialist_agents import MedicalEmergencyAgent
+
+
+def call(breaker, fail=False, latency=0.0):
+    with breaker.guard():
+        time.sleep(latency)
+        if fail:
+            raise ConnectionError("API unavailable")
+
+
+def test_opens_on_failure_rate_and_recovers_through_probe():
+    """closed -> open on failures, fast rejection, half-open probe -> closed"""
+    breaker = CircuitBreaker(failure_rate=0.5, window=4, min_calls=4, open_seconds=0.05)
+    call(breaker)
+    call(breaker)
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            call(breaker, fail=True)
+    assert breaker.state == 'open'
+
+    with pytest.raises(CircuitOpenError):
+        call(breaker)
+    assert breaker.stats()['rejected_calls'] == 1
+
+    time.sleep(0.06)
+    assert breaker.stats()['state'] == 'half_open'
+    call(breaker)
+    assert breaker.state == 'closed'
+
+
+def test_failed_probe_reopens_and_slow_calls_count():
+    """A failed probe reopens the circuit; slow successes count as failures"""
+    breaker = CircuitBreaker(slow_call_seconds=0.01, window=2, min_calls=2, open_seconds=0.01)
+    call(breaker, latency=0.02)
+    call(breaker, latency=0.02)
+    assert breaker.state == 'open'
+
+    time.sleep(0.02)
+    with pytest.raises(ConnectionError):
+        call(breaker, fail=True)
+    assert breaker.state == 'open'
+    assert breaker.times_opened == 2
+
+
+def test_outage_skips_model_calls(stub_model, make_coordinator):
+    """Once open, coordinator and specialists fall back without calling the model"""
+    breaker = CircuitBreaker(min_calls=3, window=3)
+    coordinator = make_coordinator(stub_model(error=ConnectionError("API unavailable")),
+                                   breaker=breaker)
+
+    results = [coordinator.process_crisis(f"Chest pain {i}") for i in range(10)]
+    assert coordinator.model.calls == 3
+    assert all(result.degraded == ['classification'] for result in results)
+    assert all(result.classification['category'] == 'medical_emergency' for result in results)
+
+    agent = MedicalEmergencyAgent(breaker=breaker)
+    agent.model = coordinator.model
+    assessment = agent.assess_medical_emergency("chest pain", {'keywords': ['chest pain']})
+    assert coordinator.model.calls == 3
+    assert 'Immediate medical attention required' in assessment['assessment']
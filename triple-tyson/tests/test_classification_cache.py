@@ -0,0 +1,115 @@
+"""
+Tests for the classification cache
+"""
+
+import sys
+import os
+import threading
+import time
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from classification.cache import ClassificationCache
+
+
+CLASSIFICATION = {
+    'category': 'disaster_emergency', 'severity': 'high', 'keywords': ['earthquake'],
+    'confidence': 0.98, 'reasoning': 'Active seismic event', 'country': 'USA'
+}
+
+
+def test_normalized_key_and_counters():
+    """Case and whitespace differences hit the same entry; country does not"""
+    cache = ClassificationCache()
+    cache.put("Earthquake  building shaking", 'USA', CLASSIFICATION)
+
+    assert cache.get("earthquake building shaking ", 'USA') == CLASSIFICATION
+    assert cache.get("Earthquake building shaking", 'UK') is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # Callers get copies
+    cache.get("earthquake building shaking", 'USA')['keywords'].append('x')
+    assert cache.get("earthquake building shaking", 'USA')['keywords'] == ['earthquake']
+
+
+def test_lru_eviction_and_ttl():
+    """Least recently used entries are evicted and expired ones are dropped"""
+    cache = ClassificationCache(max_size=2)
+    cache.put("a", 'USA', CLASSIFICATION)
+    cache.put("b", 'USA', CLASSIFICATION)
+    cache.get("a", 'USA')
+    cache.put("c", 'USA', CLASSIFICATION)
+
+    assert cache.get("b", 'USA') is None
+    assert cache.get("a", 'USA') is not None
+    assert cache.evictions == 1
+
+    expiring = ClassificationCache(ttl=0.01)
+    expiring.put("a", 'USA', CLASSIFICATION)
+    time.sleep(0.02)
+    assert expiring.get("a", 'USA') is None
+    assert len(expiring) == 0
+
+
+def test_persists_across_restarts(tmp_path):
+    """A saved cache is loaded warm by a new instance"""
+    path = str(tmp_path / 'classification_cache.json')
+    cache = ClassificationCache(path=path)
+    cache.put("Flood in the street", 'UK', CLASSIFICATION)
+    cache.close()
+
+    restarted = ClassificationCache(path=path)
+    assert restarted.get("flood in the street", 'UK') == CLASSIFICATION
+
+
+def test_concurrent_saves_do_not_share_a_temporary_file(tmp_path):
+    """Caches saving the same file at once each write their own temporary copy"""
+    path = str(tmp_path / 'classification_cache.json')
+    caches = [ClassificationCache(path=path) for _ in range(4)]
+    for cache in caches:
+        cache.put("Flood in the street", 'UK', CLASSIFICATION)
+    errors = []
+
+    def save(cache):
+        try:
+            for _ in range(20):
+                cache.save()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=save, args=(cache,)) for cache in caches]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert os.listdir(tmp_path) == ['classification_cache.json']
+    assert ClassificationCache(path=path).get("flood in the street", 'UK') == CLASSIFICATION
+
+
+def test_coordinator_skips_model_for_repeated_reports(stub_model, make_coordinator):
+    """Only the first of several identical reports reaches the model"""
+    answer = {k: v for k, v in CLASSIFICATION.items() if k != 'country'}
+    coordinator = make_coordinator(stub_model(answer=answer), classification_cache=ClassificationCache())
+
+    first = coordinator.classify_crisis("Earthquake building shaking")
+    second = coordinator.classify_crisis("earthquake   building shaking")
+
+    assert coordinator.model.calls == 1
+    assert first == second == CLASSIFICATION
+    assert coordinator.classification_cache.hits == 1
+
+
+def test_invalid_model_answers_fall_back_uncached(stub_model, make_coordinator):
+    """A model answer without a known category and severity is neither used nor cached"""
+    coordinator = make_coordinator(stub_model(answer={'category': 'earthquake', 'severity': 'very high'}),
+                                   classification_cache=ClassificationCache())
+
+    first = coordinator.classify_crisis("Earthquake building shaking")
+    second = coordinator.classify_crisis("Earthquake building shaking")
+
+    assert first['reasoning'] == second['reasoning'] == 'Keyword-based disaster classification'
+    assert coordinator.model.calls == 2
+    assert len(coordinator.classification_cache) == 0
@@ -0,0 +1,94 @@
+"""
+Tests for batch classification
+"""
+
+import json
+import re
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from classification.cache import ClassificationCache
+
+
+def batch_answer(prompt):
+    """Gemini's answer to a batch prompt; reports containing 'garbled' get no valid entry"""
+    reports = re.findall(r'^(\d+)\. (".*")$', prompt.split('Reports:')[1], re.MULTILINE)
+    entries = []
+    for index, text in reports:
+        if 'garbled' in json.loads(text):
+            entries.append({'index': int(index), 'category': 'unknown'})
+        else:
+            entries.append({'index': int(index), 'category': 'other', 'severity': 'low',
+                            'keywords': [], 'confidence': 0.9, 'reasoning': 'model'})
+    return '```json\n' + json.dumps(entries) + '\n```'
+
+
+def test_packs_reports_into_bounded_batches(stub_model, make_coordinator):
+    """Reports are split by count, and duplicates and cached reports are not resent"""
+    model = stub_model(answer=batch_answer)
+    coordinator = make_coordinator(model, classification_cache=ClassificationCache())
+    coordinator.classify_crisis("Report 0")
+
+    reports = [f"Report {i}" for i in range(5)] + ["report 1", ("Report 2", 'UK')]
+    results = coordinator.classify_many(reports, max_batch_size=2)
+
+    # 1 single call + 5 unique uncached reports in batches of 2
+    assert len(model.prompts) == 1 + 3
+    assert len(results) == len(reports)
+    assert all(result['reasoning'] == 'model' for result in results)
+    assert [result['country'] for result in results] == ['USA'] * 6 + ['UK']
+
+
+def test_falls_back_per_item(stub_model, make_coordinator):
+    """A malformed entry falls back alone; a failed call falls back for its batch"""
+    coordinator = make_coordinator(stub_model(answer=batch_answer),
+                                   classification_cache=ClassificationCache())
+    results = coordinator.classify_many(["Calm day", "garbled chest pain report"])
+    assert results[0]['reasoning'] == 'model'
+    assert results[1]['category'] == 'medical_emergency'
+    assert results[1]['reasoning'] == 'Keyword-based medical classification'
+
+    coordinator = make_coordinator(stub_model(error=RuntimeError("model unavailable")),
+                                   classification_cache=ClassificationCache())
+    results = coordinator.classify_many(["Flood in the street", "Panic attack"])
+    assert [result['category'] for result in results] == ['disaster_emergency', 'mental_health_crisis']
+    assert len(coordinator.classification_cache) == 0
+
+
+def test_failing_batches_leave_the_live_circuit_closed(stub_model, make_coordinator):
+    """Bulk imports trip their own breaker, not the one guarding /detect"""
+    coordinator = make_coordinator(stub_model(error=RuntimeError("model unavailable")))
+    coordinator.classify_many([f"Flood report {i}" for i in range(10)], max_batch_size=1)
+
+    assert coordinator.batch_breaker.state == 'open'
+    assert coordinator.breaker.state == 'closed'
+
+
+def test_demo_mode_uses_keywords(make_coordinator):
+    """Without a model every report is classified by keywords"""
+    coordinator = make_coordinator()
+    results = coordinator.classify_many(["Chest pain", ("Earthquake", 'Japan')])
+    assert [result['category'] for result in results] == ['medical_emergency', 'disaster_emergency']
+    assert results[1]['country'] == 'Japan'
+
+
+def test_evaluation_scores_the_single_report_path(stub_model, make_coordinator):
+    """Evaluation accuracy comes from classify_crisis; classify_many is scored on its own"""
+    from evaluation import GOLD_DATASET, CrisisEvaluator
+
+    single = {'category': 'medical_emergency', 'severity': 'critical', 'keywords': [],
+              'confidence': 0.9, 'reasoning': 'model'}
+    model = stub_model(answer=lambda prompt: batch_answer(prompt) if 'Reports:' in prompt else single)
+    evaluator = CrisisEvaluator(make_coordinator(model))
+
+    metrics = evaluator.evaluate_classification()
+    assert len(model.prompts) == len(GOLD_DATASET)
+    assert not any('Reports:' in prompt for prompt in model.prompts)
+    assert {result['predicted_category'] for result in metrics['detailed_results']} == {'medical_emergency'}
+
+    batch = evaluator.evaluate_batch_classification()
+    assert len(model.prompts) == len(GOLD_DATASET) + 1
+    assert batch['category_accuracy'] == 0.0
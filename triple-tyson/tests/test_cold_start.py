@@ -0,0 +1,45 @@
+"""
+Tests that heavy dependencies stay off the worker start-up path
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+
+PROBE = """
+import json, sys
+import app
+status = app.app.test_client().get('/health').status_code
+print(json.dumps({'status': status,
+                  'loaded': [m for m in ('google.generativeai', 'numpy', 'sklearn')
+                             if m in sys.modules]}))
+"""
+
+WARM_PROBE = """
+import json, sys
+import app
+status = app.app.test_client().get('/health').status_code
+app.warm_up.join(30)
+print(json.dumps({'status': status, 'warmed': app.coordinator.warmed.is_set(),
+                  'numpy': 'numpy' in sys.modules,
+                  'postings': app.coordinator.protocol_index._postings is not None}))
+"""
+
+
+def run_probe(probe, **env):
+    result = subprocess.run([sys.executable, '-c', probe], cwd=ROOT, env=dict(os.environ, **env),
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_health_answers_without_heavy_imports():
+    """A fresh worker serves /health without importing the Gemini SDK, NumPy or sklearn"""
+    assert run_probe(PROBE, WARM_UP='false') == {'status': 200, 'loaded': []}
+
+
+def test_warm_up_loads_first_report_state_in_background():
+    """By default a worker loads NumPy and the retrieval postings after start-up, off the request path"""
+    assert run_probe(WARM_PROBE) == {'status': 200, 'warmed': True, 'numpy': True, 'postings': True}
@@ -0,0 +1,58 @@
+"""
+Tests for the per-report deadline budget
+"""
+
+import asyncio
+import sys
+import os
+import time
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from agents.deadline import Deadline
+from agents.specialist_agents import MentalHealthAgent
+
+
+def test_model_calls_get_the_remaining_budget():
+    """A model call may use all of the budget not spent before it"""
+    deadline = Deadline(10.0)
+    assert 9.9 < deadline.remaining() <= 10.0
+
+    deadline = Deadline(0.05)
+    time.sleep(0.06)
+    assert deadline.remaining() == 0.0
+
+
+def test_slow_model_degrades_classification(stub_model, make_coordinator):
+    """A model slower than the deadline falls back to keywords"""
+    coordinator = make_coordinator(stub_model(delay=0.5), request_deadline=0.2)
+
+    started = time.monotonic()
+    result = coordinator.process_crisis("Chest pain and sweating")
+    assert time.monotonic() - started < 0.4
+    assert result.degraded == ['classification']
+    assert result.classification['reasoning'] == 'Keyword-based medical classification'
+    assert 0.15 < coordinator.model.timeouts[0] <= 0.2
+
+    result = asyncio.run(coordinator.process_crisis_async("Chest pain and sweating"))
+    assert result.degraded == ['classification']
+
+
+def test_fast_model_is_not_degraded(stub_model, make_coordinator):
+    """Within budget the model's answer is used and nothing is degraded"""
+    coordinator = make_coordinator(stub_model(), request_deadline=5)
+    result = coordinator.process_crisis("Chest pain")
+    assert result.degraded == []
+    assert result.classification['reasoning'] == 'model'
+
+
+def test_specialist_enrichment_respects_deadline(stub_model):
+    """Specialist model calls are bounded by the deadline and degrade when it is spent"""
+    agent = MentalHealthAgent()
+    agent.model = stub_model(delay=0.5)
+    deadline = Deadline(0.2)
+
+    support = agent.provide_support("I'm having a panic attack", {'keywords': ['panic attack']}, deadline)
+    assert deadline.degraded == ['enrichment']
+    assert support['empathetic_response'].startswith("I hear you")
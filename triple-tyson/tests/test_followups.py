@@ -0,0 +1,142 @@
+"""
+Tests for the follow-up index and dispatcher
+"""
+
+import json
+import sys
+import os
+from datetime import datetime, timedelta
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from agents.coordinator_agent import CrisisCoordinator
+from followups import FileFollowUpSink, FollowUpDispatcher, FollowUpIndex
+from storage.case_store import MemoryCaseStore
+from storage.sqlite_store import SQLiteCaseStore
+
+
+class FailingSink:
+    """Sink that is always down"""
+
+    def send(self, follow_ups):
+        raise ConnectionError("sink unavailable")
+
+
+def test_index_orders_and_reschedules():
+    """due() returns current entries earliest first and skips stale ones"""
+    index = FollowUpIndex()
+    index.schedule('CASE-00001', '2030-01-01T12:00:00')
+    index.schedule('CASE-00002', '2030-01-01T09:00:00')
+    index.schedule('CASE-00003', '2030-01-02T09:00:00')
+    index.schedule('CASE-00001', '2030-01-01T08:00:00')
+
+    assert index.due('2030-01-01T23:59:59') == [('CASE-00001', '2030-01-01T08:00:00'),
+                                                ('CASE-00002', '2030-01-01T09:00:00')]
+    assert index.due('2030-12-31T00:00:00', limit=1) == [('CASE-00001', '2030-01-01T08:00:00')]
+    assert index.next_due() == '2030-01-01T08:00:00'
+    assert len(index) == 3
+
+    # Peeking leaves the entries in place; popping removes them
+    assert index.pop_due('2030-01-01T08:30:00', limit=10) == [('CASE-00001', '2030-01-01T08:00:00')]
+    assert index.due('2030-01-01T08:30:00') == []
+    assert len(index) == 2
+
+
+def test_coordinator_tracks_follow_ups():
+    """New cases are scheduled and due_follow_ups reports them by due time"""
+    coordinator = CrisisCoordinator(case_store=MemoryCaseStore())
+    coordinator.handle_crisis("Panic attack")
+    coordinator.handle_crisis("Chest pain emergency")
+
+    assert coordinator.due_follow_ups() == []
+    later = (datetime.now() + timedelta(days=2)).isoformat()
+    due = coordinator.due_follow_ups(later)
+    assert [item['case_id'] for item in due] == ['CASE-00002', 'CASE-00001']
+    assert due[0]['severity'] == 'critical'
+
+
+def test_index_rebuilt_from_store():
+    """A restarted coordinator rebuilds the index from active cases"""
+    store = MemoryCaseStore()
+    CrisisCoordinator(case_store=store).handle_crisis("Flood")
+
+    restarted = CrisisCoordinator(case_store=store)
+    assert len(restarted.follow_ups) == 1
+
+
+def test_dispatcher_delivers_due_batch(tmp_path):
+    """Due follow-ups go to the sink and their cases are marked sent"""
+    coordinator = CrisisCoordinator(case_store=MemoryCaseStore())
+    for crisis in ["Chest pain emergency", "I want to kill myself", "Panic attack"]:
+        coordinator.handle_crisis(crisis)
+
+    sink_path = tmp_path / 'followups.jsonl'
+    dispatcher = FollowUpDispatcher(coordinator.store, coordinator.follow_ups,
+                                    FileFollowUpSink(str(sink_path)), batch_size=1)
+    sent = dispatcher.dispatch_due(datetime.now() + timedelta(hours=3))
+
+    assert sent == 2
+    with open(sink_path, encoding='utf-8') as f:
+        delivered = [json.loads(line)['case_id'] for line in f]
+    assert sorted(delivered) == ['CASE-00001', 'CASE-00002']
+    assert coordinator.get_case_status('CASE-00001')['status'] == 'follow_up_sent'
+    assert coordinator.get_case_status('CASE-00003')['status'] == 'active'
+    assert len(coordinator.follow_ups) == 1
+
+
+def test_dispatcher_retries_failed_batch():
+    """A failing sink leaves cases active and reschedules them"""
+    coordinator = CrisisCoordinator(case_store=MemoryCaseStore())
+    coordinator.handle_crisis("Chest pain emergency")
+
+    now = datetime.now() + timedelta(hours=3)
+    dispatcher = FollowUpDispatcher(coordinator.store, coordinator.follow_ups, FailingSink(),
+                                    retry_delay=timedelta(minutes=5))
+    assert dispatcher.dispatch_due(now) == 0
+    assert dispatcher.failed_batches == 1
+    assert coordinator.get_case_status('CASE-00001')['status'] == 'active'
+    assert coordinator.follow_ups.next_due() == (now + timedelta(minutes=5)).isoformat()
+
+
+class RecordingSink:
+    """Sink that keeps every delivered follow-up"""
+
+    def __init__(self):
+        self.sent = []
+
+    def send(self, follow_ups):
+        self.sent.extend(follow_ups)
+
+
+def test_shared_store_follow_ups_across_workers(tmp_path):
+    """With SQLite, every worker sees all due follow-ups and each is delivered once"""
+    db_path = str(tmp_path / 'cases.db')
+    workers = [CrisisCoordinator(case_store=SQLiteCaseStore(db_path)) for _ in range(3)]
+    workers[0].handle_crisis("Chest pain emergency")
+    workers[1].handle_crisis("I want to kill myself")
+
+    later = (datetime.now() + timedelta(hours=3)).isoformat()
+    assert [item['case_id'] for item in workers[2].due_follow_ups(later)] == ['CASE-00001', 'CASE-00002']
+    assert workers[2].scheduled_follow_ups() == 2
+
+    sink = RecordingSink()
+    now = datetime.now() + timedelta(hours=3)
+    sent = sum(FollowUpDispatcher(worker.store, worker.follow_ups, sink).dispatch_due(now)
+               for worker in workers)
+
+    assert sent == 2
+    assert sorted(item['case_id'] for item in sink.sent) == ['CASE-00001', 'CASE-00002']
+    assert workers[2].get_case_status('CASE-00001')['status'] == 'follow_up_sent'
+
+
+def test_claim_is_won_once(tmp_path):
+    """A follow-up can only be claimed at the time it is scheduled, and only once"""
+    for store in (MemoryCaseStore(), SQLiteCaseStore(str(tmp_path / 'cases.db'))):
+        coordinator = CrisisCoordinator(case_store=store)
+        case_id = coordinator.process_crisis("Flood").case_id
+        due = store[case_id]['follow_up_scheduled']
+
+        assert store.claim_follow_up(case_id, due, '2999-01-01T00:00:00') is not None
+        assert store.claim_follow_up(case_id, due, '2999-01-01T00:00:00') is None
+        assert store[case_id]['follow_up_scheduled'] == '2999-01-01T00:00:00'
@@ -0,0 +1,64 @@
+"""
+Tests for the precomputed helpline resolver
+"""
+
+import json
+import sys
+import os
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from agents.coordinator_agent import CrisisCoordinator
+from retrieval.catalog import HELPLINES_PATH
+from retrieval.helplines import HelplineResolver
+from storage.case_store import MemoryCaseStore
+
+
+@pytest.fixture
+def helplines():
+    """The shipped helpline database"""
+    with open(HELPLINES_PATH, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+@pytest.mark.parametrize('country, emergency', [
+    ('USA', '911'), ('US', '911'), ('u.s.a.', '911'), ('United States', '911'),
+    ('India', '112'), ('india', '112'), ('IN', '112'),
+    ('United Kingdom', '999'), ('gb', '999'), ('Great-Britain', '999'),
+    ('Canada', '911'), ('AU', '000'),
+])
+def test_aliases_and_iso_codes_resolve(helplines, country, emergency):
+    """Country names, aliases and ISO codes reach the country's own numbers"""
+    resolver = HelplineResolver(helplines, default_country='USA')
+
+    assert resolver.resolve(country, 'medical_emergency')['emergency_services']['emergency'] == emergency
+    assert resolver.stats()['unknown_country'] == 0
+
+
+def test_fallbacks_are_counted(helplines):
+    """Unknown countries get the default bundle; missing crisis lines use the international directory"""
+    resolver = HelplineResolver(helplines, default_country='India')
+
+    assert resolver.resolve('Atlantis', 'medical_emergency') is resolver.resolve('India', 'medical_emergency')
+    assert resolver.resolve(None, 'other')['emergency_services']['emergency'] == '112'
+    uk = resolver.resolve('UK', 'mental_health_crisis')
+    assert uk['emergency_services']['emergency'] == '999'
+    assert uk['crisis_support'] == [helplines['global_helplines']['mental_health']['international']]
+
+    stats = resolver.stats()
+    assert (stats['resolved'], stats['unknown_country'], stats['partial']) == (4, 1, 1)
+    assert stats['top_unknown'] == [('atlantis', 1)]
+
+
+def test_coordinator_uses_resolver():
+    """get_helplines keeps its shape and now understands aliases"""
+    coordinator = CrisisCoordinator(case_store=MemoryCaseStore())
+
+    helplines = coordinator.get_helplines({'category': 'mental_health_crisis', 'country': 'india'})
+    assert helplines['emergency_services']['emergency'] == '112'
+    assert helplines['crisis_support'][0]['name'] == 'Vandrevala Foundation'
+    assert set(coordinator.get_helplines({'category': 'disaster_emergency', 'country': 'US'})) == \
+        {'emergency_services'}
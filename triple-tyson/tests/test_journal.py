@@ -0,0 +1,122 @@
+"""
+Tests for the append-only case journal
+"""
+
+import json
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from agents.coordinator_agent import CrisisCoordinator
+from storage.journal import CaseJournal
+
+
+def test_cases_survive_restart(isolated_cases_file):
+    """Cases written through the journal are replayed by a new coordinator"""
+    coordinator = CrisisCoordinator()
+    coordinator.handle_crisis("Chest pain emergency")
+    coordinator.handle_crisis("Panic attack")
+    coordinator.store.close()
+
+    restarted = CrisisCoordinator()
+    assert restarted.store is not coordinator.store
+    assert restarted.case_counter == 2
+    assert set(restarted.active_cases) == {'CASE-00001', 'CASE-00002'}
+    assert restarted.get_case_status('CASE-00002')['user_input'] == "Panic attack"
+
+
+def test_append_does_not_rewrite_snapshot(isolated_cases_file):
+    """Creating a case appends one journal line and leaves the snapshot alone"""
+    coordinator = CrisisCoordinator()
+    coordinator.handle_crisis("Earthquake")
+
+    assert not isolated_cases_file.exists()
+    with open(coordinator.store.journal.journal_path, encoding='utf-8') as f:
+        lines = f.readlines()
+    assert len(lines) == 1
+    assert json.loads(lines[0])['case']['id'] == 'CASE-00001'
+
+
+def test_compaction_folds_journal_into_snapshot(isolated_cases_file):
+    """Compaction writes cases.json in the legacy format and clears the journal"""
+    coordinator = CrisisCoordinator()
+    for crisis in ["Chest pain", "Flood", "Panic attack"]:
+        coordinator.handle_crisis(crisis)
+
+    coordinator.store.journal.compact()
+
+    with open(isolated_cases_file, encoding='utf-8') as f:
+        data = json.load(f)
+    assert data['metadata']['total_cases'] == 3
+    assert [c['id'] for c in data['cases']] == ['CASE-00001', 'CASE-00002', 'CASE-00003']
+    assert not os.path.exists(coordinator.store.journal.journal_path)
+
+    coordinator.handle_crisis("Fire in the building")
+    coordinator.store.close()
+    restarted = CrisisCoordinator()
+    assert restarted.case_counter == 4
+    assert len(restarted.active_cases) == 4
+
+
+def test_coordinators_share_one_store_per_file(isolated_cases_file):
+    """A second coordinator in the process reuses the open store instead of a stale copy"""
+    first = CrisisCoordinator()
+    first.handle_crisis("Chest pain")
+    second = CrisisCoordinator()
+    second.handle_crisis("Flood")
+
+    assert second.store is first.store
+    first.store.journal.compact()
+    cases, counter = CaseJournal(str(isolated_cases_file)).load()
+    assert sorted(cases) == ['CASE-00001', 'CASE-00002'] and counter == 2
+
+
+def test_compaction_keeps_records_written_by_other_journals(tmp_path):
+    """The snapshot is rebuilt from disk, not from the compacting journal's view"""
+    path = str(tmp_path / 'cases.json')
+    first, second = CaseJournal(path), CaseJournal(path)
+    first.append({'id': 'CASE-00001'}, 1)
+    second.append({'id': 'CASE-00002'}, 2)
+    second.close()
+
+    first.compact()
+    first.close()
+
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    assert [case['id'] for case in data['cases']] == ['CASE-00001', 'CASE-00002']
+    assert data['metadata']['total_cases'] == 2
+
+
+def test_torn_record_is_dropped(tmp_path):
+    """A partially written last line from a crash is ignored and truncated"""
+    journal = CaseJournal(str(tmp_path / 'cases.json'))
+    journal.append({'id': 'CASE-00001', 'status': 'active'}, 1)
+    journal.close()
+    with open(journal.journal_path, 'a', encoding='utf-8') as f:
+        f.write('{"op": "put", "case": {"id": "CASE-000')
+
+    replay = CaseJournal(str(tmp_path / 'cases.json'))
+    cases, counter = replay.load()
+    assert list(cases) == ['CASE-00001']
+    assert counter == 1
+
+    replay.append({'id': 'CASE-00002', 'status': 'active'}, 2)
+    replay.close()
+    cases, counter = CaseJournal(str(tmp_path / 'cases.json')).load()
+    assert list(cases) == ['CASE-00001', 'CASE-00002']
+    assert counter == 2
+
+
+def test_interrupted_compaction_is_replayed(tmp_path):
+    """Records in a rotated journal are recovered if compaction never finished"""
+    journal = CaseJournal(str(tmp_path / 'cases.json'))
+    journal.append({'id': 'CASE-00001', 'status': 'active'}, 1)
+    journal.close()
+    os.replace(journal.journal_path, journal.rotated_path)
+
+    cases, counter = CaseJournal(str(tmp_path / 'cases.json')).load()
+    assert list(cases) == ['CASE-00001']
+    assert counter == 1
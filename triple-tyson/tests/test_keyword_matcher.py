@@ -0,0 +1,44 @@
+"""
+Tests for the compiled fallback keyword matcher
+"""
+
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from classification.keyword_matcher import FallbackKeywordMatcher
+
+
+def test_curated_priority_and_severity():
+    """Curated keywords pick the category in priority order and flag critical cases"""
+    matcher = FallbackKeywordMatcher()
+
+    match = matcher.match("Chest pain after the EARTHQUAKE")
+    assert match == {'category': 'medical_emergency', 'keywords': ['chest pain'], 'critical': False}
+
+    match = matcher.match("I feel hopeless and think about suicide")
+    assert match['category'] == 'mental_health_crisis'
+    assert match['keywords'] == ['suicide', 'hopeless']
+    assert match['critical'] is True
+
+    assert matcher.match("I am worried")['critical'] is False
+
+
+def test_only_curated_keywords_classify():
+    """Protocol keywords outside the curated tables leave the text unclassified"""
+    matcher = FallbackKeywordMatcher()
+
+    assert matcher.match("There is a fire")['category'] == 'disaster_emergency'
+    assert matcher.match("smoke everywhere") == {'category': None, 'keywords': [], 'critical': False}
+
+
+def test_keywords_for_one_category():
+    """keywords_for lists only the given category's hits, in table order"""
+    matcher = FallbackKeywordMatcher()
+    text = "Panic and anxiety after the flood"
+
+    assert matcher.keywords_for(text, 'mental_health_crisis') == ['panic', 'anxiety']
+    assert matcher.keywords_for(text, 'disaster_emergency') == ['flood']
+    assert matcher.keywords_for(text, 'unknown') == []
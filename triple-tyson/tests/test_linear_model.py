@@ -0,0 +1,88 @@
+"""
+Tests for the local linear classifier
+"""
+
+import json
+import sys
+import os
+
+import numpy as np
+import pytest
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from classification.linear_model import LinearCrisisClassifier, training_examples
+from evaluation import GOLD_DATASET
+
+
+@pytest.fixture(scope='module')
+def model():
+    """Classifier trained on the gold set and protocol keywords"""
+    with open(os.path.join(os.path.dirname(__file__), '..', 'src', 'data', 'crisis_protocols.json'),
+              'r', encoding='utf-8') as f:
+        protocols = json.load(f)
+    texts, categories, severities = training_examples(GOLD_DATASET, protocols=protocols)
+    return LinearCrisisClassifier().fit(texts, categories, severities)
+
+
+def test_training_examples_skip_keyword_labelled_cases():
+    """Only model-labelled cases are used as training data"""
+    cases = [
+        {'user_input': 'Flood', 'classification': {'category': 'disaster_emergency', 'severity': 'high',
+                                                   'reasoning': 'Keyword-based disaster classification'}},
+        {'user_input': 'Lost at sea', 'classification': {'category': 'disaster_emergency', 'severity': 'high',
+                                                         'reasoning': 'Stranded'}},
+    ]
+    texts, categories, severities = training_examples(GOLD_DATASET, cases)
+    assert texts[-1] == 'Lost at sea'
+    assert len(texts) == len(GOLD_DATASET) + 1
+
+
+def test_batch_prediction_and_calibrated_confidence(model):
+    """Batch predictions fit the gold set with probabilities in [0, 1]"""
+    predictions = model.predict([item['input'] for item in GOLD_DATASET])
+    assert [p['category'] for p in predictions] == [item['expected_category'] for item in GOLD_DATASET]
+    assert all(0.0 <= p['confidence'] <= p['category_confidence'] <= 1.0 for p in predictions)
+    assert model.predict([]) == []
+
+
+def test_save_and_load_round_trip(model, tmp_path):
+    """A loaded artifact predicts exactly like the trained model"""
+    path = str(tmp_path / 'local_classifier.npz')
+    model.save(path)
+    loaded = LinearCrisisClassifier.load(path)
+
+    reports = ["chest pain at work", "hurricane is coming", "I feel empty"]
+    assert loaded.predict(reports) == model.predict(reports)
+    assert np.array_equal(loaded.heads['severity'].weights, model.heads['severity'].weights)
+
+
+def test_confident_local_verdict_skips_model(model, stub_model, make_coordinator):
+    """Confident local predictions answer without Gemini; others still call it"""
+    coordinator = make_coordinator(stub_model(), local_classifier=model)
+    coordinator.local_threshold = 0.5
+
+    local = coordinator.classify_crisis("My father is having severe chest pain")
+    assert local['reasoning'] == 'Local model classification'
+    assert local['category'] == 'medical_emergency'
+    assert 'chest pain' in local['keywords']
+    assert coordinator.model.calls == 0
+
+    coordinator.local_threshold = 1.01
+    assert coordinator.classify_crisis("My father is having severe chest pain")['reasoning'] == 'model'
+    assert coordinator.model.calls == 1
+
+
+def test_local_model_loads_on_first_use(model, tmp_path, monkeypatch, make_coordinator):
+    """LOCAL_MODEL is read when the classifier is first needed, not at start-up"""
+    path = str(tmp_path / 'local_classifier.npz')
+    model.save(path)
+    monkeypatch.setenv('LOCAL_MODEL', path)
+
+    coordinator = make_coordinator()
+    assert coordinator._local_classifier is None
+
+    loaded = coordinator.local_classifier
+    assert loaded.predict(["chest pain"]) == model.predict(["chest pain"])
+    assert coordinator.local_classifier is loaded
@@ -0,0 +1,82 @@
+"""Tests for the shared, lazily initialized model registry"""
+
+import sys
+
+from agents.coordinator_agent import CrisisCoordinator
+from agents.model_registry import ModelRegistry
+from agents.specialist_agents import MedicalEmergencyAgent, MentalHealthAgent
+
+
+class FakeGenai:
+    def __init__(self):
+        self.configured = []
+        self.created = []
+
+    def configure(self, api_key):
+        self.configured.append(api_key)
+
+    def GenerativeModel(self, name):
+        self.created.append(name)
+        return ('model', name)
+
+
+def fake_sdk(monkeypatch):
+    genai = FakeGenai()
+    google = type(sys)('google')
+    google.generativeai = genai
+    monkeypatch.setitem(sys.modules, 'google', google)
+    monkeypatch.setitem(sys.modules, 'google.generativeai', genai)
+    return genai
+
+
+def test_no_key_means_demo_mode(monkeypatch):
+    """Without an API key the registry hands out no model and never configures the SDK"""
+    monkeypatch.delenv('GOOGLE_API_KEY', raising=False)
+    genai = fake_sdk(monkeypatch)
+    registry = ModelRegistry()
+
+    assert not registry.configured
+    assert registry.get('classification') is None
+    assert CrisisCoordinator(models=registry).model is None
+    assert genai.configured == []
+
+
+def test_agents_share_one_lazily_configured_client(monkeypatch):
+    """The SDK is configured once, on first use, and agents share model instances"""
+    monkeypatch.delenv('GEMINI_MODEL', raising=False)
+    genai = fake_sdk(monkeypatch)
+    registry = ModelRegistry(api_key='key')
+
+    coordinator = CrisisCoordinator(models=registry)
+    medical = MedicalEmergencyAgent(models=registry)
+    mental = MentalHealthAgent(models=registry)
+    assert genai.configured == []
+
+    assert coordinator.model == ('model', 'gemini-2.0-flash-exp')
+    assert medical.model is coordinator.model
+    assert mental.model is coordinator.model
+    assert genai.configured == ['key']
+    assert genai.created == ['gemini-2.0-flash-exp']
+
+
+def test_model_name_per_task(monkeypatch):
+    """GEMINI_MODEL_<TASK> overrides GEMINI_MODEL for that task only"""
+    genai = fake_sdk(monkeypatch)
+    monkeypatch.setenv('GEMINI_MODEL', 'gemini-default')
+    monkeypatch.setenv('GEMINI_MODEL_CLASSIFICATION', 'gemini-fast')
+    registry = ModelRegistry(api_key='key')
+
+    assert CrisisCoordinator(models=registry).model == ('model', 'gemini-fast')
+    assert MedicalEmergencyAgent(models=registry).model == ('model', 'gemini-default')
+    assert sorted(genai.created) == ['gemini-default', 'gemini-fast']
+    assert genai.configured == ['key']
+
+
+def test_assigned_model_overrides_registry(monkeypatch):
+    """Assigning agent.model (a stub, or None for demo mode) bypasses the registry"""
+    genai = fake_sdk(monkeypatch)
+    agent = MentalHealthAgent(models=ModelRegistry(api_key='key'))
+
+    agent.model = None
+    assert agent.model is None
+    assert genai.created == []
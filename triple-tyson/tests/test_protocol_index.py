@@ -0,0 +1,56 @@
+"""
+Tests for BM25 protocol retrieval
+"""
+
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from agents.coordinator_agent import CrisisCoordinator
+from agents.specialist_agents import DisasterResponseAgent, MedicalEmergencyAgent, MentalHealthAgent
+from retrieval.catalog import load_protocols, shared_catalog
+from retrieval.protocol_index import ProtocolIndex
+from storage.case_store import MemoryCaseStore
+
+
+def test_each_protocol_keyword_retrieves_its_protocol():
+    """A protocol's own keyword ranks that protocol (or one sharing the keyword) first"""
+    protocols = load_protocols()
+    index = ProtocolIndex(protocols)
+
+    for section, entries in protocols.items():
+        for protocol in entries:
+            for keyword in protocol['keywords']:
+                best = index.best(section, [keyword])
+                assert keyword.lower() in [kw.lower() for kw in best['keywords']], (keyword, best['id'])
+
+
+def test_ranked_top_k_with_scores():
+    """Results are ranked by score, ignore word order and accept the raw report"""
+    index = ProtocolIndex(load_protocols())
+
+    ranked = index.search('medical_emergencies', ['breathing difficulty'], k=2)
+    assert ranked[0][0]['id'] == 'cardiac_emergency'
+    assert len(ranked) == 2 and ranked[0][1] >= ranked[1][1] > 0
+
+    report = "Feeling extremely anxious and overwhelmed with studies"
+    assert index.best('mental_health_crises', [], report)['id'] == 'panic_attack'
+    assert index.search('disaster_emergencies', ['lottery']) == []
+    assert index.best('missing', ['chest pain']) is None
+
+
+def test_index_is_shared_by_coordinator_and_specialists():
+    """The protocol library is indexed once and used by all four agents"""
+    catalog = shared_catalog()
+    coordinator = CrisisCoordinator(case_store=MemoryCaseStore())
+    agents = [MedicalEmergencyAgent(), MentalHealthAgent(), DisasterResponseAgent()]
+
+    assert coordinator.catalog is catalog
+    assert coordinator.protocol_index is catalog.current().protocol_index
+    assert all(agent.catalog is catalog for agent in agents)
+
+    protocol = coordinator.get_relevant_protocol(
+        {'category': 'medical_emergency', 'keywords': ['chest pain']})
+    assert protocol is agents[0]._find_protocol(['chest pain'])
@@ -0,0 +1,93 @@
+"""
+Tests for the precompiled crisis response templates
+"""
+
+import copy
+import sys
+import os
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from agents.coordinator_agent import CrisisCoordinator
+from retrieval.response_templates import DISCLAIMER, ResponseTemplates
+from storage.case_store import MemoryCaseStore
+
+
+@pytest.fixture
+def coordinator():
+    """Coordinator in demo mode with an in-memory case store"""
+    coordinator = CrisisCoordinator(case_store=MemoryCaseStore())
+    coordinator.model = None
+    return coordinator
+
+
+def medical_response_inputs(coordinator):
+    classification = coordinator._fallback_classification("he has severe chest pain", "USA")
+    snapshot = coordinator.catalog.current()
+    protocol = coordinator.get_relevant_protocol(classification, "he has severe chest pain", snapshot)
+    helplines = coordinator.get_helplines(classification, snapshot)
+    return classification, protocol, helplines, snapshot
+
+
+def test_response_layout(coordinator):
+    """Header, protocol sections, contacts, case fields and disclaimer appear in order"""
+    classification, protocol, helplines, snapshot = medical_response_inputs(coordinator)
+    case = {'id': 'CASE-0007', 'follow_up_scheduled': '2026-01-02T03:04:05.678'}
+
+    response = coordinator._generate_response(classification, protocol, helplines, case, snapshot)
+
+    assert response.startswith("\n🚨 🏥 MEDICAL EMERGENCY DETECTED - CRITICAL SEVERITY\n" + "=" * 70 + "\n\n")
+    assert f"🔴 IMMEDIATE ACTIONS:\n1. {protocol['protocol']['immediate_actions'][0]}\n" in response
+    assert "📞 EMERGENCY CONTACTS:\n   Emergency Services: 911\n" in response
+    assert f"📋 Protocol: {protocol['name']}\n" in response
+    assert response.endswith(
+        "📊 Case ID: CASE-0007\n"
+        "⏰ Follow-up scheduled: 2026-01-02T03:04\n"
+        f"🤖 Confidence: {classification['confidence']:.0%}\n\n" + DISCLAIMER
+    )
+
+
+def test_static_prefix_is_shared_between_cases(coordinator):
+    """Cases with the same protocol and contacts reuse one rendered prefix"""
+    classification, protocol, helplines, snapshot = medical_response_inputs(coordinator)
+    templates = ResponseTemplates(snapshot.protocols)
+
+    first = templates.render(classification, protocol, helplines,
+                             {'id': 'CASE-0001', 'follow_up_scheduled': '2026-01-01T00:00:00'})
+    second = templates.render(classification, protocol, helplines,
+                              {'id': 'CASE-0002', 'follow_up_scheduled': '2026-01-01T00:00:00'})
+
+    assert first.replace('CASE-0001', 'CASE-0002') == second
+    prefix = templates.prefix(classification['category'], classification['severity'], protocol, helplines)
+    assert prefix is templates.prefix(classification['category'], classification['severity'],
+                                      protocol, helplines)
+    assert templates.stats()['misses'] == 1
+
+
+def test_protocols_outside_the_catalog_are_not_cached(coordinator):
+    """An edited copy of a catalog protocol is rendered from its own content"""
+    classification, protocol, helplines, snapshot = medical_response_inputs(coordinator)
+    edited = copy.deepcopy(protocol)
+    edited['protocol']['immediate_actions'] = ["Stay {calm}"]
+    case = {'id': 'CASE-0001', 'follow_up_scheduled': '2026-01-01T00:00:00'}
+    templates = ResponseTemplates(snapshot.protocols)
+
+    response = templates.render(classification, edited, helplines, case)
+
+    assert "1. Stay {calm}\n" in response
+    assert templates.stats()['prefixes'] == 0
+
+
+def test_response_without_protocol_or_contacts(coordinator):
+    """Sections with nothing to show are left out"""
+    case = {'id': 'CASE-0001', 'follow_up_scheduled': '2026-01-01T00:00:00'}
+    classification = {'category': 'other', 'severity': 'low', 'confidence': 0.5}
+
+    response = coordinator._generate_response(classification, None, {}, case)
+
+    assert "IMMEDIATE ACTIONS" not in response
+    assert "EMERGENCY CONTACTS" not in response
+    assert "🤖 Confidence: 50%\n" in response
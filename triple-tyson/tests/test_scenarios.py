@@ -157,6 +157,26 @@ def test_state_management():
     print("\n✅ State management test passed!")
 
 
+def test_process_crisis_result():
+    """Test structured result returned for a handled crisis"""
+    print("\n📦 Testing Structured Crisis Result...")
+    
+    coordinator = CrisisCoordinator()
+    
+    result = coordinator.process_crisis("My father is having severe chest pain")
+    
+    assert result.case_id == 'CASE-00001', f"Unexpected case ID {result.case_id}"
+    assert result.classification['category'] == 'medical_emergency'
+    assert result.protocol['id'] == 'cardiac_emergency'
+    assert result.helplines['emergency_services']['emergency'] == '911'
+    assert result.case_id in result.response
+    assert result.follow_up_scheduled == coordinator.get_case_status(result.case_id)['follow_up_scheduled']
+    
+    print(f"  ✅ Result for {result.case_id} carries classification, protocol and response")
+    
+    print("\n✅ Structured result test passed!")
+
+
 def run_all_tests():
     """Run all test suites"""
     print("\n" + "="*70)
@@ -169,6 +189,7 @@ def run_all_tests():
         test_disaster_emergencies()
         test_full_workflow()
         test_state_management()
+        test_process_crisis_result()
         
         print("\n" + "="*70)
         print("✅ ALL TESTS PASSED!")
@@ -0,0 +1,103 @@
+"""
+Tests for coalescing identical in-flight classifications
+"""
+
+import asyncio
+import sys
+import os
+import threading
+import time
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from agents.singleflight import SingleFlight
+
+
+EARTHQUAKE = {'category': 'disaster_emergency', 'severity': 'high', 'keywords': ['earthquake'],
+              'confidence': 0.98, 'reasoning': 'model'}
+
+
+def test_concurrent_identical_reports_share_one_call(stub_model, make_coordinator):
+    """Threads classifying the same normalized report make one model call"""
+    coordinator = make_coordinator(stub_model(answer=EARTHQUAKE, delay=0.2))
+    results = []
+
+    def report(text):
+        results.append(coordinator.process_crisis(text, 'Japan'))
+
+    threads = [threading.Thread(target=report, args=(text,))
+               for text in ["Earthquake, building shaking"] * 10 + ["earthquake,  BUILDING shaking"] * 5]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert coordinator.model.calls == 1
+    assert coordinator.in_flight.stats()['coalesced'] == 14
+    assert len({result.case_id for result in results}) == 15
+    assert all(result.classification['reasoning'] == 'model' for result in results)
+
+    # Followers get their own copies
+    results[0].classification['keywords'].append('x')
+    assert results[1].classification['keywords'] == ['earthquake']
+
+
+def test_async_identical_reports_share_one_call(stub_model, make_coordinator):
+    """Concurrent tasks classifying the same report make one model call"""
+    coordinator = make_coordinator(stub_model(answer=EARTHQUAKE, delay=0.2))
+
+    async def run():
+        return await asyncio.gather(*(
+            coordinator.classify_crisis_async("Earthquake building shaking") for _ in range(20)
+        ))
+
+    classifications = asyncio.run(run())
+    assert coordinator.model.calls == 1
+    assert coordinator.in_flight.executed == 1 and coordinator.in_flight.coalesced == 19
+    assert all(c['category'] == 'disaster_emergency' for c in classifications)
+
+
+def test_errors_are_shared_and_calls_are_not_retained():
+    """Followers see the leader's exception; later calls start a new flight"""
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+
+    def failing():
+        started.set()
+        release.wait(5)
+        raise ConnectionError("API unavailable")
+
+    errors = []
+
+    def call():
+        try:
+            flight.do('key', failing)
+        except ConnectionError as e:
+            errors.append(e)
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait(5)
+    follower = threading.Thread(target=call)
+    follower.start()
+    time.sleep(0.05)
+    release.set()
+    leader.join()
+    follower.join()
+
+    assert len(errors) == 2
+    assert flight.do('key', lambda: 'fresh') == 'fresh'
+    assert flight.stats() == {'executed': 2, 'coalesced': 1, 'coalesced_share': 0.333}
+
+    with pytest.raises(TimeoutError):
+        blocker = threading.Thread(target=lambda: flight.do('slow', lambda: time.sleep(0.2)))
+        blocker.start()
+        time.sleep(0.02)
+        try:
+            flight.do('slow', lambda: None, timeout=0.01)
+        finally:
+            blocker.join()
@@ -0,0 +1,97 @@
+"""
+Tests for tiered classification with background Gemini refinement
+"""
+
+import asyncio
+import sys
+import os
+import threading
+from datetime import datetime, timedelta
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from classification.cache import ClassificationCache
+
+
+# Gemini's classification of the test reports
+REFINED = {'category': 'mental_health_crisis', 'severity': 'medium', 'keywords': ['panic attack'],
+           'confidence': 0.95, 'reasoning': 'model'}
+
+
+def test_confident_match_answers_before_model_and_is_refined(stub_model, make_coordinator):
+    """A critical keyword match responds at once; Gemini later updates the case"""
+    model = stub_model(answer=REFINED, gated=True)
+    coordinator = make_coordinator(model, classification_cache=ClassificationCache(), tiered=True)
+
+    result = coordinator.process_crisis("Chest pain and panic attack")
+    assert result.refining
+    assert result.classification['category'] == 'medical_emergency'
+    case = coordinator.get_case_status(result.case_id)
+    assert case['refinement'] == 'pending'
+    first_follow_up = case['follow_up_scheduled']
+
+    model.release.set()
+    coordinator.wait_for_refinements(timeout=5)
+
+    case = coordinator.get_case_status(result.case_id)
+    assert case['refinement'] == 'done'
+    assert case['classification']['reasoning'] == 'model'
+    # Severity dropped from critical to medium: follow-up moves from +2h to +1 day
+    assert case['follow_up_scheduled'] > first_follow_up
+    created = datetime.fromisoformat(case['timestamp'])
+    assert datetime.fromisoformat(case['follow_up_scheduled']) - created == timedelta(days=1)
+    assert coordinator.follow_ups.due('9999')[0] == (result.case_id, case['follow_up_scheduled'])
+
+
+def test_unconfident_reports_wait_for_model(stub_model, make_coordinator):
+    """Medium-severity or unmatched reports still go through Gemini first"""
+    coordinator = make_coordinator(stub_model(answer=REFINED),
+                                   classification_cache=ClassificationCache(), tiered=True)
+
+    result = coordinator.process_crisis("I feel anxious")
+    assert not result.refining
+    assert result.classification['reasoning'] == 'model'
+
+
+def test_failed_refinement_keeps_keyword_verdict(stub_model, make_coordinator):
+    """If Gemini fails, the keyword classification and follow-up stand"""
+    coordinator = make_coordinator(stub_model(error=ConnectionError("API unavailable")),
+                                   classification_cache=ClassificationCache(), tiered=True)
+
+    result = asyncio.run(_process_and_drain(coordinator, "Heart attack"))
+    case = coordinator.get_case_status(result.case_id)
+    assert case['refinement'] == 'failed'
+    assert case['classification']['category'] == 'medical_emergency'
+    assert case['follow_up_scheduled'] == result.follow_up_scheduled
+
+
+def test_concurrent_refinements_share_one_executor(stub_model, make_coordinator):
+    """Refinements started from many request threads run on one pool and are all awaited"""
+    coordinator = make_coordinator(stub_model(answer=REFINED, delay=0.01),
+                                   classification_cache=ClassificationCache(), tiered=True)
+    refiner = coordinator._refiner
+    results = []
+
+    def request():
+        for _ in range(5):
+            results.append(coordinator.process_crisis("Chest pain"))
+
+    threads = [threading.Thread(target=request) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    coordinator.wait_for_refinements(timeout=10)
+
+    assert coordinator._refiner is refiner
+    assert coordinator._refinements == set()
+    assert all(coordinator.get_case_status(result.case_id)['refinement'] == 'done'
+               for result in results)
+
+
+async def _process_and_drain(coordinator, report):
+    result = await coordinator.process_crisis_async(report)
+    assert result.refining
+    await asyncio.gather(*coordinator._refinements)
+    return result